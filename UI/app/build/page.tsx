@@ -182,7 +182,7 @@ export default function BuildPage() {
                       >
                         Select File
                       </Button>
-                      <Input id="data-upload" type="file" accept=".csv,.xlsx,.xls"
+                      <Input id="data-upload" type="file" accept=".csv,.xlsx,.xls,.parquet,.feather,.zip"
                         className="hidden" onChange={handleFileChange}
                       />
 
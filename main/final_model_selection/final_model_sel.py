@@ -1,8 +1,36 @@
+import numpy as np
+from scipy.stats import rankdata
+
+REGRESSION_WEIGHTS = {"mse": 0.1, "rmse": 0.3, "mae": 0.2, "r2": 0.4}
+CLASSIFICATION_WEIGHTS = {"f1": 0.5, "accuracy": 0.3, "precision": 0.1, "recall": 0.1}
+CLUSTERING_WEIGHTS = {"silhouette": 0.5, "davies_bouldin": 0.3, "calinski_harabasz": 0.2}
+
+# True when a larger value is better
+HIGHER_IS_BETTER = {
+    "mse": False, "rmse": False, "mae": False, "r2": True,
+    "accuracy": True, "precision": True, "recall": True, "f1": True, "roc_auc": True,
+    "silhouette": True, "davies_bouldin": False, "calinski_harabasz": True,
+    "fit_seconds": False, "predict_seconds": False, "model_bytes": False,
+    "memory_bytes": False, "rows_per_second_per_core": True,
+}
+COST_COLUMNS = ("fit_seconds", "predict_seconds", "model_bytes")
+# read from each model's metadata rather than its metrics
+METADATA_COLUMNS = COST_COLUMNS + ("memory_bytes", "rows_per_second_per_core")
+
+# guards 1/x in score_model against perfect fits
+_EPS = 1e-12
+
+
 def score_model(metrics, weights=None):
+    """Weighted val-metric score of a single model (kept for compatibility; see rank_models)."""
+    # Clustering scoring (unsupervised: metrics live under "train")
+    if "silhouette" in metrics.get("train", {}):
+        return metrics["train"]["silhouette"] or -1.0
+
     # Regression scoring
     if "mse" in metrics.get("val", {}):
         if weights is None:
-            weights = {"mse": 0.1, "rmse": 0.3, "mae": 0.2, "r2": 0.4}
+            weights = REGRESSION_WEIGHTS
 
         mse = metrics["val"].get("mse", 1e9)
         rmse = metrics["val"].get("rmse", 1e9)
@@ -10,9 +38,9 @@ def score_model(metrics, weights=None):
         r2 = metrics["val"].get("r2", 0)
 
         score = (
-            weights["mse"] * (1 / mse) +
-            weights["rmse"] * (1 / rmse) +
-            weights["mae"] * (1 / mae) +
+            weights["mse"] * (1 / max(mse, _EPS)) +
+            weights["rmse"] * (1 / max(rmse, _EPS)) +
+            weights["mae"] * (1 / max(mae, _EPS)) +
             weights["r2"] * r2
         )
         return score
@@ -28,13 +56,177 @@ def score_model(metrics, weights=None):
     return score
 
 
-def compute_model_scores(results):
-    model_scores = {}
-    for model_name, info in results.items():
-        score = score_model(info["metrics"])
-        model_scores[model_name] = score
+def _metadata_value(info, column):
+    metadata = info.get("metadata") or {}
+    if column == "model_bytes":
+        return (metadata.get("artifact") or {}).get("bytes")
+    if column == "rows_per_second_per_core":
+        return (metadata.get("inference") or {}).get(column)
+    return metadata.get(column)
+
+
+def metric_table(results, columns, split="val"):
+    """
+    Gather a (n_models, n_columns) float matrix from trainer results.
+
+    Columns are metric names read from metrics[split] (falling back to
+    metrics["train"] for models without that split) or METADATA_COLUMNS
+    (latency, size, throughput). Missing values are NaN.
+    """
+    names = list(results)
+    table = np.full((len(names), len(columns)), np.nan)
+    for i, name in enumerate(names):
+        info = results[name]
+        metrics = info.get("metrics") or {}
+        split_metrics = metrics.get(split) or metrics.get("train") or {}
+        for j, column in enumerate(columns):
+            value = _metadata_value(info, column) if column in METADATA_COLUMNS else split_metrics.get(column)
+            if value is not None:
+                table[i, j] = float(value)
+    return names, table
+
+
+def normalize_scores(table, higher_is_better, method="rank"):
+    """
+    Map every column of table to [0, 1] with 1 = best, all columns at once.
+
+      • rank: average ranks (ties share a rank), scaled to [0, 1]
+      • minmax: (x - worst) / (best - worst); constant columns score 1
+    NaNs (missing metrics) score 0.
+    """
+    sign = np.where(np.asarray(higher_is_better), 1.0, -1.0)
+    oriented = table * sign
+    missing = np.isnan(oriented)
+    oriented = np.where(missing, -np.inf, oriented)
+    n = len(table)
+
+    if method == "rank":
+        norm = (rankdata(oriented, method="average", axis=0) - 1) / max(n - 1, 1)
+        if n == 1:
+            norm = np.ones_like(norm)
+    elif method == "minmax":
+        finite = np.where(missing, np.nan, oriented)
+        with np.errstate(invalid="ignore"):
+            lo, hi = np.nanmin(finite, axis=0), np.nanmax(finite, axis=0)
+        span = np.where(hi > lo, hi - lo, 1.0)
+        norm = np.where(hi > lo, (finite - lo) / span, 1.0)
+    else:
+        raise ValueError(f"Unknown normalization method: {method}")
+    return np.where(missing, 0.0, norm)
+
+
+def pareto_ranks(objectives):
+    """
+    Non-dominated sorting of an (n_models, n_objectives) matrix to minimize.
+
+    Returns an int array: 0 for the Pareto front, 1 for the front once those
+    are removed, and so on. NaN objectives count as worst.
+    """
+    obj = np.where(np.isnan(objectives), np.inf, objectives)
+    # dominates[i, j]: i is no worse than j everywhere and better somewhere
+    le = (obj[:, None, :] <= obj[None, :, :]).all(axis=2)
+    lt = (obj[:, None, :] < obj[None, :, :]).any(axis=2)
+    dominates = le & lt
+
+    ranks = np.full(len(obj), -1)
+    remaining = np.ones(len(obj), dtype=bool)
+    level = 0
+    while remaining.any():
+        dominated = (dominates & remaining[:, None]).any(axis=0)
+        front = remaining & ~dominated
+        ranks[front] = level
+        remaining &= ~front
+        level += 1
+    return ranks
+
+
+def _default_weights(columns_present):
+    if "mse" in columns_present or "r2" in columns_present:
+        return dict(REGRESSION_WEIGHTS)
+    if "silhouette" in columns_present:
+        return dict(CLUSTERING_WEIGHTS)
+    return dict(CLASSIFICATION_WEIGHTS)
+
+
+def rank_models(results, weights=None, split="val", method="rank", quality_metric=None,
+                cost_columns=COST_COLUMNS, max_predict_seconds=None, max_model_bytes=None,
+                min_rows_per_second=None):
+    """
+    Score and rank all models from trainer results in one pass.
+
+    • weights: {column: weight} over metric and/or cost columns; defaults to
+      REGRESSION_WEIGHTS, CLASSIFICATION_WEIGHTS or CLUSTERING_WEIGHTS
+      depending on the metrics
+    • score: weighted mean of the per-column normalized scores (normalize_scores)
+    • pareto_rank: non-dominated level on (quality_metric, *cost_columns), where
+      quality_metric defaults to the composite score
+    • max_predict_seconds / max_model_bytes / min_rows_per_second (single-core
+      predict throughput, see model_training.benchmark): serving constraints;
+      models known to miss them are not eligible as "best"
+
+    Returns a dict with ranking (names, best first), best, scores,
+    pareto_rank, pareto_front and eligible.
+    """
+    if not results:
+        raise ValueError("No model results to rank")
+
+    if weights is None:
+        sample = next(iter(results.values())).get("metrics") or {}
+        weights = _default_weights(set(sample.get(split) or sample.get("train") or {}))
+    columns = list(weights)
+    unknown = [c for c in columns if c not in HIGHER_IS_BETTER]
+    if unknown:
+        raise ValueError(f"No direction known for weighted columns: {unknown}")
+
+    names, table = metric_table(results, columns, split=split)
+    norm = normalize_scores(table, [HIGHER_IS_BETTER[c] for c in columns], method=method)
+    w = np.array([weights[c] for c in columns], dtype=float)
+    scores = norm @ w / w.sum()
+
+    _, costs = metric_table(results, list(cost_columns), split=split)
+    # Pareto objectives are minimized
+    cost_sign = np.array([-1.0 if HIGHER_IS_BETTER[c] else 1.0 for c in cost_columns])
+    if quality_metric is None:
+        quality = -scores
+    else:
+        _, q = metric_table(results, [quality_metric], split=split)
+        quality = q[:, 0] * (-1.0 if HIGHER_IS_BETTER[quality_metric] else 1.0)
+    # cost columns nobody reported would make every model tie on them; drop them
+    measured = ~np.isnan(costs).all(axis=0)
+    fronts = pareto_ranks(np.column_stack([quality, (costs * cost_sign)[:, measured]]))
+
+    eligible = np.ones(len(names), dtype=bool)
+    limits = {"predict_seconds": max_predict_seconds, "model_bytes": max_model_bytes,
+              "rows_per_second_per_core": min_rows_per_second}
+    limits = {c: v for c, v in limits.items() if v is not None}
+    if limits:
+        _, measured_limits = metric_table(results, list(limits), split=split)
+        for j, (column, limit) in enumerate(limits.items()):
+            # unmeasured models are not excluded
+            value = measured_limits[:, j]
+            eligible &= ~((value < limit) if HIGHER_IS_BETTER[column] else (value > limit))
+
+    order = np.lexsort((-scores, ~eligible))
+    ranking = [names[i] for i in order]
+    return {
+        "ranking": ranking,
+        "best": ranking[0] if eligible.any() else None,
+        "scores": {n: float(s) for n, s in zip(names, scores)},
+        "pareto_rank": {n: int(r) for n, r in zip(names, fronts)},
+        "pareto_front": [names[i] for i in order if fronts[i] == 0],
+        "eligible": [names[i] for i in order if eligible[i]],
+    }
+
+
+def compute_model_scores(results, weights=None, **rank_kwargs):
+    """
+    Pick the best model (see rank_models) and return it with its weights.
 
-    best_model = max(model_scores, key=model_scores.get)
+    When no model meets the serving constraints, the best-scoring model is
+    returned regardless.
+    """
+    ranked = rank_models(results, weights=weights, **rank_kwargs)
+    best_model = ranked["best"] or ranked["ranking"][0]
     # Extract best model’s weights from results JSON
     best_model_weights = results[best_model].get("weights", None)
     # model_Scores
@@ -0,0 +1,151 @@
+"""Approximate nearest-neighbour classifiers used by the KNN model script.
+
+Kept in an importable module (not inside knn.py) so that pickled pipelines
+containing these estimators can be loaded again.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import os
+from typing import Optional
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.cluster import MiniBatchKMeans
+
+try:  # optional dependency
+    import hnswlib
+except ImportError:  # pragma: no cover - depends on environment
+    hnswlib = None
+
+
+def _vote(neighbor_labels: np.ndarray, n_classes: int, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """Class probabilities from the encoded labels of each row's neighbours."""
+    probs = np.zeros((len(neighbor_labels), n_classes))
+    rows = np.repeat(np.arange(len(neighbor_labels)), neighbor_labels.shape[1])
+    w = np.ones(neighbor_labels.size) if weights is None else weights.ravel()
+    np.add.at(probs, (rows, neighbor_labels.ravel()), w)
+    probs /= probs.sum(axis=1, keepdims=True)
+    return probs
+
+
+class _ANNClassifierMixin(ClassifierMixin):
+    """predict / predict_proba on top of a kneighbors(X) -> (dist, idx) method."""
+
+    def _encode_labels(self, y):
+        self.classes_, self._y = np.unique(np.asarray(y), return_inverse=True)
+
+    def predict_proba(self, X):
+        dist, idx = self.kneighbors(X)
+        weights = None
+        if self.weights == "distance":
+            weights = 1.0 / np.maximum(dist, 1e-12)
+        return _vote(self._y[idx], len(self.classes_), weights)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class IVFKNeighborsClassifier(_ANNClassifierMixin, BaseEstimator):
+    """k-NN classifier over an inverted-file (IVF) index in pure NumPy.
+
+    Training points are bucketed by their nearest of n_lists k-means centroids;
+    a query only scans the nprobe closest buckets. Queries are processed in
+    batches across n_jobs threads (the distance products release the GIL).
+    """
+
+    def __init__(self, n_neighbors: int = 5, n_lists: Optional[int] = None, nprobe: int = 8,
+                 weights: str = "uniform", batch_size: int = 4096, n_jobs: Optional[int] = None,
+                 random_state: int = 42):
+        self.n_neighbors = n_neighbors
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.weights = weights
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        self._encode_labels(y)
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(X))))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=self.random_state,
+                                 batch_size=4096, n_init=1).fit(X)
+        assign = kmeans.labels_
+        order = np.argsort(assign, kind="stable")
+        self.centroids_ = kmeans.cluster_centers_.astype(np.float32)
+        self.offsets_ = np.searchsorted(assign[order], np.arange(n_lists + 1))
+        self.data_ = X[order]
+        self.sq_norms_ = np.einsum("ij,ij->i", self.data_, self.data_)
+        self.ids_ = order
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def _search(self, Q):
+        k = self.n_neighbors
+        n_q = len(Q)
+        best_d = np.full((n_q, k), np.inf, dtype=np.float32)
+        best_i = np.full((n_q, k), -1, dtype=np.int64)
+        q_norms = np.einsum("ij,ij->i", Q, Q)
+
+        c_dist = q_norms[:, None] - 2 * Q @ self.centroids_.T + np.einsum("ij,ij->i", self.centroids_, self.centroids_)
+        nprobe = min(self.nprobe, len(self.centroids_))
+        probes = np.argpartition(c_dist, nprobe - 1, axis=1)[:, :nprobe]
+
+        # scan each probed list once for all queries that probe it
+        for lst in np.unique(probes):
+            q_idx = np.flatnonzero((probes == lst).any(axis=1))
+            start, stop = self.offsets_[lst], self.offsets_[lst + 1]
+            if stop == start:
+                continue
+            d = q_norms[q_idx, None] - 2 * Q[q_idx] @ self.data_[start:stop].T + self.sq_norms_[start:stop]
+            cand_d = np.concatenate([best_d[q_idx], d], axis=1)
+            cand_i = np.concatenate([best_i[q_idx], np.broadcast_to(np.arange(start, stop), d.shape)], axis=1)
+            keep = np.argpartition(cand_d, k - 1, axis=1)[:, :k]
+            best_d[q_idx] = np.take_along_axis(cand_d, keep, axis=1)
+            best_i[q_idx] = np.take_along_axis(cand_i, keep, axis=1)
+
+        order = np.argsort(best_d, axis=1)
+        best_d = np.sqrt(np.maximum(np.take_along_axis(best_d, order, axis=1), 0))
+        best_i = np.take_along_axis(best_i, order, axis=1)
+        # buckets with fewer than k points leave -1 slots; fall back to the nearest found
+        best_i = np.where(best_i < 0, best_i[:, :1], best_i)
+        return best_d, self.ids_[best_i]
+
+    def kneighbors(self, X):
+        Q = np.ascontiguousarray(X, dtype=np.float32)
+        if len(Q) == 0:
+            return np.empty((0, self.n_neighbors), dtype=np.float32), np.empty((0, self.n_neighbors), dtype=np.int64)
+        batches = [Q[i:i + self.batch_size] for i in range(0, len(Q), self.batch_size)]
+        n_jobs = self.n_jobs if self.n_jobs and self.n_jobs > 0 else (os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=min(n_jobs, len(batches))) as pool:
+            parts = list(pool.map(self._search, batches))
+        return np.vstack([p[0] for p in parts]), np.vstack([p[1] for p in parts])
+
+
+class HNSWKNeighborsClassifier(_ANNClassifierMixin, BaseEstimator):
+    """k-NN classifier over an hnswlib HNSW graph (requires the optional hnswlib package)."""
+
+    def __init__(self, n_neighbors: int = 5, M: int = 16, ef_construction: int = 200, ef: int = 64,
+                 weights: str = "uniform", n_jobs: Optional[int] = None):
+        self.n_neighbors = n_neighbors
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef = ef
+        self.weights = weights
+        self.n_jobs = n_jobs
+
+    def fit(self, X, y):
+        if hnswlib is None:
+            raise ImportError("hnswlib is required for the HNSW backend")
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        self._encode_labels(y)
+        self.index_ = hnswlib.Index(space="l2", dim=X.shape[1])
+        self.index_.init_index(max_elements=len(X), ef_construction=self.ef_construction, M=self.M)
+        self.index_.add_items(X, num_threads=self.n_jobs or -1)
+        self.index_.set_ef(max(self.ef, self.n_neighbors))
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def kneighbors(self, X):
+        idx, sq_dist = self.index_.knn_query(np.ascontiguousarray(X, dtype=np.float32), k=self.n_neighbors,
+                                             num_threads=self.n_jobs or -1)
+        return np.sqrt(sq_dist), idx.astype(np.int64)
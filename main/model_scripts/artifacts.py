@@ -0,0 +1,185 @@
+"""Saving and loading of trained model artifacts.
+
+Model scripts call save_artifact(); inside an ArtifactWriter block (the
+trainers open one per run) the write happens on a background thread so the
+next model can start training, otherwise it happens immediately.
+"""
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import joblib
+
+# joblib compression: an int level (zlib) or a (method, level) tuple; 0 disables it.
+# Uncompressed files can be loaded with their numpy buffers memory-mapped, so
+# scripts whose artifacts are mostly large arrays (KNN, SVM) save with 0.
+DEFAULT_COMPRESS: Union[int, tuple] = 3
+_PICKLE_MAGIC = b"\x80"
+
+_active = threading.local()
+
+
+def _tmp_path(path: Path) -> Path:
+    return path.with_name(path.name + ".tmp")
+
+
+def discard_partial_write(path):
+    """Remove what an interrupted write of path (e.g. in a killed process) left behind."""
+    _tmp_path(Path(path)).unlink(missing_ok=True)
+
+
+def _write(obj: Any, path: Path, compress) -> Dict[str, Any]:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp_path(path)
+    start = time.perf_counter()
+    try:
+        joblib.dump(obj, tmp, compress=compress)
+        os.replace(tmp, path)  # readers never see a half-written artifact
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return {
+        "path": str(path),
+        "bytes": path.stat().st_size,
+        "compress": compress,
+        "write_seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def is_compressed(path) -> bool:
+    """True if the joblib file at path was written with compression."""
+    with open(path, "rb") as f:
+        return f.read(1) != _PICKLE_MAGIC
+
+
+def load_artifact(path, mmap: bool = True) -> Any:
+    """
+    Load an artifact written by save_artifact.
+
+    Uncompressed artifacts are loaded with mmap_mode="r" when mmap is set, so
+    large numpy buffers (tree node arrays, coefficients, KNN training data)
+    are paged in lazily instead of being read up front.
+    """
+    if mmap and not is_compressed(path):
+        return joblib.load(path, mmap_mode="r")
+    return joblib.load(path)
+
+
+def measure_load_seconds(path, mmap: bool = True) -> float:
+    """Wall-clock seconds for load_artifact(path), as a serving process would see it."""
+    start = time.perf_counter()
+    load_artifact(path, mmap=mmap)
+    return round(time.perf_counter() - start, 4)
+
+
+class ArtifactWriter:
+    """
+    Background writer for model artifacts, used as a context manager.
+
+    While the block is open, save_artifact() only enqueues the object; a single
+    worker thread compresses and writes it (and, if measure_load is set, times
+    a load of the written file). Leaving the block waits for all pending
+    writes. Per-path results are kept in .stats, failures in .errors.
+    when_written() registers work that must only happen once a file is on
+    disk (e.g. checkpointing the model's results). compress, when set,
+    applies to every write; None keeps each save_artifact() call's own.
+    """
+
+    def __init__(self, compress=None, measure_load: bool = True):
+        self.compress = compress
+        self.measure_load = measure_load
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.errors: Dict[str, str] = {}
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._previous = None
+        self._lock = threading.Lock()
+        self._callbacks: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+        self._previous = getattr(_active, "writer", None)
+        _active.writer = self
+        return self
+
+    def __exit__(self, *exc):
+        _active.writer = self._previous
+        self._queue.put(None)
+        self._thread.join()
+        return False
+
+    def submit(self, obj: Any, path, compress=None):
+        if self.compress is not None:
+            compress = self.compress
+        self._queue.put((obj, Path(path), DEFAULT_COMPRESS if compress is None else compress))
+
+    def when_written(self, path, callback: Callable[[Dict[str, Any]], None]):
+        """
+        Call callback(stats) once path has been written: on the writer thread,
+        or right away if it already has been. Never called if the write fails.
+        """
+        path = str(Path(path))
+        with self._lock:
+            info = self.stats.get(path)
+            if info is None:
+                if path not in self.errors:
+                    self._callbacks.setdefault(path, []).append(callback)
+                return
+        callback(info)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            obj, path, compress = item
+            try:
+                info = _write(obj, path, compress)
+                if self.measure_load:
+                    info["load_seconds"] = measure_load_seconds(path)
+            except Exception as e:  # a failed write must not kill the remaining ones
+                with self._lock:
+                    self.errors[str(path)] = f"{type(e).__name__}: {e}"
+                    self._callbacks.pop(str(path), None)
+                continue
+            self.mark_written(path, info)
+
+    def mark_written(self, path, info: Dict[str, Any]):
+        """Record path as written with stats info (also for files written elsewhere, e.g. by a subprocess)."""
+        path = Path(path)
+        with self._lock:
+            self.stats[str(path)] = info
+            callbacks = self._callbacks.pop(str(path), [])
+        for callback in callbacks:
+            try:
+                callback(info)
+            except Exception as e:
+                print(f"⚠️ Post-write step for {path.name} failed: {type(e).__name__}: {e}")
+
+    def info_for(self, path) -> Optional[Dict[str, Any]]:
+        """Write/load stats for path (after the block has exited), or None."""
+        path = str(Path(path))
+        if path in self.errors:
+            return {"path": path, "error": self.errors[path]}
+        return self.stats.get(path)
+
+
+def save_artifact(obj: Any, path, compress=None) -> Optional[Dict[str, Any]]:
+    """
+    Persist obj to path with joblib.
+
+    Inside an ArtifactWriter block the write is queued and None is returned;
+    otherwise it is written now and its stats (path, bytes, compress,
+    write_seconds) are returned. compress (default DEFAULT_COMPRESS) is
+    overridden by the writer's, when the writer was given one.
+    """
+    writer = getattr(_active, "writer", None)
+    if writer is not None:
+        writer.submit(obj, path, compress)
+        return None
+    return _write(obj, path, DEFAULT_COMPRESS if compress is None else compress)
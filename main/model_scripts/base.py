@@ -79,7 +79,12 @@ class ModelScript(ABC):
     SUPPORTED_PROBLEM_TYPES: tuple[str, ...]  # subclasses must define this
 
     @abstractmethod
-    def train_model(self, X_train, y_train, X_val=None, y_val=None, save_path=None, scale=True, **kwargs):
-        """Train and return (model, metrics, metadata)."""
+    def train_model(self, X_train, y_train, X_val=None, y_val=None, save_path=None, scale=True,
+                    transform_cache=None, **kwargs):
+        """Train and return (model, metrics, metadata).
+
+        transform_cache is a TransformCache shared by all scripts of one
+        train_all run; use it for preprocessing steps other scripts also fit.
+        """
         pass
 
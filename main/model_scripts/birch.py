@@ -0,0 +1,108 @@
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sklearn.cluster import Birch, MiniBatchKMeans
+from sklearn.pipeline import Pipeline
+
+from main.model_scripts.utils import _ensure_array, choose_n_clusters, evaluate_clustering_model
+from main.model_scripts.artifacts import save_artifact
+from main.model_scripts.base import ModelScript
+
+
+MODEL_NAME = "birch"
+SUPPORTED_PROBLEM_TYPES = ["clustering"]
+
+DEFAULT_PARAMS = {"branching_factor": 50}
+# rows fed to the CF-tree per partial_fit call
+CHUNK_ROWS = 100_000
+# unless given, the radius threshold is doubled from INITIAL_THRESHOLD until a
+# CF-tree built on CALIBRATION_ROWS sampled rows has at most TARGET_SUBCLUSTERS leaves
+INITIAL_THRESHOLD = 0.5
+CALIBRATION_ROWS = 10_000
+TARGET_SUBCLUSTERS = 1000
+# the default agglomerative global step is O(m^2) in the number of subclusters;
+# beyond this many subclusters they are grouped with MiniBatchKMeans instead
+MAX_AGGLOMERATIVE_SUBCLUSTERS = 5000
+
+
+def _build_pipeline(est: Birch) -> Pipeline:
+    return Pipeline([("est", est)])
+
+
+def _calibrate_threshold(X: np.ndarray, branching_factor: int, random_state: int = 42) -> float:
+    rng = np.random.default_rng(random_state)
+    sample = X if len(X) <= CALIBRATION_ROWS else X[rng.choice(len(X), size=CALIBRATION_ROWS, replace=False)]
+    threshold = INITIAL_THRESHOLD
+    for _ in range(20):
+        tree = Birch(threshold=threshold, branching_factor=branching_factor, n_clusters=None).fit(sample)
+        if len(tree.subcluster_centers_) <= TARGET_SUBCLUSTERS:
+            break
+        threshold *= 2
+    return threshold
+
+
+def train_model(
+    X_train: np.ndarray,
+    y_train: Optional[np.ndarray] = None,  # unused: clustering is unsupervised
+    X_val: Optional[np.ndarray] = None,
+    y_val: Optional[np.ndarray] = None,
+    save_path: Optional[Path] = None,
+    scale: bool = True,  # features arrive scaled from preprocessing; kept for compatibility
+    transform_cache=None,
+    **kwargs,
+) -> Tuple[Pipeline, Dict[str, Dict[str, float]], Dict[str, Any]]:
+    X_train = _ensure_array(X_train)
+    params = {**DEFAULT_PARAMS, **kwargs}
+    n_clusters = params.pop("n_clusters", None)
+    selection = None
+    if n_clusters is None:
+        selection = choose_n_clusters(X_train)
+        n_clusters = selection["n_clusters"]
+
+    if "threshold" not in params:
+        params["threshold"] = _calibrate_threshold(X_train, params["branching_factor"])
+
+    # build the CF-tree in one streaming pass, then cluster only its subclusters
+    est = Birch(n_clusters=None, **params)
+    for start in range(0, len(X_train), CHUNK_ROWS):
+        est.partial_fit(X_train[start:start + CHUNK_ROWS])
+    n_subclusters = len(est.subcluster_centers_)
+    if n_subclusters > MAX_AGGLOMERATIVE_SUBCLUSTERS:
+        global_step = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3)
+    else:
+        global_step = n_clusters
+    est.set_params(n_clusters=global_step)
+    est.partial_fit()  # global clustering step only
+
+    pipe = _build_pipeline(est)
+    metrics = {"train": evaluate_clustering_model(pipe, X_train)}
+    if X_val is not None:
+        metrics["val"] = evaluate_clustering_model(pipe, X_val)
+
+    metadata = {
+        "name": MODEL_NAME,
+        "hyperparams": kwargs,
+        "train_samples": int(len(X_train)),
+        "n_clusters": int(n_clusters),
+        "threshold": float(params["threshold"]),
+        "n_subclusters": int(n_subclusters),
+        "global_step": "minibatch_kmeans" if isinstance(global_step, MiniBatchKMeans) else "agglomerative",
+    }
+    if selection is not None:
+        metadata["n_clusters_selection"] = selection
+
+    if save_path is not None:
+        save_artifact(pipe, save_path)
+
+    return pipe, metrics, metadata
+
+
+class Model(ModelScript):
+    MODEL_NAME = MODEL_NAME
+    SUPPORTED_PROBLEM_TYPES = tuple(SUPPORTED_PROBLEM_TYPES)
+
+    def train_model(self, X_train, y_train=None, X_val=None, y_val=None, save_path=None, scale=True,
+                    transform_cache=None, **kwargs):
+        return train_model(X_train, y_train, X_val=X_val, y_val=y_val, save_path=save_path, scale=scale,
+                           transform_cache=transform_cache, **kwargs)
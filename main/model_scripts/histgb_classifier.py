@@ -0,0 +1,84 @@
+from inspect import signature
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.pipeline import Pipeline
+
+from main.model_scripts.utils import _ensure_array, evaluate_classification_model
+from main.model_scripts.artifacts import save_artifact
+from main.model_scripts.base import ModelScript
+
+
+MODEL_NAME = "histgb_classifier"
+SUPPORTED_PROBLEM_TYPES = ["classification"]
+
+DEFAULT_PARAMS = {
+    "max_iter": 500,
+    "learning_rate": 0.1,
+    "max_bins": 255,
+    "early_stopping": True,
+    "n_iter_no_change": 10,
+    "random_state": 42,
+}
+# sklearn >= 1.6 accepts an explicit validation set in fit()
+_FIT_ACCEPTS_VAL = "X_val" in signature(HistGradientBoostingClassifier.fit).parameters
+
+
+def _build_pipeline(**est_kwargs) -> Pipeline:
+    return Pipeline([("est", HistGradientBoostingClassifier(**{**DEFAULT_PARAMS, **est_kwargs}))])
+
+
+def train_model(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_val: Optional[np.ndarray] = None,
+    y_val: Optional[np.ndarray] = None,
+    save_path: Optional[Path] = None,
+    scale: bool = True,  # binned trees need no scaling; kept for compatibility
+    transform_cache=None,
+    **kwargs,
+) -> Tuple[Pipeline, Dict[str, Dict[str, float]], Dict[str, Any]]:
+    X_train = _ensure_array(X_train)
+    y_train = _ensure_array(y_train)
+    has_val = X_val is not None and y_val is not None
+    pipe = _build_pipeline(**kwargs)
+
+    # early stopping monitors the trainers' validation split when sklearn supports it,
+    # otherwise an internal validation_fraction of the training rows
+    if has_val and _FIT_ACCEPTS_VAL and pipe.named_steps["est"].early_stopping:
+        pipe.fit(X_train, y_train, est__X_val=_ensure_array(X_val), est__y_val=_ensure_array(y_val))
+        stopping_on = "val"
+    else:
+        pipe.fit(X_train, y_train)
+        early = pipe.named_steps["est"].early_stopping
+        stopping_on = "internal" if early is True or (early == "auto" and len(X_train) > 10000) else "none"
+
+    metrics = {"train": evaluate_classification_model(pipe, X_train, y_train)}
+    if has_val:
+        metrics["val"] = evaluate_classification_model(pipe, X_val, y_val)
+
+    est = pipe.named_steps["est"]
+    metadata = {
+        "name": MODEL_NAME,
+        "hyperparams": kwargs,
+        "train_samples": int(len(X_train)),
+        "n_iter": int(est.n_iter_),
+        "early_stopping_on": stopping_on,
+    }
+
+    if save_path is not None:
+        save_artifact(pipe, save_path)
+
+    return pipe, metrics, metadata
+
+
+class Model(ModelScript):
+    MODEL_NAME = MODEL_NAME
+    SUPPORTED_PROBLEM_TYPES = tuple(SUPPORTED_PROBLEM_TYPES)
+
+    def train_model(self, X_train, y_train, X_val=None, y_val=None, save_path=None, scale=True,
+                    transform_cache=None, **kwargs):
+        return train_model(X_train, y_train, X_val=X_val, y_val=y_val, save_path=save_path, scale=scale,
+                           transform_cache=transform_cache, **kwargs)
@@ -1,22 +1,84 @@
+import time
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
 
-from main.model_scripts.utils import _ensure_array, evaluate_classification_model
+from main.model_scripts.ann import HNSWKNeighborsClassifier, IVFKNeighborsClassifier, hnswlib
+
+from main.model_scripts.utils import (
+    _ensure_array,
+    evaluate_classification_model,
+    scale_features,
+    TransformCache,
+)
+from main.model_scripts.artifacts import save_artifact
 from main.model_scripts.base import ModelScript
 
 MODEL_NAME = "knn"
 SUPPORTED_PROBLEM_TYPES = ["classification"]
 
+# backend selection thresholds
+KD_TREE_MAX_DIM = 15
+BALL_TREE_MAX_DIM = 50
+ANN_MIN_SAMPLES = 200_000
+# train metrics are computed on at most this many rows (full-train kNN is O(n^2))
+MAX_EVAL_SAMPLES = 5000
+# queries used to measure ANN recall / speed against exact search
+TRADEOFF_SAMPLES = 500
+
+
+def _choose_backend(n_samples: int, n_features: int) -> str:
+    """Pick a neighbour search backend from the training set size and dimensionality."""
+    if n_features <= KD_TREE_MAX_DIM:
+        return "kd_tree"
+    if n_features <= BALL_TREE_MAX_DIM:
+        return "ball_tree"
+    if n_samples >= ANN_MIN_SAMPLES:
+        return "hnsw" if hnswlib is not None else "ivf"
+    return "brute"
+
+
+def _build_estimator(backend: str, n_samples: int, **est_kwargs):
+    if backend == "ivf":
+        return IVFKNeighborsClassifier(n_jobs=-1, **est_kwargs)
+    if backend == "hnsw":
+        return HNSWKNeighborsClassifier(**est_kwargs)
+    est_kwargs.setdefault("n_jobs", -1)  # parallel query batches across cores
+    if backend in ("kd_tree", "ball_tree"):
+        # bigger leaves amortise tree traversal on large sets, small ones prune better
+        est_kwargs.setdefault("leaf_size", int(np.clip(np.log2(max(n_samples, 2)) * 3, 20, 60)))
+    return KNeighborsClassifier(algorithm=backend, **est_kwargs)
+
 
-def _build_pipeline(scale: bool = True, **est_kwargs) -> Pipeline:
-    if scale:
-        return Pipeline([("scaler", StandardScaler()), ("est", KNeighborsClassifier(**est_kwargs))])
-    return Pipeline([("est", KNeighborsClassifier(**est_kwargs))])
+def _measure_tradeoff(est, X_fit, y_train, X_query) -> Dict[str, float]:
+    """Compare an approximate index with exact brute-force search on sample queries."""
+    n_neighbors = est.n_neighbors
+    exact = KNeighborsClassifier(n_neighbors=n_neighbors, algorithm="brute", n_jobs=-1).fit(X_fit, y_train)
+
+    start = time.perf_counter()
+    _, exact_idx = exact.kneighbors(X_query)
+    exact_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    _, approx_idx = est.kneighbors(X_query)
+    approx_seconds = time.perf_counter() - start
+
+    recall = np.mean([len(np.intersect1d(a, b)) / n_neighbors for a, b in zip(exact_idx, approx_idx)])
+    agreement = np.mean(exact.predict(X_query) == est.predict(X_query))
+    return {
+        "recall_at_k": float(recall),
+        "prediction_agreement": float(agreement),
+        "query_ms_per_row": 1000 * approx_seconds / len(X_query),
+        "exact_query_ms_per_row": 1000 * exact_seconds / len(X_query),
+    }
+
+
+def _build_pipeline(est, scaler=None) -> Pipeline:
+    if scaler is not None:
+        return Pipeline([("scaler", scaler), ("est", est)])
+    return Pipeline([("est", est)])
 
 
 def train_model(
@@ -26,24 +88,51 @@ def train_model(
     y_val: Optional[np.ndarray] = None,
     save_path: Optional[Path] = None,
     scale: bool = True,
+    transform_cache: Optional[TransformCache] = None,
     **kwargs,
 ) -> Tuple[Pipeline, Dict[str, Dict[str, float]], Dict[str, Any]]:
     X_train = _ensure_array(X_train)
     y_train = _ensure_array(y_train)
-    pipe = _build_pipeline(scale=scale, **kwargs)
-    pipe.fit(X_train, y_train)
+    has_val = X_val is not None and y_val is not None
+    if has_val:
+        X_val, y_val = _ensure_array(X_val), _ensure_array(y_val)
+    # the scaler fit and scaled arrays are shared with the other scripts via the cache
+    scaler, X_fit, X_val_fit = scale_features(X_train, X_val if has_val else None, scale, transform_cache)
+
+    est_kwargs = dict(kwargs)
+    backend = est_kwargs.pop("backend", "auto")
+    if "algorithm" in est_kwargs:
+        backend = est_kwargs.pop("algorithm")
+    if backend == "auto":
+        backend = _choose_backend(*X_fit.shape)
+    est = _build_estimator(backend, len(X_fit), **est_kwargs).fit(X_fit, y_train)
+    pipe = _build_pipeline(est, scaler)
 
-    metrics = {"train": evaluate_classification_model(pipe, X_train, y_train)}
-    if X_val is not None and y_val is not None:
-        metrics["val"] = evaluate_classification_model(pipe, X_val, y_val)
+    rng = np.random.default_rng(0)
+    eval_rows = np.arange(len(X_fit))
+    if len(X_fit) > MAX_EVAL_SAMPLES:
+        eval_rows = np.sort(rng.choice(len(X_fit), size=MAX_EVAL_SAMPLES, replace=False))
+    metrics = {"train": evaluate_classification_model(est, X_fit[eval_rows], y_train[eval_rows])}
+    if has_val:
+        metrics["val"] = evaluate_classification_model(est, X_val_fit, y_val)
 
-    metadata = {"name": MODEL_NAME, "hyperparams": kwargs, "train_samples": int(len(X_train))}
+    metadata = {
+        "name": MODEL_NAME,
+        "hyperparams": kwargs,
+        "train_samples": int(len(X_train)),
+        "backend": backend,
+        "train_metric_samples": int(len(eval_rows)),
+    }
+    if backend in ("kd_tree", "ball_tree"):
+        metadata["leaf_size"] = int(est.leaf_size)
+    if backend in ("ivf", "hnsw"):
+        X_query = X_val_fit if has_val else X_fit
+        n_query = min(TRADEOFF_SAMPLES, len(X_query))
+        X_query = X_query[rng.choice(len(X_query), size=n_query, replace=False)]
+        metadata["ann_tradeoff"] = _measure_tradeoff(est, X_fit, y_train, X_query)
 
     if save_path is not None:
-        save_path = Path(save_path)
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        import joblib
-        joblib.dump(pipe, save_path)
+        save_artifact(pipe, save_path, compress=0)  # the training set: memory-mapped on load
 
     return pipe, metrics, metadata
 
@@ -52,5 +141,7 @@ class Model(ModelScript):
     MODEL_NAME = MODEL_NAME
     SUPPORTED_PROBLEM_TYPES = tuple(SUPPORTED_PROBLEM_TYPES)
 
-    def train_model(self, X_train, y_train, X_val=None, y_val=None, save_path=None, scale=True, **kwargs):
-        return train_model(X_train, y_train, X_val=X_val, y_val=y_val, save_path=save_path, scale=scale, **kwargs)
+    def train_model(self, X_train, y_train, X_val=None, y_val=None, save_path=None, scale=True,
+                    transform_cache=None, **kwargs):
+        return train_model(X_train, y_train, X_val=X_val, y_val=y_val, save_path=save_path, scale=scale,
+                           transform_cache=transform_cache, **kwargs)
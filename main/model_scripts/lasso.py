@@ -4,19 +4,26 @@ from typing import Any, Dict, Optional, Tuple
 import numpy as np
 from sklearn.linear_model import Lasso
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
 
-from main.model_scripts.utils import _ensure_array, evaluate_model
+from main.model_scripts.utils import (
+    MIN_PATH_SAMPLES,
+    _ensure_array,
+    evaluate_model,
+    fit_regularization_path,
+    scale_features,
+    TransformCache,
+)
+from main.model_scripts.artifacts import save_artifact
 from main.model_scripts.base import ModelScript
 
 MODEL_NAME = "lasso"
 SUPPORTED_PROBLEM_TYPES = ["regression"]
 
 
-def _build_pipeline(scale: bool = True, **est_kwargs) -> Pipeline:
-    if scale:
-        return Pipeline([("scaler", StandardScaler()), ("est", Lasso(**est_kwargs))])
-    return Pipeline([("est", Lasso(**est_kwargs))])
+def _build_pipeline(est, scaler=None) -> Pipeline:
+    if scaler is not None:
+        return Pipeline([("scaler", scaler), ("est", est)])
+    return Pipeline([("est", est)])
 
 
 def train_model(
@@ -26,25 +33,36 @@ def train_model(
     y_val: Optional[np.ndarray] = None,
     save_path: Optional[Path] = None,
     scale: bool = True,
+    transform_cache: Optional[TransformCache] = None,
     **kwargs,
 ) -> Tuple[Pipeline, Dict[str, Dict[str, float]], Dict[str, Any]]:
     X_train = _ensure_array(X_train)
     y_train = _ensure_array(y_train)
-    pipe = _build_pipeline(scale=scale, **kwargs)
-    pipe.fit(X_train, y_train)
+    has_val = X_val is not None and y_val is not None
+    if has_val:
+        X_val, y_val = _ensure_array(X_val), _ensure_array(y_val)
+    # the scaler fit and scaled arrays are shared with the other scripts via the cache
+    scaler, X_fit, X_val_fit = scale_features(X_train, X_val if has_val else None, scale, transform_cache)
 
-    metrics = {"train": evaluate_model(pipe, X_train, y_train)}
-    if X_val is not None and y_val is not None:
-        metrics["val"] = evaluate_model(pipe, X_val, y_val)
+    path = None
+    if "alpha" in kwargs or y_train.ndim > 1 or len(X_train) < MIN_PATH_SAMPLES:
+        est = Lasso(**kwargs).fit(X_fit, y_train)
+    else:
+        # warm-started coordinate-descent path; alpha is picked on a holdout of
+        # the training rows, the val split only reports
+        est, path = fit_regularization_path(Lasso, X_fit, y_train, **kwargs)
+    pipe = _build_pipeline(est, scaler)
+
+    metrics = {"train": evaluate_model(est, X_fit, y_train)}
+    if has_val:
+        metrics["val"] = evaluate_model(est, X_val_fit, y_val)
 
     metadata = {"name": MODEL_NAME, "hyperparams": kwargs, "train_samples": int(len(X_train))}
+    if path is not None:
+        metadata["regularization_path"] = path
 
     if save_path is not None:
-        save_path = Path(save_path)
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        import joblib
-
-        joblib.dump(pipe, save_path)
+        save_artifact(pipe, save_path)
 
     return pipe, metrics, metadata
 
@@ -53,5 +71,7 @@ class Model(ModelScript):
     MODEL_NAME = MODEL_NAME
     SUPPORTED_PROBLEM_TYPES = tuple(SUPPORTED_PROBLEM_TYPES)
 
-    def train_model(self, X_train, y_train, X_val=None, y_val=None, save_path=None, scale=True, **kwargs):
-        return train_model(X_train, y_train, X_val=X_val, y_val=y_val, save_path=save_path, scale=scale, **kwargs)
+    def train_model(self, X_train, y_train, X_val=None, y_val=None, save_path=None, scale=True,
+                    transform_cache=None, **kwargs):
+        return train_model(X_train, y_train, X_val=X_val, y_val=y_val, save_path=save_path, scale=scale,
+                           transform_cache=transform_cache, **kwargs)
@@ -0,0 +1,78 @@
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.pipeline import Pipeline
+
+from main.model_scripts.utils import _ensure_array, choose_n_clusters, evaluate_clustering_model
+from main.model_scripts.artifacts import save_artifact
+from main.model_scripts.base import ModelScript
+
+
+MODEL_NAME = "minibatch_kmeans"
+SUPPORTED_PROBLEM_TYPES = ["clustering"]
+
+DEFAULT_PARAMS = {
+    "batch_size": 4096,
+    "n_init": 3,
+    "max_no_improvement": 10,
+    "random_state": 42,
+}
+
+
+def _build_pipeline(**est_kwargs) -> Pipeline:
+    return Pipeline([("est", MiniBatchKMeans(**{**DEFAULT_PARAMS, **est_kwargs}))])
+
+
+def train_model(
+    X_train: np.ndarray,
+    y_train: Optional[np.ndarray] = None,  # unused: clustering is unsupervised
+    X_val: Optional[np.ndarray] = None,
+    y_val: Optional[np.ndarray] = None,
+    save_path: Optional[Path] = None,
+    scale: bool = True,  # features arrive scaled from preprocessing; kept for compatibility
+    transform_cache=None,
+    **kwargs,
+) -> Tuple[Pipeline, Dict[str, Dict[str, float]], Dict[str, Any]]:
+    X_train = _ensure_array(X_train)
+    params = dict(kwargs)
+    selection = None
+    if "n_clusters" not in params:
+        selection = choose_n_clusters(X_train)
+        params["n_clusters"] = selection["n_clusters"]
+
+    # mini-batches keep each step O(batch_size * k) regardless of len(X_train)
+    pipe = _build_pipeline(**params)
+    pipe.fit(X_train)
+
+    metrics = {"train": evaluate_clustering_model(pipe, X_train)}
+    if X_val is not None:
+        metrics["val"] = evaluate_clustering_model(pipe, X_val)
+
+    est = pipe.named_steps["est"]
+    metadata = {
+        "name": MODEL_NAME,
+        "hyperparams": kwargs,
+        "train_samples": int(len(X_train)),
+        "n_clusters": int(params["n_clusters"]),
+        "inertia": float(est.inertia_),
+        "n_steps": int(est.n_steps_),
+    }
+    if selection is not None:
+        metadata["n_clusters_selection"] = selection
+
+    if save_path is not None:
+        save_artifact(pipe, save_path)
+
+    return pipe, metrics, metadata
+
+
+class Model(ModelScript):
+    MODEL_NAME = MODEL_NAME
+    SUPPORTED_PROBLEM_TYPES = tuple(SUPPORTED_PROBLEM_TYPES)
+
+    def train_model(self, X_train, y_train=None, X_val=None, y_val=None, save_path=None, scale=True,
+                    transform_cache=None, **kwargs):
+        return train_model(X_train, y_train, X_val=X_val, y_val=y_val, save_path=save_path, scale=scale,
+                           transform_cache=transform_cache, **kwargs)
@@ -4,19 +4,29 @@ from typing import Any, Dict, Optional, Tuple
 import numpy as np
 from sklearn.linear_model import Ridge
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
 
-from main.model_scripts.utils import _ensure_array, evaluate_model
+from main.model_scripts.utils import (
+    MIN_PATH_SAMPLES,
+    _ensure_array,
+    evaluate_model,
+    fit_ridge_path,
+    scale_features,
+    TransformCache,
+)
+from main.model_scripts.artifacts import save_artifact
 from main.model_scripts.base import ModelScript
 
 MODEL_NAME = "ridge"
 SUPPORTED_PROBLEM_TYPES = ["regression"]
 
+# alpha grid searched when no explicit alpha is given
+RIDGE_ALPHAS = np.logspace(-3, 3, 13)
 
-def _build_pipeline(scale: bool = True, **est_kwargs) -> Pipeline:
-    if scale:
-        return Pipeline([("scaler", StandardScaler()), ("est", Ridge(**est_kwargs))])
-    return Pipeline([("est", Ridge(**est_kwargs))])
+
+def _build_pipeline(est, scaler=None) -> Pipeline:
+    if scaler is not None:
+        return Pipeline([("scaler", scaler), ("est", est)])
+    return Pipeline([("est", est)])
 
 
 def train_model(
@@ -26,25 +36,38 @@ def train_model(
     y_val: Optional[np.ndarray] = None,
     save_path: Optional[Path] = None,
     scale: bool = True,
+    transform_cache: Optional[TransformCache] = None,
     **kwargs,
 ) -> Tuple[Pipeline, Dict[str, Dict[str, float]], Dict[str, Any]]:
     X_train = _ensure_array(X_train)
     y_train = _ensure_array(y_train)
-    pipe = _build_pipeline(scale=scale, **kwargs)
-    pipe.fit(X_train, y_train)
+    has_val = X_val is not None and y_val is not None
+    if has_val:
+        X_val, y_val = _ensure_array(X_val), _ensure_array(y_val)
+    # the scaler fit and scaled arrays are shared with the other scripts via the cache
+    scaler, X_fit, X_val_fit = scale_features(X_train, X_val if has_val else None, scale, transform_cache)
+
+    path = None
+    # the path solution is exact only for a centered, unconstrained fit
+    exact_path = kwargs.get("fit_intercept", True) and not kwargs.get("positive", False)
+    if "alpha" in kwargs or not exact_path or y_train.ndim > 1 or len(X_train) < MIN_PATH_SAMPLES:
+        est = Ridge(**kwargs).fit(X_fit, y_train)
+    else:
+        # one eigendecomposition reused for every alpha in the grid; alpha is
+        # chosen by leave-one-out on the training rows, the val split only reports
+        est, path = fit_ridge_path(X_fit, y_train, RIDGE_ALPHAS, **kwargs)
+    pipe = _build_pipeline(est, scaler)
 
-    metrics = {"train": evaluate_model(pipe, X_train, y_train)}
-    if X_val is not None and y_val is not None:
-        metrics["val"] = evaluate_model(pipe, X_val, y_val)
+    metrics = {"train": evaluate_model(est, X_fit, y_train)}
+    if has_val:
+        metrics["val"] = evaluate_model(est, X_val_fit, y_val)
 
     metadata = {"name": MODEL_NAME, "hyperparams": kwargs, "train_samples": int(len(X_train))}
+    if path is not None:
+        metadata["regularization_path"] = path
 
     if save_path is not None:
-        save_path = Path(save_path)
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        import joblib
-
-        joblib.dump(pipe, save_path)
+        save_artifact(pipe, save_path)
 
     return pipe, metrics, metadata
 
@@ -53,5 +76,7 @@ class Model(ModelScript):
     MODEL_NAME = MODEL_NAME
     SUPPORTED_PROBLEM_TYPES = tuple(SUPPORTED_PROBLEM_TYPES)
 
-    def train_model(self, X_train, y_train, X_val=None, y_val=None, save_path=None, scale=True, **kwargs):
-        return train_model(X_train, y_train, X_val=X_val, y_val=y_val, save_path=save_path, scale=scale, **kwargs)
+    def train_model(self, X_train, y_train, X_val=None, y_val=None, save_path=None, scale=True,
+                    transform_cache=None, **kwargs):
+        return train_model(X_train, y_train, X_val=X_val, y_val=y_val, save_path=save_path, scale=scale,
+                           transform_cache=transform_cache, **kwargs)
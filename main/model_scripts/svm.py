@@ -2,21 +2,54 @@ from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
-from sklearn.svm import SVC
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import SGDClassifier
+from sklearn.svm import SVC, LinearSVC
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
 
-from main.model_scripts.utils import _ensure_array, evaluate_classification_model
+from main.model_scripts.utils import (
+    _ensure_array,
+    evaluate_classification_model,
+    scale_features,
+    TransformCache,
+)
+from main.model_scripts.artifacts import save_artifact
 from main.model_scripts.base import ModelScript
 
 MODEL_NAME = "svm"
 SUPPORTED_PROBLEM_TYPES = ["classification"]
 
+# above this many training rows exact SVC (O(n^2)-O(n^3)) is replaced by a linear-time mode
+MAX_EXACT_SAMPLES = 20_000
+# from this many features a plain linear SVM is used instead of a kernel approximation
+LINEAR_MIN_FEATURES = 500
+NYSTROEM_COMPONENTS = 1000
+# kernel cache bounds for exact SVC, in MB
+MIN_CACHE_MB, MAX_CACHE_MB = 200, 2048
 
-def _build_pipeline(scale: bool = True, **est_kwargs) -> Pipeline:
-    if scale:
-        return Pipeline([("scaler", StandardScaler()), ("est", SVC(**est_kwargs))])
-    return Pipeline([("est", SVC(**est_kwargs))])
+
+def _choose_mode(n_samples: int, n_features: int, kernel: str, max_exact_samples: int) -> str:
+    if n_samples <= max_exact_samples:
+        return "svc"
+    if kernel == "linear" or n_features >= LINEAR_MIN_FEATURES:
+        return "linear"
+    return "nystroem"
+
+
+def _kernel_cache_mb(n_samples: int) -> int:
+    """Kernel cache large enough for the full float64 kernel matrix, within bounds."""
+    full_kernel_mb = n_samples * n_samples * 8 / 2 ** 20
+    return int(np.clip(full_kernel_mb, MIN_CACHE_MB, MAX_CACHE_MB))
+
+
+def _build_pipeline(est, scaler=None, features=None) -> Pipeline:
+    steps = []
+    if scaler is not None:
+        steps.append(("scaler", scaler))
+    if features is not None:
+        steps.append(("features", features))
+    steps.append(("est", est))
+    return Pipeline(steps)
 
 
 def train_model(
@@ -26,24 +59,57 @@ def train_model(
     y_val: Optional[np.ndarray] = None,
     save_path: Optional[Path] = None,
     scale: bool = True,
+    transform_cache: Optional[TransformCache] = None,
     **kwargs,
 ) -> Tuple[Pipeline, Dict[str, Dict[str, float]], Dict[str, Any]]:
     X_train = _ensure_array(X_train)
     y_train = _ensure_array(y_train)
-    pipe = _build_pipeline(scale=scale, **kwargs)
-    pipe.fit(X_train, y_train)
+    has_val = X_val is not None and y_val is not None
+    if has_val:
+        X_val, y_val = _ensure_array(X_val), _ensure_array(y_val)
+    # the scaler fit and scaled arrays are shared with the other scripts via the cache
+    scaler, X_fit, X_val_fit = scale_features(X_train, X_val if has_val else None, scale, transform_cache)
+
+    est_kwargs = dict(kwargs)
+    max_exact_samples = est_kwargs.pop("max_exact_samples", MAX_EXACT_SAMPLES)
+    mode = _choose_mode(*X_fit.shape, est_kwargs.get("kernel", "rbf"), max_exact_samples)
+
+    features = None
+    mode_info = {}
+    if mode == "svc":
+        est_kwargs.setdefault("cache_size", _kernel_cache_mb(len(X_fit)))
+        est = SVC(**est_kwargs).fit(X_fit, y_train)
+        mode_info = {"cache_size_mb": est.cache_size}
+    else:
+        C = est_kwargs.get("C", 1.0)
+        if mode == "nystroem":
+            # same width as SVC(gamma="scale")
+            gamma = est_kwargs.get("gamma", "scale")
+            if gamma == "scale":
+                gamma = 1.0 / (X_fit.shape[1] * X_fit.var())
+            n_components = min(NYSTROEM_COMPONENTS, len(X_fit))
+            features = Nystroem(kernel=est_kwargs.get("kernel", "rbf"), gamma=gamma,
+                                n_components=n_components, random_state=42).fit(X_fit)
+            X_fit = features.transform(X_fit)
+            if has_val:
+                X_val_fit = features.transform(X_val_fit)
+            mode_info = {"n_components": n_components, "gamma": float(gamma)}
+            # hinge-loss SGD on the approximate kernel features, regularization matched to C
+            est = SGDClassifier(loss="hinge", alpha=1.0 / (C * len(X_fit)), early_stopping=True,
+                                random_state=42).fit(X_fit, y_train)
+        else:
+            est = LinearSVC(C=C).fit(X_fit, y_train)
+    pipe = _build_pipeline(est, scaler, features)
 
-    metrics = {"train": evaluate_classification_model(pipe, X_train, y_train)}
-    if X_val is not None and y_val is not None:
-        metrics["val"] = evaluate_classification_model(pipe, X_val, y_val)
+    metrics = {"train": evaluate_classification_model(est, X_fit, y_train)}
+    if has_val:
+        metrics["val"] = evaluate_classification_model(est, X_val_fit, y_val)
 
-    metadata = {"name": MODEL_NAME, "hyperparams": kwargs, "train_samples": int(len(X_train))}
+    metadata = {"name": MODEL_NAME, "hyperparams": kwargs, "train_samples": int(len(X_train)), "mode": mode}
+    metadata.update(mode_info)
 
     if save_path is not None:
-        save_path = Path(save_path)
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        import joblib
-        joblib.dump(pipe, save_path)
+        save_artifact(pipe, save_path, compress=0)  # support vectors / kernel features: memory-mapped on load
 
     return pipe, metrics, metadata
 
@@ -52,5 +118,7 @@ class Model(ModelScript):
     MODEL_NAME = MODEL_NAME
     SUPPORTED_PROBLEM_TYPES = tuple(SUPPORTED_PROBLEM_TYPES)
 
-    def train_model(self, X_train, y_train, X_val=None, y_val=None, save_path=None, scale=True, **kwargs):
-        return train_model(X_train, y_train, X_val=X_val, y_val=y_val, save_path=save_path, scale=scale, **kwargs)
+    def train_model(self, X_train, y_train, X_val=None, y_val=None, save_path=None, scale=True,
+                    transform_cache=None, **kwargs):
+        return train_model(X_train, y_train, X_val=X_val, y_val=y_val, save_path=save_path, scale=scale,
+                           transform_cache=transform_cache, **kwargs)
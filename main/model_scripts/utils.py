@@ -1,9 +1,16 @@
-from typing import Any, Dict
+import copy
+from typing import Any, Dict, Optional
 
 import numpy as np
 import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.linear_model import Ridge, enet_path
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+from sklearn.metrics import silhouette_score, davies_bouldin_score, calinski_harabasz_score
 
 def _ensure_array(x):
     """Convert pandas objects to numpy arrays, otherwise return numpy array.
@@ -13,31 +20,253 @@ def _ensure_array(x):
     return np.asarray(x)
 
 
-def evaluate_model(model: Any, X: np.ndarray, y: np.ndarray) -> Dict[str, float]:
-    """Evaluate a fitted model and return common regression metrics.
+# below this many training rows alpha is not tuned along a path
+MIN_PATH_SAMPLES = 20
 
-    Returns a dict containing mse, rmse, mae and r2.
+# clustering metrics (silhouette is O(n^2)) are computed on at most this many rows
+METRIC_SAMPLE_SIZE = 10000
+# choosing k scores one fit per candidate, so it uses a smaller sample
+SELECTION_SAMPLE_SIZE = 5000
+
+
+class TransformCache:
+    """Fits preprocessing steps once per dataset and shares the transformed arrays.
+
+    Trainers create one cache per train_all and hand it to every model script.
+    Entries are keyed by the step's class and parameters plus the identity of the
+    array it is fit on, so e.g. StandardScaler() on X_train is fit and applied
+    once instead of once per script. The cache keeps references to the arrays it
+    has seen so their identities stay valid for its lifetime. Transformed arrays
+    are shared: callers must not modify them in place.
     """
-    X = _ensure_array(X)
-    y = _ensure_array(y)
-    preds = model.predict(X)
+
+    def __init__(self):
+        self._fitted: Dict[Any, Any] = {}
+        self._transformed: Dict[Any, np.ndarray] = {}
+        self._refs: Dict[int, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def step_key(step) -> tuple:
+        params = sorted((k, repr(v)) for k, v in step.get_params(deep=True).items())
+        return (type(step).__module__, type(step).__qualname__, tuple(params))
+
+    def _transform(self, key, fitted, X):
+        tkey = (key, id(X))
+        if tkey not in self._transformed:
+            self._refs[id(X)] = X
+            self._transformed[tkey] = fitted.transform(X)
+        return self._transformed[tkey]
+
+    def fit_transform(self, step, X_fit, *others):
+        """Return (private copy of the fitted step, transformed X_fit, *transformed others)."""
+        key = (self.step_key(step), id(X_fit))
+        if key in self._fitted:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._refs[id(X_fit)] = X_fit
+            self._fitted[key] = clone(step).fit(X_fit)
+        fitted = self._fitted[key]
+        arrays = [self._transform(key, fitted, X) for X in (X_fit,) + others]
+        return (copy.deepcopy(fitted), *arrays)
+
+
+def scale_features(X_train: np.ndarray, X_val: Optional[np.ndarray] = None, scale: bool = True,
+                   transform_cache: Optional[TransformCache] = None):
+    """Standard-scale X_train (and X_val) through the shared transform cache.
+
+    Returns (fitted scaler or None, X_train transformed, X_val transformed or None).
+    Without a cache the scaler is fit for this call only.
+    """
+    if not scale:
+        return None, X_train, X_val
+    cache = transform_cache if transform_cache is not None else TransformCache()
+    others = (X_val,) if X_val is not None else ()
+    scaler, X_train_t, *rest = cache.fit_transform(StandardScaler(), X_train, *others)
+    return scaler, X_train_t, (rest[0] if rest else None)
+
+
+def fit_regularization_path(
+    est_class,
+    X: np.ndarray,
+    y: np.ndarray,
+    X_val: Optional[np.ndarray] = None,
+    y_val: Optional[np.ndarray] = None,
+    l1_ratio: float = 1.0,
+    n_alphas: int = 30,
+    eps: float = 1e-3,
+    holdout: float = 0.2,
+    random_state: int = 42,
+    **est_kwargs,
+):
+    """Tune alpha for Lasso / ElasticNet with one warm-started coordinate-descent path.
+
+    enet_path walks a decreasing alpha grid, warm-starting each solve from the
+    previous one. Every alpha is scored on (X_val, y_val), or on a holdout split of
+    the training rows when no validation data is given, and est_class is then
+    refit at the best alpha warm-started from the path solution (converges in a
+    few iterations). X_val must already be transformed like X.
+
+    Returns (fitted estimator, path summary dict).
+    """
+    X_fit, y_fit = X, y
+    selection = "val"
+    if X_val is None or y_val is None:
+        rng = np.random.default_rng(random_state)
+        order = rng.permutation(len(X))
+        n_hold = int(len(X) * holdout)
+        X_val, y_val = X[order[:n_hold]], y[order[:n_hold]]
+        X, y = X[order[n_hold:]], y[order[n_hold:]]
+        selection = "holdout"
+
+    # the Gram eigendecomposition needs float64 even when the features are float32
+    x_mean = X.mean(axis=0, dtype=np.float64)
+    y_mean = y.mean(dtype=np.float64)
+    X_c = X.astype(np.float64)
+    X_c -= x_mean
+    y_c = y - y_mean
+    alpha_max = np.abs(X_c.T @ y_c).max() / (len(X) * l1_ratio)
+    alpha_max = alpha_max if alpha_max > 0 else 1.0
+    alphas = np.geomspace(alpha_max, alpha_max * eps, n_alphas)
+
+    alphas, coefs, _ = enet_path(X_c, y_c, l1_ratio=l1_ratio, alphas=alphas)
+    val_preds = (X_val - x_mean) @ coefs + y_mean
+    val_mse = ((val_preds - np.asarray(y_val)[:, None]) ** 2).mean(axis=0)
+    best = int(np.argmin(val_mse))
+
+    if "l1_ratio" in est_class().get_params():
+        est_kwargs["l1_ratio"] = l1_ratio
+    est = est_class(alpha=float(alphas[best]), warm_start=True, **est_kwargs)
+    est.coef_ = coefs[:, best].copy()
+    est.fit(X_fit, y_fit)
+
+    summary = {
+        "selection": selection,
+        "n_alphas": int(len(alphas)),
+        "alpha": float(alphas[best]),
+        "selection_mse": float(val_mse[best]),
+    }
+    return est, summary
+
+
+def fit_ridge_path(
+    X: np.ndarray,
+    y: np.ndarray,
+    alphas: np.ndarray,
+    X_val: Optional[np.ndarray] = None,
+    y_val: Optional[np.ndarray] = None,
+    **ridge_params,
+):
+    """Tune Ridge alpha from a single eigendecomposition of the centered Gram matrix.
+
+    With X_c^T X_c = V diag(e) V^T every alpha's solution is
+    V diag(1 / (e + alpha)) V^T X_c^T y, so the whole grid costs one O(n d^2)
+    decomposition plus cheap per-alpha products. Alphas are scored on
+    (X_val, y_val) (transformed like X) or, without validation data, by exact
+    leave-one-out residuals from the same decomposition.
+
+    Returns (Ridge fitted at the best alpha from the path solution, path summary dict).
+    ridge_params (solver, tol, ...) are set on the returned Ridge; they do not
+    change the closed-form solution, which assumes fit_intercept=True and
+    positive=False.
+    """
+    # the Gram eigendecomposition needs float64 even when the features are float32
+    x_mean = X.mean(axis=0, dtype=np.float64)
+    y_mean = y.mean(dtype=np.float64)
+    X_c = X.astype(np.float64)
+    X_c -= x_mean
+    y_c = y - y_mean
+
+    eigvals, V = np.linalg.eigh(X_c.T @ X_c)
+    eigvals = np.clip(eigvals, 0.0, None)
+    b = V.T @ (X_c.T @ y_c)
+    # coefficients of every alpha in the eigenbasis: (n_features, n_alphas)
+    B = b[:, None] / (eigvals[:, None] + alphas[None, :])
+
+    if X_val is not None and y_val is not None:
+        preds = ((X_val - x_mean) @ V) @ B + y_mean
+        scores = ((preds - np.asarray(y_val)[:, None]) ** 2).mean(axis=0)
+        selection = "val"
+    else:
+        XV = X_c @ V
+        fitted = XV @ B + y_mean
+        leverage = (XV ** 2) @ (1.0 / (eigvals[:, None] + alphas[None, :])) + 1.0 / len(X)
+        loo_resid = (y[:, None] - fitted) / np.clip(1.0 - leverage, 1e-12, None)
+        scores = (loo_resid ** 2).mean(axis=0)
+        selection = "loo"
+    best = int(np.argmin(scores))
+
+    est = Ridge(alpha=float(alphas[best]), **ridge_params)
+    est.coef_ = V @ B[:, best]
+    est.intercept_ = float(y_mean - x_mean @ est.coef_)
+    est.n_features_in_ = X.shape[1]
+
+    summary = {
+        "selection": selection,
+        "n_alphas": int(len(alphas)),
+        "alpha": float(alphas[best]),
+        "selection_mse": float(scores[best]),
+    }
+    return est, summary
+
+
+def extract_weights(pipe: Any) -> Optional[Dict[str, Any]]:
+    """Return the fitted weights of a pipeline's final estimator as JSON-ready lists.
+
+    {'coef': ..., 'intercept': ...} for linear models, {'feature_importances': ...}
+    for tree ensembles, None when the estimator exposes neither.
+    """
+    est = pipe.steps[-1][1] if isinstance(pipe, Pipeline) else pipe
+
+    def _plain(value):
+        value = np.asarray(value)
+        return value.item() if value.ndim == 0 else value.tolist()
+
+    if hasattr(est, "coef_"):
+        intercept = getattr(est, "intercept_", None)
+        return {"coef": _plain(est.coef_), "intercept": None if intercept is None else _plain(intercept)}
+    if hasattr(est, "feature_importances_"):
+        return {"feature_importances": _plain(est.feature_importances_)}
+    return None
+
+
+def regression_metrics(y: np.ndarray, preds: np.ndarray) -> Dict[str, float]:
+    """mse, rmse, mae and r2 of predictions against targets."""
     mse = mean_squared_error(y, preds)
     mae = mean_absolute_error(y, preds)
     r2 = r2_score(y, preds)
     rmse = np.sqrt(mse)
     return {"mse": mse, "rmse": rmse, "mae": mae, "r2": r2}
 
-def evaluate_classification_model(model: Any, X: np.ndarray, y: np.ndarray) -> Dict[str, float]:
-    """Evaluate classification model with common metrics."""
-    X = _ensure_array(X)
-    y = _ensure_array(y)
-    preds = model.predict(X)
+def classification_metrics(y: np.ndarray, preds: np.ndarray, scores: Optional[np.ndarray] = None) -> Dict[str, float]:
+    """Accuracy and weighted precision/recall/f1; roc_auc for binary targets when scores are given."""
     metrics = {
         "accuracy": accuracy_score(y, preds),
         "precision": precision_score(y, preds, average="weighted", zero_division=0),
         "recall": recall_score(y, preds, average="weighted", zero_division=0),
         "f1": f1_score(y, preds, average="weighted", zero_division=0),
     }
+    if scores is not None and len(np.unique(y)) == 2:
+        metrics["roc_auc"] = roc_auc_score(y, scores)
+    return metrics
+
+def evaluate_model(model: Any, X: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+    """Evaluate a fitted model and return common regression metrics.
+
+    Returns a dict containing mse, rmse, mae and r2.
+    """
+    X = _ensure_array(X)
+    y = _ensure_array(y)
+    return regression_metrics(y, model.predict(X))
+
+def evaluate_classification_model(model: Any, X: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+    """Evaluate classification model with common metrics."""
+    X = _ensure_array(X)
+    y = _ensure_array(y)
+    preds = model.predict(X)
+    metrics = classification_metrics(y, preds)
     if hasattr(model, "predict_proba"):
         try:
             probs = model.predict_proba(X)
@@ -45,4 +274,55 @@ def evaluate_classification_model(model: Any, X: np.ndarray, y: np.ndarray) -> D
                 metrics["roc_auc"] = roc_auc_score(y, probs[:, 1])
         except Exception:
             pass
+    elif hasattr(model, "decision_function"):
+        # e.g. SVMs without probability calibration: rank by the decision value
+        try:
+            scores = model.decision_function(X)
+            if scores.ndim == 1 and len(np.unique(y)) == 2:
+                metrics["roc_auc"] = roc_auc_score(y, scores)
+        except Exception:
+            pass
     return metrics
+
+def _sample_rows(X: np.ndarray, sample_size: int, random_state: int = 42) -> np.ndarray:
+    if len(X) <= sample_size:
+        return X
+    rng = np.random.default_rng(random_state)
+    return X[np.sort(rng.choice(len(X), size=sample_size, replace=False))]
+
+def clustering_metrics(X: np.ndarray, labels: np.ndarray) -> Dict[str, Optional[float]]:
+    """silhouette, davies_bouldin and calinski_harabasz; None when there is a single cluster."""
+    n_labels = len(np.unique(labels))
+    if n_labels < 2 or n_labels >= len(X):
+        return {"silhouette": None, "davies_bouldin": None, "calinski_harabasz": None, "n_clusters": n_labels}
+    return {
+        "silhouette": float(silhouette_score(X, labels)),
+        "davies_bouldin": float(davies_bouldin_score(X, labels)),
+        "calinski_harabasz": float(calinski_harabasz_score(X, labels)),
+        "n_clusters": n_labels,
+    }
+
+def evaluate_clustering_model(model: Any, X: np.ndarray, sample_size: int = METRIC_SAMPLE_SIZE,
+                              random_state: int = 42) -> Dict[str, Optional[float]]:
+    """Evaluate a fitted clusterer on a random sample of at most sample_size rows of X."""
+    X_s = _sample_rows(_ensure_array(X), sample_size, random_state)
+    metrics = clustering_metrics(X_s, model.predict(X_s))
+    metrics["metric_sample_size"] = int(len(X_s))
+    return metrics
+
+def choose_n_clusters(X: np.ndarray, k_values=range(2, 11), sample_size: int = SELECTION_SAMPLE_SIZE,
+                      random_state: int = 42) -> Dict[str, Any]:
+    """Pick the number of clusters with the best sampled silhouette of MiniBatchKMeans fits.
+
+    All fits and scores run on one row sample, so the cost does not grow with len(X).
+    """
+    X_s = _sample_rows(_ensure_array(X), sample_size, random_state)
+    scores = {}
+    for k in k_values:
+        if k >= len(X_s):
+            break
+        labels = MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=3).fit_predict(X_s)
+        if len(np.unique(labels)) > 1:
+            scores[int(k)] = float(silhouette_score(X_s, labels))
+    best = max(scores, key=scores.get) if scores else 2
+    return {"n_clusters": best, "silhouette_by_k": scores}
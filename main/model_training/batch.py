@@ -0,0 +1,168 @@
+"""Run the AutoML pipeline over many datasets with a shared worker pool.
+
+Datasets come from a manifest (JSON or CSV rows of file, target, problem) or
+a directory of uploads. Each worker process runs whole datasets one after
+another and keeps its imports warm between them; every dataset gets an equal
+share of the machine's cores, which its models then use in turn (BLAS /
+OpenMP pools and joblib n_jobs=-1 are capped to that share). Results are
+collected into one index file.
+"""
+import csv
+import io
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from threadpoolctl import threadpool_limits
+
+from main.preprocessing.ingest import SUPPORTED_SUFFIXES
+
+PROBLEM_TYPES = ("regression", "classification", "clustering")
+MANIFEST_NAMES = ("manifest.json", "manifest.csv")
+
+
+def _entry(file, problem, target=None, base_dir: Optional[Path] = None) -> Dict[str, Any]:
+    path = Path(file)
+    if base_dir is not None and not path.is_absolute():
+        path = base_dir / path
+    if problem not in PROBLEM_TYPES:
+        raise ValueError(f"❌ Unknown problem type '{problem}' for {path.name}; use one of {PROBLEM_TYPES}")
+    if problem != "clustering" and not target:
+        raise ValueError(f"❌ Target column must be provided for {problem} ({path.name}).")
+    return {"file": str(path), "problem": problem, "target": target or None}
+
+
+def load_batch_manifest(source, problem_type: Optional[str] = None,
+                        target_col: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Dataset entries {file, problem, target} to run.
+
+    source is a .json manifest (a list of {"file", "problem", "target"}
+    objects, or {"datasets": [...]}), a .csv manifest with those columns, or
+    a directory. A directory holding manifest.json / manifest.csv uses it;
+    otherwise every supported file in it is an entry with problem_type and
+    target_col. Relative paths are resolved against the manifest's folder.
+    """
+    source = Path(source)
+    if source.is_dir():
+        manifest = next((source / name for name in MANIFEST_NAMES if (source / name).exists()), None)
+        if manifest is None:
+            files = sorted(p for p in source.iterdir() if p.is_file() and p.suffix.lower() in SUPPORTED_SUFFIXES)
+            return [_entry(p, problem_type, target_col) for p in files]
+        source = manifest
+
+    if source.suffix.lower() == ".json":
+        with open(source, "r") as f:
+            rows = json.load(f)
+        rows = rows["datasets"] if isinstance(rows, dict) else rows
+    elif source.suffix.lower() == ".csv":
+        with open(source, "r", newline="") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        raise ValueError("❌ Batch source must be a directory, .json or .csv manifest")
+    return [_entry(row["file"], row.get("problem") or problem_type, row.get("target") or target_col,
+                   base_dir=source.parent) for row in rows]
+
+
+def allocate_cores(n_datasets: int, total_cores: Optional[int] = None,
+                   max_workers: Optional[int] = None) -> Tuple[int, int]:
+    """
+    (workers, cores_per_dataset): one worker per dataset up to the core count
+    (or max_workers), each dataset getting an equal share of the cores.
+    """
+    total_cores = total_cores or os.cpu_count() or 1
+    workers = max(1, min(n_datasets, max_workers or total_cores, total_cores))
+    return workers, max(1, total_cores // workers)
+
+
+def _warm_imports():
+    # loaded once per worker process, not once per dataset
+    import sklearn.ensemble  # noqa: F401
+    import sklearn.linear_model  # noqa: F401
+    import sklearn.svm  # noqa: F401
+    import main.model_training.orchestrator  # noqa: F401
+    import main.preprocessing.preprocessor  # noqa: F401
+
+
+def _run_dataset(run_fn: Callable[..., Dict[str, Any]], entry: Dict[str, Any], cores: int,
+                 log_path: Path) -> Dict[str, Any]:
+    """Run one dataset inside a worker, capped to `cores`, stdout to log_path."""
+    os.environ["LOKY_MAX_CPU_COUNT"] = str(cores)  # joblib n_jobs=-1
+    start = time.perf_counter()
+    row = {**entry, "dataset": Path(entry["file"]).stem, "cores": cores, "log": str(log_path)}
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    buf = io.StringIO()
+    try:
+        with threadpool_limits(limits=cores), redirect_stdout(buf):
+            results = run_fn(entry["file"], entry["problem"], entry["target"])
+        best = results.get("best_model")
+        metrics = (results.get(best) or {}).get("metrics") or {}
+        row.update({
+            "status": "ok",
+            "best_model": best,
+            "best_metrics": metrics.get("val") or metrics.get("train"),
+            "ranking": (results.get("ranking") or {}).get("ranking"),
+            "summary": results.get("summary_path"),
+        })
+    except Exception as e:  # one failing dataset must not stop the batch
+        row.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+        buf.write(traceback.format_exc())
+    finally:
+        with open(log_path, "w") as f:
+            f.write(buf.getvalue())
+    row["seconds"] = round(time.perf_counter() - start, 4)
+    return row
+
+
+def _write_index(index: Dict[str, Any], index_path: Path):
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = index_path.with_name(index_path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=4, default=str)
+    os.replace(tmp, index_path)
+
+
+def run_batch(datasets: List[Dict[str, Any]], run_fn: Callable[..., Dict[str, Any]], index_path,
+              total_cores: Optional[int] = None, max_workers: Optional[int] = None,
+              log_dir=None) -> Dict[str, Any]:
+    """
+    Run run_fn(file, problem, target) for every dataset entry on a process pool.
+
+    Larger files are submitted first so the longest runs do not end up last.
+    Per-dataset stdout goes to <log_dir>/<dataset>.log (default: next to the
+    index). The index {"workers", "cores_per_dataset", "seconds", "datasets"}
+    is rewritten atomically at index_path as each dataset finishes, so it also
+    shows progress; it is returned at the end.
+    """
+    index_path = Path(index_path)
+    log_dir = Path(log_dir) if log_dir is not None else index_path.parent / "batch_logs"
+    names = [Path(d["file"]).stem for d in datasets]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        # results and processed data are stored per file stem
+        raise ValueError(f"❌ Several batch files share a name: {', '.join(duplicates)}")
+
+    workers, cores = allocate_cores(len(datasets), total_cores, max_workers)
+    order = sorted(datasets, key=lambda d: Path(d["file"]).stat().st_size if Path(d["file"]).exists() else 0,
+                   reverse=True)
+    start = time.perf_counter()
+    index = {"workers": workers, "cores_per_dataset": cores, "seconds": None, "datasets": {}}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_imports) as pool:
+        futures = [pool.submit(_run_dataset, run_fn, entry, cores, log_dir / f"{Path(entry['file']).stem}.log")
+                   for entry in order]
+        for future in as_completed(futures):
+            row = future.result()
+            index["datasets"][row["dataset"]] = row
+            _write_index(index, index_path)
+
+    # index in manifest order
+    index["datasets"] = {n: index["datasets"][n] for n in names}
+    index["seconds"] = round(time.perf_counter() - start, 4)
+    _write_index(index, index_path)
+    return index
@@ -0,0 +1,65 @@
+import copy
+import pickle
+import time
+from typing import Any, Dict
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+
+def _n_jobs_params(pipe) -> Dict[str, Any]:
+    if not hasattr(pipe, "get_params"):
+        return {}
+    return {k: v for k, v in pipe.get_params(deep=True).items() if k == "n_jobs" or k.endswith("__n_jobs")}
+
+
+def in_memory_bytes(obj: Any) -> int:
+    """
+    Approximate memory footprint of a fitted model: pickle payload plus the
+    numpy buffers it references (taken out-of-band, so they are not copied).
+    """
+    buffers = []
+    payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    return len(payload) + sum(b.raw().nbytes for b in buffers)
+
+
+def benchmark_predict(pipe, X, batch_rows: int = 1000, warmup: int = 1, repeats: int = 3) -> Dict[str, Any]:
+    """
+    Measure single-core inference throughput of pipe.predict on a fixed batch.
+
+    The first batch_rows rows of X are predicted warmup times (discarded) and
+    then repeats times; the median run is reported. BLAS/OpenMP pools are
+    limited to one thread and any n_jobs parameters are set to 1, so
+    rows_per_second_per_core is comparable across models. n_jobs is set on
+    a copy: pipe itself may still be queued for writing by an ArtifactWriter.
+    """
+    batch = np.asarray(X)[:batch_rows]
+    n_jobs = _n_jobs_params(pipe)
+    if n_jobs:
+        pipe = copy.deepcopy(pipe)
+        pipe.set_params(**{k: 1 for k in n_jobs})
+    with threadpool_limits(limits=1):
+        for _ in range(warmup):
+            pipe.predict(batch)
+        runs = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            pipe.predict(batch)
+            runs.append(time.perf_counter() - start)
+
+    seconds = float(np.median(runs))
+    return {
+        "batch_rows": int(len(batch)),
+        "batch_seconds": round(seconds, 6),
+        "rows_per_second_per_core": round(len(batch) / max(seconds, 1e-9), 1),
+    }
+
+
+def profile_inference(pipe, X, batch_rows: int = 1000) -> Dict[str, Any]:
+    """Metadata entries for latency-aware selection: {"inference": ..., "memory_bytes": ...}."""
+    if not hasattr(pipe, "predict"):
+        return {}
+    return {
+        "inference": benchmark_predict(pipe, X, batch_rows=batch_rows),
+        "memory_bytes": in_memory_bytes(pipe),
+    }
@@ -0,0 +1,228 @@
+"""Cache of trained models keyed by (processed data, model script, hyperparameters).
+
+A key is the blake2b digest of:
+  • the processed arrays (shape, dtype and bytes of X/y train and val),
+  • the model script's source plus the sources of the main.model_scripts
+    helpers it uses, and the numpy / scikit-learn versions,
+  • the problem type and the keyword arguments passed to train_model.
+Identical inputs give identical keys across runs and machines, so re-running
+the pipeline on unchanged data (e.g. to re-rank with other selection weights)
+restores each model's artifact, metrics and validation outputs instead of
+training it again.
+
+Entries live in <root>/<key>/ and are evicted least recently used first when
+the cache exceeds max_bytes or max_entries, and when older than max_age_days.
+Several processes (batch workers) may share one cache: entries are built in
+per-process temporary folders and renamed into place, and an entry that
+vanishes or fails to load while being read counts as a miss.
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import sklearn
+from scipy.sparse import issparse
+
+from main.model_scripts.artifacts import load_artifact
+
+SCRIPTS_PACKAGE = "main.model_scripts"
+ARTIFACT_FILE = "model.joblib"
+RESULT_FILE = "result.json"
+VAL_OUTPUT_FILE = "val_output.npy"
+# bytes hashed per update when an array is not contiguous
+_HASH_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def _hash_array(h, X):
+    if X is None:
+        h.update(b"none")
+        return
+    if issparse(X):
+        X = X.tocsr()
+        h.update(f"sparse{X.shape}".encode())
+        for part in (X.data, X.indices, X.indptr):
+            _hash_array(h, part)
+        return
+    X = np.asarray(X)
+    h.update(f"{X.dtype.str}{X.shape}".encode())
+    if X.flags.c_contiguous:
+        h.update(memoryview(X.reshape(-1)).cast("B"))
+        return
+    rows = max(1, _HASH_BLOCK_BYTES // max(X[:1].nbytes, 1))
+    for start in range(0, X.shape[0], rows):
+        h.update(np.ascontiguousarray(X[start:start + rows]).tobytes())
+
+
+def data_fingerprint(*arrays) -> str:
+    """Digest of the arrays' shapes, dtypes and contents (None allowed)."""
+    h = hashlib.blake2b(digest_size=20)
+    for X in arrays:
+        _hash_array(h, X)
+    return h.hexdigest()
+
+
+def script_fingerprint(model_class: type) -> str:
+    """
+    Digest of the source of a model script (given its Model class), the
+    sources of the main.model_scripts modules it takes names from, and the
+    numpy / scikit-learn versions.
+    """
+    # the method's globals are its script's namespace, however the script was imported
+    namespace = model_class.train_model.__globals__
+    files = {namespace.get("__file__")}
+    for value in list(namespace.values()):
+        owner = value.__name__ if isinstance(value, ModuleType) else getattr(value, "__module__", None)
+        if isinstance(owner, str) and owner.startswith(SCRIPTS_PACKAGE):
+            files.add(getattr(sys.modules.get(owner), "__file__", None))
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"numpy={np.__version__};sklearn={sklearn.__version__}".encode())
+    for path in sorted(f for f in files if f):
+        h.update(Path(path).read_bytes())
+    return h.hexdigest()
+
+
+def model_key(model_class: type, data_fp: str, problem_type: str,
+              params: Optional[Dict[str, Any]] = None) -> str:
+    """Key of a model script's Model class trained on data_fp with params."""
+    payload = json.dumps({
+        "data": data_fp,
+        "script": script_fingerprint(model_class),
+        "model": model_class.MODEL_NAME,
+        "problem_type": problem_type,
+        "params": params or {},
+    }, sort_keys=True, default=repr)
+    return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+
+class TrainingCache:
+    """
+    On-disk store of trained model results, shared by all datasets and runs.
+
+    key() builds the cache key, load() restores a hit into the run's output
+    folder, store() adds a freshly trained model and evict() applies the
+    size / count / age limits (None disables a limit).
+    """
+
+    def __init__(self, root, max_bytes: Optional[int] = None, max_entries: Optional[int] = None,
+                 max_age_days: Optional[float] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, model_class: type, data_fp: str, problem_type: str,
+            params: Optional[Dict[str, Any]] = None) -> str:
+        return model_key(model_class, data_fp, problem_type, params)
+
+    def load(self, key: str, save_path) -> Optional[Tuple[Any, Dict[str, Any], Optional[np.ndarray]]]:
+        """
+        (pipeline, result, val_output) for a cached key, or None. The cached
+        artifact is copied to save_path, where a fresh fit would have saved it,
+        only once it has loaded. An entry that cannot be read is a miss and is
+        dropped; one removed meanwhile by another process is just a miss.
+        """
+        entry = self.root / key
+        if not (entry / RESULT_FILE).exists() or not (entry / ARTIFACT_FILE).exists():
+            self.misses += 1
+            return None
+        start = time.perf_counter()
+        save_path = Path(save_path)
+        save_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = save_path.with_name(f"{save_path.name}.{os.getpid()}.tmp")
+        try:
+            shutil.copyfile(entry / ARTIFACT_FILE, tmp)
+            with open(entry / RESULT_FILE, "r") as f:
+                result = json.load(f)
+            val_output = np.load(entry / VAL_OUTPUT_FILE) if (entry / VAL_OUTPUT_FILE).exists() else None
+            pipe = load_artifact(tmp)
+            os.utime(entry / RESULT_FILE)  # last use, for LRU eviction
+        except FileNotFoundError:  # evicted or replaced by another process meanwhile
+            tmp.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        except Exception:  # truncated / corrupt entry: drop it and retrain
+            tmp.unlink(missing_ok=True)
+            shutil.rmtree(entry, ignore_errors=True)
+            self.misses += 1
+            return None
+        os.replace(tmp, save_path)  # the run's artifact is only replaced by one that loads
+
+        metadata = result["metadata"]
+        if isinstance(metadata.get("artifact"), dict):
+            metadata["artifact"] = {**metadata["artifact"], "path": str(save_path)}
+        metadata["cache"] = {"hit": True, "key": key, "restore_seconds": round(time.perf_counter() - start, 4)}
+        self.hits += 1
+        return pipe, result, val_output
+
+    def store(self, key: str, save_path, result: Dict[str, Any], val_output: Optional[np.ndarray] = None):
+        """
+        Add a trained model (its artifact at save_path) under key; marks result
+        as a cache miss. Best effort: if another process stores the same key
+        at the same time, one of the two entries is kept.
+        """
+        save_path = Path(save_path)
+        if not save_path.exists():
+            return
+        result["metadata"]["cache"] = {"hit": False, "key": key}
+        entry = self.root / key
+        tmp = self.root / f".{key}.{os.getpid()}.tmp"  # per process: batch workers share the cache
+        try:
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir(parents=True)
+            shutil.copyfile(save_path, tmp / ARTIFACT_FILE)
+            if val_output is not None:
+                np.save(tmp / VAL_OUTPUT_FILE, np.asarray(val_output))
+            with open(tmp / RESULT_FILE, "w") as f:
+                json.dump(result, f, default=str)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)  # an entry is complete or absent
+        except OSError:  # e.g. the same key stored concurrently by another process
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def entries(self):
+        """[(key, bytes, last_used)] of complete entries, least recently used first."""
+        if not self.root.exists():
+            return []
+        rows = []
+        for entry in self.root.iterdir():
+            result = entry / RESULT_FILE
+            if entry.name.startswith("."):
+                continue
+            try:
+                size = sum(p.stat().st_size for p in entry.iterdir() if p.is_file())
+                rows.append((entry.name, size, result.stat().st_mtime))
+            except FileNotFoundError:  # incomplete, or evicted by another process
+                continue
+        return sorted(rows, key=lambda row: row[2])
+
+    def evict(self) -> Dict[str, Any]:
+        """Apply the limits; returns the evicted keys and the cache's remaining size."""
+        rows = self.entries()
+        now = time.time()
+        evicted = []
+        if self.max_age_days is not None:
+            expired = [r for r in rows if now - r[2] > self.max_age_days * 86400]
+            evicted.extend(expired)
+            rows = [r for r in rows if r not in expired]
+        total = sum(r[1] for r in rows)
+        while rows and ((self.max_entries is not None and len(rows) > self.max_entries)
+                        or (self.max_bytes is not None and total > self.max_bytes)):
+            oldest = rows.pop(0)
+            total -= oldest[1]
+            evicted.append(oldest)
+        for key, _, _ in evicted:
+            shutil.rmtree(self.root / key, ignore_errors=True)
+        return {"evicted": [r[0] for r in evicted], "entries": len(rows), "bytes": total}
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self.entries()
+        return {"hits": self.hits, "misses": self.misses, "entries": len(rows), "bytes": sum(r[1] for r in rows)}
@@ -0,0 +1,150 @@
+"""Checkpoints that let an interrupted pipeline run resume where it stopped.
+
+A RunCheckpoint lives in <results_dir>/checkpoints/:
+  • run.json records the pipeline stages completed for one set of run inputs
+    (run_key); other inputs start from an empty stage list.
+  • models/<name>.json (+ <name>.val.npy) is written as soon as a model's
+    artifact is on disk: its result, validation outputs, its model key (see
+    cache.model_key) and the artifact's size / mtime. A later run training the
+    same script on the same data restores it instead of training again.
+Every file is written to a temporary name and renamed, so a run killed at
+any point leaves either the previous or the new checkpoint, never a torn one.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from main.model_scripts.artifacts import load_artifact
+
+RUN_FILE = "run.json"
+MODELS_DIR = "models"
+
+
+def _write_json(path: Path, obj: Any):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(obj, f, indent=4, default=str)
+    os.replace(tmp, path)
+
+
+def _artifact_stamp(path: Path) -> Dict[str, int]:
+    stat = path.stat()
+    return {"bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def run_key(**inputs) -> str:
+    """Digest of a run's inputs (JSON-serialisable keyword arguments)."""
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class RunCheckpoint:
+    """Stage and per-model checkpoints of one results folder."""
+
+    def __init__(self, directory, key: str):
+        self.directory = Path(directory)
+        self.key = key
+        self.resumed = []
+        state = None
+        if (self.directory / RUN_FILE).exists():
+            try:
+                with open(self.directory / RUN_FILE, "r") as f:
+                    state = json.load(f)
+            except ValueError:  # unreadable: start over
+                state = None
+        if state is None or state.get("run_key") != key:
+            state = {"run_key": key, "stages": {}}
+            _write_json(self.directory / RUN_FILE, state)
+        self.state = state
+
+    def stage(self, name: str) -> Optional[Dict[str, Any]]:
+        """Info saved when stage `name` completed for these inputs, or None."""
+        return self.state["stages"].get(name)
+
+    def complete_stage(self, name: str, info: Optional[Dict[str, Any]] = None):
+        self.state["stages"][name] = {**(info or {}), "completed_at": time.time()}
+        _write_json(self.directory / RUN_FILE, self.state)
+
+    def _model_paths(self, model_name: str) -> Tuple[Path, Path]:
+        models = self.directory / MODELS_DIR
+        return models / f"{model_name}.json", models / f"{model_name}.val.npy"
+
+    def save_model(self, model_name: str, key: str, save_path, result: Dict[str, Any],
+                   val_output: Optional[np.ndarray] = None):
+        """Checkpoint a trained model; call only once its artifact at save_path is written."""
+        json_path, val_path = self._model_paths(model_name)
+        if val_output is not None:
+            val_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = val_path.with_name(val_path.stem + ".tmp.npy")
+            np.save(tmp, np.asarray(val_output))
+            os.replace(tmp, val_path)
+        else:
+            val_path.unlink(missing_ok=True)
+        _write_json(json_path, {"key": key, "artifact": _artifact_stamp(Path(save_path)), "result": result})
+
+    def restore_model(self, model_name: str, key: str, save_path):
+        """
+        (pipeline, result, val_output) checkpointed for key, or None when there
+        is none, it is for other inputs, or the artifact has changed since.
+        """
+        json_path, val_path = self._model_paths(model_name)
+        save_path = Path(save_path)
+        if not json_path.exists() or not save_path.exists():
+            return None
+        with open(json_path, "r") as f:
+            saved = json.load(f)
+        if saved.get("key") != key or saved.get("artifact") != _artifact_stamp(save_path):
+            return None
+        val_output = np.load(val_path) if val_path.exists() else None
+        pipe = load_artifact(save_path)
+        result = saved["result"]
+        result["metadata"]["resumed"] = True
+        self.resumed.append(model_name)
+        return pipe, result, val_output
+
+
+def restore_model(model_name: str, key: Optional[str], save_path, cache=None,
+                  checkpoint: Optional[RunCheckpoint] = None):
+    """
+    A previous fit of this model on these inputs: from the run's checkpoint,
+    else the cache. Anything that fails to restore is None, so the model is
+    trained again instead of failing the run.
+    """
+    if key is None:
+        return None
+    restored = None
+    try:
+        if checkpoint is not None:
+            restored = checkpoint.restore_model(model_name, key, save_path)
+        if restored is None and cache is not None:
+            restored = cache.load(key, save_path)
+            if restored is not None and checkpoint is not None:
+                _, result, val_output = restored
+                checkpoint.save_model(model_name, key, save_path, result, val_output)
+    except Exception as e:
+        print(f"⚠️ Could not restore {model_name} ({type(e).__name__}: {e}); training it again")
+        restored = None
+    return restored
+
+
+def record_model(writer, model_name: str, key: Optional[str], save_path, result: Dict[str, Any],
+                 val_output: Optional[np.ndarray] = None, cache=None,
+                 checkpoint: Optional[RunCheckpoint] = None):
+    """Once the artifact at save_path is written, add the model to the cache and checkpoint it."""
+    if key is None or (cache is None and checkpoint is None):
+        return
+
+    def record(info):
+        result["metadata"]["artifact"] = info
+        if cache is not None:
+            cache.store(key, save_path, result, val_output)
+        if checkpoint is not None:
+            checkpoint.save_model(model_name, key, save_path, result, val_output)
+
+    writer.when_written(save_path, record)
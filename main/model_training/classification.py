@@ -1,28 +1,51 @@
 import importlib.util
+import time
 from pathlib import Path
 from typing import Dict, Any
 
+from main.model_scripts.artifacts import ArtifactWriter
 from main.model_scripts.base import validate_module
+from main.model_scripts.utils import TransformCache, extract_weights
+from main.model_training.benchmark import profile_inference
+from main.model_training.cache import data_fingerprint, model_key
+from main.model_training.checkpoint import record_model, restore_model
+from main.model_training.isolation import ModelSupervisor, failure_record
 
 
 class ClassificationTrainer:
-    def __init__(self, scripts_path: Path, output_path: Path):
+    def __init__(self, scripts_path: Path, output_path: Path, compress=None, cache=None,
+                 checkpoint=None, isolation=None):
         """
         Handles automatic discovery, validation, and training of classification model scripts.
 
         Args:
             scripts_path (Path): Directory containing classification model scripts.
             output_path (Path): Directory to save trained model pipelines.
+            compress: joblib compression for every saved pipeline (0 keeps them
+                mmap-loadable); None keeps each script's (see artifacts.py).
+            cache: optional TrainingCache; models whose (data, script, params)
+                key is cached are restored instead of trained.
+            checkpoint: optional RunCheckpoint; models already trained by an
+                interrupted run on the same inputs are restored from it.
+            isolation: optional ResourceLimits; each script then trains in a
+                supervised subprocess under those limits (see isolation.py).
         """
         self.scripts_path = scripts_path
         self.output_path = output_path
+        self.compress = compress
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.isolation = isolation
+        self.failures = {}
+        self.pipelines = {}
+        self.val_outputs = {}
 
     def _load_models(self):
         """Dynamically discover and validate all compatible classification model scripts."""
         model_classes = []
 
         for f in self.scripts_path.glob("*.py"):
-            if f.name in ("__init__.py", "base.py", "utils.py"):
+            if f.name in ("__init__.py", "base.py", "utils.py", "ann.py", "artifacts.py"):
                 continue
 
             spec = importlib.util.spec_from_file_location(f.stem, f)
@@ -39,40 +62,113 @@ class ClassificationTrainer:
 
         return model_classes
 
-    def train_all(self, X_train, y_train, X_val=None, y_val=None):
+    def _train_one(self, ModelClass, X_train, y_train, X_val, y_val, save_path, transform_cache, model_params):
+        model_name = ModelClass.MODEL_NAME
+        model_obj = ModelClass()
+        print(f"🚀 Training {model_name}...")
+
+        start = time.perf_counter()
+        pipe, metrics, metadata = model_obj.train_model(
+            X_train=X_train,
+            y_train=y_train,
+            X_val=X_val,
+            y_val=y_val,
+            save_path=save_path,
+            transform_cache=transform_cache,
+            **model_params
+        )
+        metadata["fit_seconds"] = round(time.perf_counter() - start, 4)
+        val_proba = None
+        if X_val is not None:
+            start = time.perf_counter()
+            pipe.predict(X_val)
+            metadata["predict_seconds"] = round(time.perf_counter() - start, 4)
+            if hasattr(pipe, "predict_proba"):
+                try:
+                    val_proba = pipe.predict_proba(X_val)
+                except Exception:  # e.g. SVC built without probability=True
+                    pass
+        # single-core throughput on a fixed batch and in-memory size
+        metadata.update(profile_inference(pipe, X_val if X_val is not None else X_train))
+
+        self.pipelines[model_name] = pipe
+        if val_proba is not None:
+            self.val_outputs[model_name] = val_proba
+        print(f"✅ Completed {model_name}")
+        return {
+            "metrics": metrics,
+            "metadata": metadata,
+            "weights": extract_weights(pipe)
+        }
+
+    def train_all(self, X_train, y_train, X_val=None, y_val=None, include=None, params=None):
         """
         Trains all discovered classification models and saves their pipelines.
 
         Args:
             X_train, y_train: Training data and labels.
             X_val, y_val: Optional validation data.
+            include: Optional collection of MODEL_NAMEs; other models are skipped.
+            params: Optional {MODEL_NAME: extra train_model keyword arguments}.
 
         Returns:
-            Dict[str, Dict[str, Any]]: model_name → {"metrics": {...}, "metadata": {...}}
+            Dict[str, Dict[str, Any]]: model_name → {"metrics": {...}, "metadata": {...}, "weights": {...}}
+            Fitted pipelines and their validation predict_proba outputs stay
+            available in memory as self.pipelines and self.val_outputs.
+            metadata["artifact"] holds the saved file's size and write/load seconds.
+            A script that raises is left out and reported in self.failures
+            (model_name → {"error", "traceback"}); the others still train.
         """
         models = self._load_models()
+        if include is not None:
+            models = [m for m in models if m.MODEL_NAME in include]
         results = {}
-
-        for ModelClass in models:
-            model_name = ModelClass.MODEL_NAME
-            save_path = self.output_path / f"{model_name}.joblib"
-
-            model_obj = ModelClass()
-            print(f"🚀 Training {model_name}...")
-
-            pipe, metrics, metadata = model_obj.train_model(
-                X_train=X_train,
-                y_train=y_train,
-                X_val=X_val,
-                y_val=y_val,
-                save_path=save_path
-            )
-
-            results[model_name] = {
-                "metrics": metrics,
-                "metadata": metadata
-            }
-
-            print(f"✅ Completed {model_name}")
+        self.pipelines = {}
+        # validation predict_proba per model, reused by the ensemble stage
+        self.val_outputs = {}
+        # preprocessing fits (e.g. the StandardScaler) are shared by all scripts of this run
+        transform_cache = TransformCache()
+        reuse = self.cache is not None or self.checkpoint is not None
+        data_fp = data_fingerprint(X_train, y_train, X_val, y_val) if reuse else None
+        self.failures = {}
+        restored = set()
+
+        # artifacts are written by a background thread while the next model trains
+        supervisor = ModelSupervisor(self, (X_train, y_train, X_val, y_val), self.isolation)
+        with ArtifactWriter(compress=self.compress) as writer, supervisor:
+            for ModelClass in models:
+                model_name = ModelClass.MODEL_NAME
+                save_path = self.output_path / f"{model_name}.joblib"
+                model_params = (params or {}).get(model_name, {})
+                key = model_key(ModelClass, data_fp, "classification", model_params) if reuse else None
+
+                previous = restore_model(model_name, key, save_path, self.cache, self.checkpoint)
+                if previous is not None:
+                    pipe, results[model_name], val_proba = previous
+                    self.pipelines[model_name] = pipe
+                    if val_proba is not None:
+                        self.val_outputs[model_name] = val_proba
+                    restored.add(model_name)
+                    print(f"♻️ Reused {model_name}")
+                    continue
+
+                try:
+                    if self.isolation is not None:
+                        results[model_name] = supervisor.train(ModelClass, save_path, model_params, writer)
+                    else:
+                        results[model_name] = self._train_one(ModelClass, X_train, y_train, X_val, y_val, save_path,
+                                                              transform_cache, model_params)
+                except Exception as e:  # one failing script must not abort the others
+                    self.failures[model_name] = failure_record(e)
+                    print(f"❌ {model_name} failed: {self.failures[model_name]['error']}")
+                    continue
+                record_model(writer, model_name, key, save_path, results[model_name],
+                             self.val_outputs.get(model_name), self.cache, self.checkpoint)
+
+        for model_name, result in results.items():
+            if model_name not in restored:
+                result["metadata"]["artifact"] = writer.info_for(self.output_path / f"{model_name}.joblib")
+        if self.cache is not None:
+            self.cache.evict()
 
         return results
@@ -0,0 +1,138 @@
+import importlib
+import pkgutil
+import time
+from pathlib import Path
+
+from main.model_scripts.artifacts import ArtifactWriter
+from main.model_scripts.base import validate_module
+from main.model_scripts.utils import TransformCache, extract_weights
+from main.model_training.benchmark import profile_inference
+from main.model_training.cache import data_fingerprint, model_key
+from main.model_training.checkpoint import record_model, restore_model
+from main.model_training.isolation import ModelSupervisor, failure_record
+
+
+class ClusteringTrainer:
+    def __init__(self, scripts_path: Path, output_path: Path, compress=None, cache=None,
+                 checkpoint=None, isolation=None):
+        """
+        Discovers and trains the clustering model scripts.
+
+        Args:
+            scripts_path (Path): Directory containing model scripts.
+            output_path (Path): Directory to save trained model pipelines.
+            compress: joblib compression for every saved pipeline (0 keeps them
+                mmap-loadable); None keeps each script's (see artifacts.py).
+            cache: optional TrainingCache; models whose (data, script, params)
+                key is cached are restored instead of trained.
+            checkpoint: optional RunCheckpoint; models already trained by an
+                interrupted run on the same inputs are restored from it.
+            isolation: optional ResourceLimits; each script then trains in a
+                supervised subprocess under those limits (see isolation.py).
+        """
+        self.scripts_path = scripts_path
+        self.output_path = output_path
+        self.compress = compress
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.isolation = isolation
+        self.failures = {}
+        self.pipelines = {}
+
+    def _load_models(self):
+        """Import model scripts as main.model_scripts.<name> and keep the clustering ones."""
+        model_classes = []
+        for _, module_name, _ in pkgutil.iter_modules([str(self.scripts_path)]):
+            module = importlib.import_module(f"main.model_scripts.{module_name}")
+
+            ok, _ = validate_module(module)
+            if not ok:
+                continue
+            if "clustering" not in getattr(module, "SUPPORTED_PROBLEM_TYPES", []):
+                continue
+
+            ModelClass = getattr(module, "Model", None)
+            if ModelClass is not None:
+                model_classes.append(ModelClass)
+
+        return model_classes
+
+    def _train_one(self, ModelClass, X, X_val, save_path, transform_cache, model_params):
+        start = time.perf_counter()
+        pipe, metrics, metadata = ModelClass().train_model(
+            X_train=X,
+            y_train=None,
+            X_val=X_val,
+            save_path=save_path,
+            transform_cache=transform_cache,
+            **model_params
+        )
+        metadata["fit_seconds"] = round(time.perf_counter() - start, 4)
+        # single-core throughput on a fixed batch and in-memory size
+        metadata.update(profile_inference(pipe, X_val if X_val is not None else X))
+
+        self.pipelines[ModelClass.MODEL_NAME] = pipe
+        return {
+            "metrics": metrics,
+            "metadata": metadata,
+            "weights": extract_weights(pipe)
+        }
+
+    def train_all(self, X, X_val=None, include=None, params=None):
+        """
+        Train all clustering model scripts on X (no labels).
+
+        Scripts fit with mini-batches / a streaming CF-tree and report
+        silhouette, Davies-Bouldin and Calinski-Harabasz on a row sample
+        (metrics["train"], and metrics["val"] when X_val is given).
+        If include is given, only models whose MODEL_NAME is in it are trained.
+        params maps MODEL_NAME to extra train_model keyword arguments.
+        Fitted pipelines stay available in memory as self.pipelines.
+        A script that raises is left out and reported in self.failures.
+        """
+        models = self._load_models()
+        if include is not None:
+            models = [m for m in models if m.MODEL_NAME in include]
+        results = {}
+        self.pipelines = {}
+        transform_cache = TransformCache()
+        reuse = self.cache is not None or self.checkpoint is not None
+        data_fp = data_fingerprint(X, X_val) if reuse else None
+        self.failures = {}
+        restored = set()
+
+        # artifacts are written by a background thread while the next model trains
+        supervisor = ModelSupervisor(self, (X, X_val), self.isolation)
+        with ArtifactWriter(compress=self.compress) as writer, supervisor:
+            for ModelClass in models:
+                model_name = ModelClass.MODEL_NAME
+                save_path = self.output_path / f"{model_name}.joblib"
+                model_params = (params or {}).get(model_name, {})
+                key = model_key(ModelClass, data_fp, "clustering", model_params) if reuse else None
+
+                previous = restore_model(model_name, key, save_path, self.cache, self.checkpoint)
+                if previous is not None:
+                    self.pipelines[model_name], results[model_name], _ = previous
+                    restored.add(model_name)
+                    continue
+
+                try:
+                    if self.isolation is not None:
+                        results[model_name] = supervisor.train(ModelClass, save_path, model_params, writer)
+                    else:
+                        results[model_name] = self._train_one(ModelClass, X, X_val, save_path,
+                                                              transform_cache, model_params)
+                except Exception as e:  # one failing script must not abort the others
+                    self.failures[model_name] = failure_record(e)
+                    print(f"❌ {model_name} failed: {self.failures[model_name]['error']}")
+                    continue
+                record_model(writer, model_name, key, save_path, results[model_name],
+                             cache=self.cache, checkpoint=self.checkpoint)
+
+        for model_name, result in results.items():
+            if model_name not in restored:
+                result["metadata"]["artifact"] = writer.info_for(self.output_path / f"{model_name}.joblib")
+        if self.cache is not None:
+            self.cache.evict()
+
+        return results
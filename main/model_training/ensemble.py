@@ -0,0 +1,141 @@
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from main.model_scripts.artifacts import save_artifact
+from main.model_scripts.utils import classification_metrics, regression_metrics
+from main.model_training.benchmark import profile_inference
+
+ENSEMBLE_NAME = "ensemble"
+# clip for log loss on blended probabilities
+_PROBA_EPS = 1e-15
+
+
+class EnsembleModel:
+    """Weighted average of fitted pipelines (predictions, or predict_proba for classification)."""
+
+    def __init__(self, estimators: Dict[str, Any], weights: Dict[str, float], problem_type: str):
+        self.estimators = estimators
+        self.weights = weights
+        self.problem_type = problem_type
+        if problem_type == "classification":
+            self.classes_ = next(iter(estimators.values())).classes_
+
+    def _blend(self, method: str, X):
+        return sum(w * getattr(self.estimators[name], method)(X) for name, w in self.weights.items())
+
+    def predict_proba(self, X):
+        return self._blend("predict_proba", X)
+
+    def predict(self, X):
+        if self.problem_type == "classification":
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+        return self._blend("predict", X)
+
+
+def _losses(candidates: np.ndarray, y, problem_type: str) -> np.ndarray:
+    """Loss of each candidate blend: MSE on predictions, log loss on true-class probabilities."""
+    if problem_type == "classification":
+        return -np.log(np.clip(candidates, _PROBA_EPS, 1.0)).mean(axis=1)
+    err = candidates - y
+    return (err ** 2).reshape(len(candidates), -1).mean(axis=1)
+
+
+def caruana_selection(outputs: np.ndarray, y, problem_type: str, n_rounds: int = 50) -> np.ndarray:
+    """
+    Greedy forward ensemble selection with replacement (Caruana et al., 2004).
+
+    outputs: (n_models, n_samples[, n_targets]) validation predictions, or for
+    classification (n_models, n_samples) probabilities of the true class (the
+    blended true-class probability is the blend of these).
+    Starts from the best single model and, each round, adds the model whose
+    inclusion lowers the blend's loss most, all candidates scored at once.
+    Returns per-model weights (selection counts / rounds).
+    """
+    counts = np.zeros(len(outputs))
+    best = int(np.argmin(_losses(outputs, y, problem_type)))
+    counts[best] = 1
+    total = outputs[best].copy()
+    for size in range(2, n_rounds + 1):
+        candidates = (total[None] + outputs) / size
+        pick = int(np.argmin(_losses(candidates, y, problem_type)))
+        counts[pick] += 1
+        total += outputs[pick]
+    return counts / counts.sum()
+
+
+def _true_class_proba(probas: np.ndarray, y, classes) -> np.ndarray:
+    idx = np.searchsorted(classes, y)
+    return np.take_along_axis(probas, idx[None, :, None], axis=2)[..., 0]
+
+
+def build_ensemble(val_outputs: Dict[str, np.ndarray], y_val, problem_type: str, pipelines: Dict[str, Any],
+                   base_results: Optional[Dict[str, Dict]] = None, output_path: Optional[Path] = None,
+                   X_val=None, n_rounds: int = 50, random_state: int = 42,
+                   compress=None) -> Optional[Dict[str, Any]]:
+    """
+    Blend already-trained models from their cached validation outputs
+    (predictions for regression, predict_proba for classification); no base
+    model is refit.
+
+    The reported val metrics are cross-fitted: weights chosen on one half of
+    the validation split score the other half and vice versa. The final
+    weights are then selected on the whole split. Returns a trainer-style
+    result {"metrics", "metadata", "weights"} plus the fitted EnsembleModel
+    under "model", or None when fewer than two models have usable outputs.
+    """
+    names = [n for n in val_outputs if val_outputs[n] is not None and n in pipelines]
+    if problem_type == "classification":
+        classes = np.unique([c for n in names for c in pipelines[n].classes_])
+        names = [n for n in names if np.array_equal(pipelines[n].classes_, classes)]
+    if len(names) < 2 or y_val is None:
+        return None
+
+    start = time.perf_counter()
+    y_val = np.asarray(y_val)
+    outputs = np.stack([np.asarray(val_outputs[n], dtype=float) for n in names])
+    scored = _true_class_proba(outputs, y_val, classes) if problem_type == "classification" else outputs
+
+    # cross-fitted out-of-sample blend for honest val metrics
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(len(y_val))
+    halves = (order[: len(order) // 2], order[len(order) // 2:])
+    oof = np.empty_like(outputs[0])
+    for fit_idx, eval_idx in (halves, halves[::-1]):
+        w = caruana_selection(scored[:, fit_idx], y_val[fit_idx], problem_type, n_rounds)
+        oof[eval_idx] = np.tensordot(w, outputs[:, eval_idx], axes=1)
+
+    weights = caruana_selection(scored, y_val, problem_type, n_rounds)
+    chosen = {n: float(w) for n, w in zip(names, weights) if w > 0}
+
+    if problem_type == "classification":
+        preds = classes[np.argmax(oof, axis=1)]
+        metrics = classification_metrics(y_val, preds, oof[:, 1] if oof.shape[1] == 2 else None)
+    else:
+        metrics = regression_metrics(y_val, oof)
+
+    model = EnsembleModel({n: pipelines[n] for n in chosen}, chosen, problem_type)
+    base_meta = {n: (base_results or {}).get(n, {}).get("metadata", {}) for n in chosen}
+    metadata = {
+        "name": ENSEMBLE_NAME,
+        "hyperparams": {"method": "caruana", "n_rounds": n_rounds},
+        "members": chosen,
+        "candidates": names,
+        "selection_seconds": round(time.perf_counter() - start, 4),
+        # an ensemble costs its members' training time
+        "fit_seconds": round(sum(m.get("fit_seconds", 0.0) for m in base_meta.values()), 4),
+    }
+    if X_val is not None:
+        metadata.update(profile_inference(model, X_val))
+    if output_path is not None:
+        # the members' pipelines, uncompressed by default so they are memory-mapped on load
+        metadata["artifact"] = save_artifact(model, Path(output_path) / f"{ENSEMBLE_NAME}.joblib",
+                                             compress=0 if compress is None else compress)
+
+    result = {"metrics": {"val": metrics}, "metadata": metadata, "weights": None, "model": model}
+    if problem_type == "regression":
+        result["val_predictions"] = oof.tolist()
+        result["val_actual"] = y_val.tolist()
+    return result
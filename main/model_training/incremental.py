@@ -0,0 +1,174 @@
+"""Update trained models after rows were appended to their dataset.
+
+Models whose final estimator has partial_fit are fed only the new training
+rows; models that support warm_start continue from their fitted state on the
+grown training set (more trees for forests, more boosting iterations, the
+previous coefficients as the starting point otherwise). Every other model
+keeps its previous fit, is re-scored on the grown validation split and is
+flagged with needs_full_retrain. Train metrics are computed on at most
+MAX_TRAIN_EVAL_SAMPLES rows of the grown training set (KNN's predict is
+quadratic in it); a model that was not updated keeps its previous ones.
+"""
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from main.model_scripts.artifacts import ArtifactWriter, load_artifact, save_artifact
+from main.model_scripts.utils import (
+    evaluate_classification_model, evaluate_clustering_model, evaluate_model, extract_weights,
+)
+from main.model_training.benchmark import profile_inference
+from main.model_training.ensemble import ENSEMBLE_NAME, build_ensemble
+
+# cap on the training rows re-scored after an update, as knn.MAX_EVAL_SAMPLES
+MAX_TRAIN_EVAL_SAMPLES = 5000
+
+
+def update_capability(pipe) -> Optional[str]:
+    """"partial_fit", "warm_start" or None for the pipeline's final estimator."""
+    est = pipe[-1]
+    if hasattr(est, "partial_fit"):
+        return "partial_fit"
+    if "warm_start" in est.get_params(deep=False):
+        return "warm_start"
+    return None
+
+
+def _transform(pipe, X):
+    # everything before the final estimator (scaler, kernel features); fitted steps are reused
+    return pipe[:-1].transform(X) if len(pipe.steps) > 1 else X
+
+
+def _warm_start_params(est, n_old: int, n_new: int) -> Dict[str, Any]:
+    params = est.get_params(deep=False)
+    growth = n_new / max(n_old, 1)
+    updated = {"warm_start": True}
+    if "n_estimators" in params:
+        # forests: add trees in proportion to the new rows, trained on all rows
+        updated["n_estimators"] = params["n_estimators"] + max(1, int(round(params["n_estimators"] * growth)))
+    elif hasattr(est, "n_iter_") and "max_iter" in params and "early_stopping" in params:
+        # gradient boosting: continue boosting from the iterations already fitted
+        updated["max_iter"] = int(est.n_iter_) + max(1, int(round(est.n_iter_ * growth)))
+    return updated
+
+
+def update_pipeline(pipe, X_train, y_train, n_new: int) -> Optional[str]:
+    """
+    Update pipe in place for the last n_new rows of X_train / y_train (y_train
+    is None for clustering). Returns the mode used, or None when the model
+    needs a full retrain.
+    """
+    mode = update_capability(pipe)
+    est = pipe[-1]
+    if mode == "partial_fit":
+        X_new = _transform(pipe, X_train[-n_new:])
+        if y_train is None:
+            est.partial_fit(X_new)
+        else:
+            est.partial_fit(X_new, y_train[-n_new:])
+    elif mode == "warm_start":
+        est.set_params(**_warm_start_params(est, X_train.shape[0] - n_new, n_new))
+        X_all = _transform(pipe, X_train)
+        if y_train is None:
+            est.fit(X_all)
+        else:
+            est.fit(X_all, y_train)
+    return mode
+
+
+def _evaluate(pipe, problem_type: str, X, y):
+    if problem_type == "regression":
+        return evaluate_model(pipe, X, y)
+    if problem_type == "classification":
+        return evaluate_classification_model(pipe, X, y)
+    return evaluate_clustering_model(pipe, X)
+
+
+def _train_eval_rows(n_rows: int, random_state: int = 0) -> np.ndarray:
+    if n_rows <= MAX_TRAIN_EVAL_SAMPLES:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(random_state)
+    return np.sort(rng.choice(n_rows, size=MAX_TRAIN_EVAL_SAMPLES, replace=False))
+
+
+def update_models(results_dir, previous_results: Dict[str, Any], problem_type: str, n_new: int,
+                  X_train, y_train=None, X_val=None, y_val=None, ensemble: bool = True,
+                  compress=None):
+    """
+    Update the models of a previous run (previous_results: its
+    training_summary.json) with the n_new rows appended to X_train / y_train;
+    X_val / y_val are the grown validation split. The artifacts in
+    results_dir are loaded, updated and saved again, with the compression
+    they were written with unless compress is given.
+
+    Returns (results, pipelines) like Orchestrator.run(). Each model's
+    metadata["incremental"] holds {mode, rows_added, needs_full_retrain}.
+    """
+    results_dir = Path(results_dir)
+    eval_X = X_val if X_val is not None else X_train
+    train_rows = _train_eval_rows(X_train.shape[0])
+    results, pipelines, val_outputs = {}, {}, {}
+
+    with ArtifactWriter(compress=compress) as writer:
+        for model_name, previous in previous_results.items():
+            if model_name == ENSEMBLE_NAME or not isinstance(previous, dict) or "metrics" not in previous:
+                continue
+            path = results_dir / f"{model_name}.joblib"
+            if not path.exists():
+                continue
+            pipe = load_artifact(path, mmap=False)  # updated in place, so not memory-mapped
+
+            start = time.perf_counter()
+            mode = update_pipeline(pipe, X_train, y_train, n_new) if n_new else None
+            update_seconds = round(time.perf_counter() - start, 4)
+
+            metadata = dict(previous.get("metadata") or {})
+            previous_train = previous["metrics"].get("train")
+            if mode is None and previous_train is not None:
+                metrics = {"train": previous_train}  # unchanged fit
+            else:
+                metrics = {"train": _evaluate(pipe, problem_type, X_train[train_rows],
+                                              None if y_train is None else y_train[train_rows])}
+                metadata["train_metric_samples"] = int(len(train_rows))
+            if X_val is not None:
+                metrics["val"] = _evaluate(pipe, problem_type, X_val, y_val)
+
+            metadata["incremental"] = {"mode": mode, "rows_added": int(n_new),
+                                       "needs_full_retrain": mode is None and n_new > 0}
+            if mode is not None:
+                metadata["update_seconds"] = update_seconds
+                save_artifact(pipe, path, compress=(metadata.get("artifact") or {}).get("compress"))
+            if "train_samples" in metadata:
+                metadata["train_samples"] = int(X_train.shape[0])
+
+            result = {"metrics": metrics, "metadata": metadata, "weights": extract_weights(pipe)}
+            if X_val is not None and problem_type != "clustering":
+                start = time.perf_counter()
+                preds = pipe.predict(X_val)
+                metadata["predict_seconds"] = round(time.perf_counter() - start, 4)
+                if problem_type == "regression":
+                    val_outputs[model_name] = preds
+                    result["val_predictions"] = preds.tolist()
+                    result["val_actual"] = np.asarray(y_val).tolist()
+                elif hasattr(pipe, "predict_proba"):
+                    try:
+                        val_outputs[model_name] = pipe.predict_proba(X_val)
+                    except Exception:  # e.g. SVC built without probability=True
+                        pass
+            metadata.update(profile_inference(pipe, eval_X))
+            results[model_name] = result
+            pipelines[model_name] = pipe
+
+    for model_name, result in results.items():
+        if result["metadata"]["incremental"]["mode"] is not None:
+            result["metadata"]["artifact"] = writer.info_for(results_dir / f"{model_name}.joblib")
+
+    if ensemble and problem_type != "clustering":
+        blended = build_ensemble(val_outputs, y_val, problem_type, pipelines, base_results=results,
+                                 output_path=results_dir, X_val=X_val, compress=compress)
+        if blended is not None:
+            pipelines[ENSEMBLE_NAME] = blended.pop("model")
+            results[ENSEMBLE_NAME] = blended
+    return results, pipelines
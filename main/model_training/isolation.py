@@ -0,0 +1,291 @@
+"""Train one model script at a time in a supervised subprocess.
+
+A pathological estimator (an RBF SVC on many rows, KNN predicting on the
+train split) can use all memory or run for hours. With isolation, a trainer
+runs each script's _train_one in its own `python -m main.model_training.isolation`
+process:
+  • the child caps itself with RLIMIT_AS (memory_mb) and RLIMIT_CPU
+    (cpu_seconds) before loading any data, and its BLAS / OpenMP pools and
+    joblib n_jobs=-1 to `threads`, so models run side by side (batch mode)
+    do not oversubscribe the cores;
+  • the parent kills the child's whole process group once timeout_seconds of
+    wall time have passed (SIGTERM, then SIGKILL after KILL_GRACE_SECONDS);
+  • the training arrays are dumped once per train_all and memory-mapped by
+    every child; the child saves the model's artifact itself and hands back
+    its result and validation outputs through a file.
+A model that exceeds a limit or crashes raises ModelProcessError in the
+parent, which the trainer records as that model's failure. Each model's
+metadata["resources"] holds its wall / CPU seconds and peak RSS.
+"""
+import importlib
+import importlib.util
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import joblib
+from threadpoolctl import threadpool_limits
+
+from main.model_scripts.artifacts import ArtifactWriter, discard_partial_write, load_artifact
+from main.model_scripts.utils import TransformCache
+
+try:
+    import resource
+except ImportError:  # not on Windows: limits and rusage are skipped there
+    resource = None
+
+# environment variables read by the BLAS / OpenMP runtimes when they start
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "BLIS_NUM_THREADS",
+                   "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+KILL_GRACE_SECONDS = 5.0
+POLL_SECONDS = 0.05
+# directory holding the `main` package, for the child's sys.path
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class ResourceLimits:
+    """
+    Per-model limits; None leaves a limit off. cpu_seconds and
+    timeout_seconds also count the child's start-up (imports, ~1-2 s).
+    """
+    memory_mb: Optional[float] = None
+    cpu_seconds: Optional[float] = None
+    timeout_seconds: Optional[float] = None
+    threads: Optional[int] = None
+
+
+class ModelProcessError(RuntimeError):
+    """A model's subprocess failed, crashed or was killed; .resources holds its usage."""
+
+    def __init__(self, message: str, resources: Optional[Dict[str, Any]] = None,
+                 child_traceback: Optional[str] = None):
+        super().__init__(message)
+        self.resources = resources or {}
+        self.child_traceback = child_traceback
+
+
+def _error_text(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+def failure_record(error: BaseException) -> Dict[str, Any]:
+    """A trainer's failures entry for a script that raised (in process or in its subprocess)."""
+    record = {"error": str(error) if isinstance(error, ModelProcessError) else _error_text(error),
+              "traceback": getattr(error, "child_traceback", None) or traceback.format_exc()}
+    if getattr(error, "resources", None):
+        record["resources"] = error.resources
+    return record
+
+
+def _exit_reason(returncode: int, limits: ResourceLimits) -> str:
+    if returncode >= 0:
+        return f"exited with status {returncode}"
+    sig = -returncode
+    if sig == getattr(signal, "SIGXCPU", None):
+        return f"CPU time limit of {limits.cpu_seconds}s exceeded"
+    if sig == signal.SIGKILL and limits.memory_mb is not None:
+        return f"killed (SIGKILL; memory limit {limits.memory_mb} MB)"
+    return f"killed by {signal.Signals(sig).name}"
+
+
+def _max_rss_mb(usage) -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(usage.ru_maxrss / scale, 1)
+
+
+def _kill(process: subprocess.Popen):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError, AttributeError):
+        process.terminate()
+
+
+def _supervise(process: subprocess.Popen, limits: ResourceLimits):
+    """Wait for process (killing it on timeout); (returncode, rusage or None, timed_out)."""
+    start = time.monotonic()
+    deadline = None if limits.timeout_seconds is None else start + limits.timeout_seconds
+    killed_at = None
+    hard_killed = False
+    try:
+        while True:
+            if hasattr(os, "wait4"):
+                pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+                if pid:
+                    process.returncode = os.waitstatus_to_exitcode(status)
+                    return process.returncode, usage, killed_at is not None
+            elif process.poll() is not None:
+                return process.returncode, None, killed_at is not None
+            now = time.monotonic()
+            if deadline is not None and now > deadline and killed_at is None:
+                _kill(process)
+                killed_at = now
+            elif killed_at is not None and not hard_killed and now > killed_at + KILL_GRACE_SECONDS:
+                hard_killed = True
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except (ProcessLookupError, PermissionError, AttributeError):
+                    process.kill()
+            time.sleep(POLL_SECONDS)
+    except BaseException:  # e.g. Ctrl-C in the parent: do not leave the child running
+        if process.returncode is None:
+            process.kill()
+            process.wait()
+        raise
+
+
+class ModelSupervisor:
+    """
+    Runs trainer._train_one(ModelClass, *data, save_path, transform_cache,
+    model_params) for one model at a time in a child process. Use as a
+    context manager: the shared data dump is removed on exit.
+    """
+
+    def __init__(self, trainer, data: tuple, limits: Optional[ResourceLimits] = None):
+        self.trainer = trainer
+        self.data = data
+        self.limits = limits or ResourceLimits()
+        self._dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+        return False
+
+    def _data_path(self) -> Path:
+        # dumped on first use only: a run restoring every model never needs it
+        if self._dir is None:
+            self._dir = Path(tempfile.mkdtemp(prefix="automl-isolation-"))
+            joblib.dump(self.data, self._dir / "data.joblib", compress=0)  # uncompressed: children memory-map it
+        return self._dir / "data.joblib"
+
+    def _env(self) -> Dict[str, str]:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in (str(PACKAGE_ROOT), env.get("PYTHONPATH")) if p)
+        # default: the core share batch mode gave this dataset, if any
+        threads = self.limits.threads or env.get("LOKY_MAX_CPU_COUNT")
+        if threads is not None:
+            for var in THREAD_ENV_VARS + ("LOKY_MAX_CPU_COUNT",):
+                env[var] = str(threads)
+        return env
+
+    def train(self, ModelClass, save_path, model_params: Dict[str, Any], writer=None) -> Dict[str, Any]:
+        """
+        Train one model in a child; returns its result and fills
+        trainer.pipelines / val_outputs. The artifact the child wrote is
+        reported to writer (an ArtifactWriter) as if it had written it.
+        """
+        model_name = ModelClass.MODEL_NAME
+        data_path = self._data_path()
+        job_path = self._dir / f"{model_name}.job.joblib"
+        out_path = self._dir / f"{model_name}.out.joblib"
+        log_path = self._dir / f"{model_name}.log"
+        trainer_cls = type(self.trainer)
+        joblib.dump({
+            "trainer": (trainer_cls.__module__, trainer_cls.__qualname__),
+            "scripts_path": str(self.trainer.scripts_path),
+            "output_path": str(self.trainer.output_path),
+            "compress": self.trainer.compress,
+            "module": ModelClass.__module__,
+            "script": ModelClass.train_model.__globals__.get("__file__"),
+            "model_name": model_name,
+            "data": str(data_path),
+            "save_path": str(save_path),
+            "params": model_params,
+            "limits": asdict(self.limits),
+            "out": str(out_path),
+        }, job_path)
+
+        start = time.perf_counter()
+        # the child's prints are relayed through sys.stdout, so redirect_stdout (runner --json) still applies
+        with open(log_path, "w") as log:
+            process = subprocess.Popen([sys.executable, "-m", __name__, str(job_path)], env=self._env(),
+                                       stdout=log, start_new_session=True)
+            returncode, usage, timed_out = _supervise(process, self.limits)
+        if returncode != 0:
+            discard_partial_write(save_path)  # the child may have been killed mid-write
+        sys.stdout.write(log_path.read_text())
+        resources = {"isolated": True, "wall_seconds": round(time.perf_counter() - start, 4),
+                     "exit_code": returncode, "limits": asdict(self.limits)}
+        if usage is not None:
+            resources.update({"cpu_user_seconds": round(usage.ru_utime, 4),
+                              "cpu_system_seconds": round(usage.ru_stime, 4),
+                              "max_rss_mb": _max_rss_mb(usage)})
+
+        if timed_out:
+            raise ModelProcessError(f"timed out after {self.limits.timeout_seconds}s", resources)
+        outcome = joblib.load(out_path) if out_path.exists() else None
+        if outcome is None:
+            raise ModelProcessError(_exit_reason(returncode, self.limits), resources)
+        if "error" in outcome:
+            raise ModelProcessError(outcome["error"], resources, outcome["traceback"])
+
+        result = outcome["result"]
+        result["metadata"]["resources"] = resources
+        self.trainer.pipelines[model_name] = load_artifact(save_path)
+        if outcome["val_output"] is not None:
+            self.trainer.val_outputs[model_name] = outcome["val_output"]
+        if writer is not None and outcome["artifact"] is not None:
+            writer.mark_written(save_path, outcome["artifact"])
+        return result
+
+
+def _apply_limits(limits: Dict[str, Any]):
+    if resource is None:
+        return
+    if limits.get("memory_mb") is not None:
+        cap = int(limits["memory_mb"] * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (cap, cap))
+    if limits.get("cpu_seconds") is not None:
+        # SIGXCPU at the soft limit, SIGKILL shortly after if it is ignored
+        soft = max(1, int(limits["cpu_seconds"]))
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 5))
+
+
+def _load_model_class(job: Dict[str, Any]):
+    if job["module"].startswith("main.model_scripts."):
+        module = importlib.import_module(job["module"])
+    else:  # loaded from a file outside the package (see ClassificationTrainer._load_models)
+        spec = importlib.util.spec_from_file_location(job["module"], job["script"])
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module.Model
+
+
+def _child(job_path: str):
+    job = joblib.load(job_path)
+    _apply_limits(job["limits"])
+    threads = job["limits"].get("threads")
+    try:
+        module_name, qualname = job["trainer"]
+        trainer_cls = getattr(importlib.import_module(module_name), qualname)
+        trainer = trainer_cls(Path(job["scripts_path"]), Path(job["output_path"]), compress=job["compress"])
+        ModelClass = _load_model_class(job)
+        data = joblib.load(job["data"], mmap_mode="c")  # copy-on-write: scripts may modify their inputs
+
+        with threadpool_limits(limits=threads), ArtifactWriter(compress=job["compress"]) as writer:
+            result = trainer._train_one(ModelClass, *data, Path(job["save_path"]), TransformCache(), job["params"])
+        outcome = {"result": result, "val_output": getattr(trainer, "val_outputs", {}).get(job["model_name"]),
+                   "artifact": writer.info_for(job["save_path"])}
+        code = 0
+    except BaseException as e:  # includes MemoryError from RLIMIT_AS
+        outcome = {"error": _error_text(e), "traceback": traceback.format_exc()}
+        code = 1
+    joblib.dump(outcome, job["out"])
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    _child(sys.argv[1])
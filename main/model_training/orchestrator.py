@@ -1,40 +1,105 @@
 from pathlib import Path
 import json
 import numpy as np
+from scipy.sparse import load_npz
 from typing import Dict, Any
 
 from .regression import RegressionTrainer
 from .classification import ClassificationTrainer
+from .clustering import ClusteringTrainer
+from .ensemble import ENSEMBLE_NAME, build_ensemble
+
+def _load_matrix(path: Path, stem: str):
+    """Load <stem>.npy, or the sparse <stem>.npz written for sparse feature matrices."""
+    if (path / f"{stem}.npz").exists() and not (path / f"{stem}.npy").exists():
+        return load_npz(path / f"{stem}.npz")
+    return np.load(path / f"{stem}.npy")
+
 
 def load_processed_dataset(path: Path):
-    X_train = np.load(path / "X_train.npy")
-    y_train = np.load(path / "y_train.npy")
-    X_val = np.load(path / "X_val.npy")
-    y_val = np.load(path / "y_val.npy")
+    """
+    Load the arrays written by process_features.
 
+    Clustering datasets only have X_full: it is returned as X_train and the
+    other arrays are None.
+    """
     with open(path / "metadata.json", "r") as f:
         metadata = json.load(f)
 
+    if metadata.get("problem_type") == "clustering":
+        return _load_matrix(path, "X_full"), None, None, None, metadata
+
+    X_train = _load_matrix(path, "X_train")
+    y_train = np.load(path / "y_train.npy")
+    X_val = _load_matrix(path, "X_val")
+    y_val = np.load(path / "y_val.npy")
+
     return X_train, y_train, X_val, y_val, metadata
 
 
 class Orchestrator:
-    def __init__(self, dataset_path: Path, model_scripts_path: Path, output_path: Path):
+    def __init__(self, dataset_path: Path, model_scripts_path: Path, output_path: Path, include_models=None,
+                 ensemble: bool = True, cache=None, model_params=None, checkpoint=None,
+                 isolation=None, compress=None):
         self.dataset_path = dataset_path
         self.model_scripts_path = model_scripts_path
         self.output_path = output_path
+        # optional subset of MODEL_NAMEs to train (e.g. top-k from a preview run)
+        self.include_models = include_models
+        # blend the trained models from their cached validation outputs (see ensemble.py)
+        self.ensemble = ensemble
+        # optional TrainingCache (see cache.py) and {MODEL_NAME: train_model kwargs}
+        self.cache = cache
+        self.model_params = model_params
+        # optional RunCheckpoint (see checkpoint.py) restoring models of an interrupted run
+        self.checkpoint = checkpoint
+        # optional ResourceLimits: train each script in a supervised subprocess (see isolation.py)
+        self.isolation = isolation
+        # joblib compression for every saved artifact; None keeps each model's (see artifacts.py)
+        self.compress = compress
+        # filled by run(): dataset metadata, the fitted pipelines (kept in memory)
+        # and the scripts that raised, {model_name: {"error", "traceback"}}
+        self.metadata = None
+        self.pipelines = {}
+        self.failures = {}
 
     def run(self):
         X_train, y_train, X_val, y_val, metadata = load_processed_dataset(self.dataset_path)
+        self.metadata = metadata
 
         problem_type = metadata["problem_type"]
 
+        trainer_kwargs = {} if self.cache is None else {"cache": self.cache}
+        if self.checkpoint is not None:
+            trainer_kwargs["checkpoint"] = self.checkpoint
+        if self.isolation is not None:
+            trainer_kwargs["isolation"] = self.isolation
+        if self.compress is not None:
+            trainer_kwargs["compress"] = self.compress
         if problem_type == "regression":
-            trainer = RegressionTrainer(self.model_scripts_path, self.output_path)
+            trainer = RegressionTrainer(self.model_scripts_path, self.output_path, **trainer_kwargs)
         elif problem_type == "classification":
-            trainer = ClassificationTrainer(self.model_scripts_path, self.output_path)
+            trainer = ClassificationTrainer(self.model_scripts_path, self.output_path, **trainer_kwargs)
+        elif problem_type == "clustering":
+            trainer = ClusteringTrainer(self.model_scripts_path, self.output_path, **trainer_kwargs)
         else:
             raise ValueError(f"Unsupported problem type: {problem_type}")
 
-        results = trainer.train_all(X_train, y_train, X_val, y_val)
+        train_kwargs = {} if self.include_models is None else {"include": set(self.include_models)}
+        if self.model_params:
+            train_kwargs["params"] = self.model_params
+        if problem_type == "clustering":
+            results = trainer.train_all(X_train, **train_kwargs)
+        else:
+            results = trainer.train_all(X_train, y_train, X_val, y_val, **train_kwargs)
+        self.pipelines = getattr(trainer, "pipelines", {})
+        self.failures = getattr(trainer, "failures", {})
+
+        if self.ensemble and problem_type != "clustering":
+            ensemble = build_ensemble(getattr(trainer, "val_outputs", {}), y_val, problem_type, self.pipelines,
+                                      base_results=results, output_path=self.output_path, X_val=X_val,
+                                      compress=self.compress)
+            if ensemble is not None:
+                self.pipelines[ENSEMBLE_NAME] = ensemble.pop("model")
+                results[ENSEMBLE_NAME] = ensemble
         return results
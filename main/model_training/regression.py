@@ -1,14 +1,31 @@
 import importlib
 import pkgutil
+import time
 from pathlib import Path
 
+from main.model_scripts.artifacts import ArtifactWriter
 from main.model_scripts.base import validate_module
+from main.model_scripts.utils import TransformCache, extract_weights
+from main.model_training.benchmark import profile_inference
+from main.model_training.cache import data_fingerprint, model_key
+from main.model_training.checkpoint import record_model, restore_model
+from main.model_training.isolation import ModelSupervisor, failure_record
 
 
 class RegressionTrainer:
-    def __init__(self, scripts_path: Path, output_path: Path):
+    def __init__(self, scripts_path: Path, output_path: Path, compress=None, cache=None,
+                 checkpoint=None, isolation=None):
         self.scripts_path = scripts_path
         self.output_path = output_path
+        self.compress = compress
+        # optional TrainingCache / RunCheckpoint: unchanged (data, script, params) reuse the earlier fit
+        self.cache = cache
+        self.checkpoint = checkpoint
+        # optional ResourceLimits: each script trains in a supervised subprocess (see isolation.py)
+        self.isolation = isolation
+        self.failures = {}
+        self.pipelines = {}
+        self.val_outputs = {}
 
     def _load_models(self):
         """
@@ -41,87 +58,109 @@ class RegressionTrainer:
 
         return model_classes
 
-    def train_all(self, X_train, y_train, X_val, y_val):
+    def _train_one(self, ModelClass, X_train, y_train, X_val, y_val, save_path, transform_cache, model_params):
+        model_name = ModelClass.MODEL_NAME
+        model = ModelClass()
+        start = time.perf_counter()
+        pipe, metrics, metadata = model.train_model(
+            X_train=X_train,
+            y_train=y_train,
+            X_val=X_val,
+            y_val=y_val,
+            save_path=save_path,
+            transform_cache=transform_cache,
+            **model_params
+        )
+        metadata["fit_seconds"] = round(time.perf_counter() - start, 4)
+
+        # Include validation predictions for visualization (Actual vs Predicted)
+        raw_preds = None
+        try:
+            start = time.perf_counter()
+            raw_preds = pipe.predict(X_val)
+            metadata["predict_seconds"] = round(time.perf_counter() - start, 4)
+            # Convert to list to ensure JSON serializable
+            val_preds = raw_preds.tolist()
+            val_actual = y_val.tolist()
+        except Exception:
+            val_preds = None
+            val_actual = None
+        # single-core throughput on a fixed batch and in-memory size
+        metadata.update(profile_inference(pipe, X_val if X_val is not None else X_train))
+
+        self.pipelines[model_name] = pipe
+        if raw_preds is not None:
+            self.val_outputs[model_name] = raw_preds
+        return {
+            "metrics": metrics,
+            "metadata": metadata,
+            "val_predictions": val_preds,
+            "val_actual": val_actual,
+            "weights": extract_weights(pipe)
+        }
+
+    def train_all(self, X_train, y_train, X_val, y_val, include=None, params=None):
         """
         Train all regression model scripts found in model_scripts/.
         Each model script handles its own saving via save_path.
+        If include is given, only models whose MODEL_NAME is in it are trained.
+        params maps MODEL_NAME to extra train_model keyword arguments.
+        Fitted pipelines and their validation predictions stay available in
+        memory as self.pipelines and self.val_outputs. Models checkpointed by
+        this run or cached for the same inputs are restored instead of
+        trained. A script that raises (or, with isolation, exceeds its
+        limits) is skipped and reported in self.failures; the others still
+        train.
         """
         models = self._load_models()
+        if include is not None:
+            models = [m for m in models if m.MODEL_NAME in include]
         results = {}
-
-        def _extract_weights(pipe):
-            """Try to extract model weights from a fitted pipeline or estimator.
-
-            Returns a dict (e.g. {'coef': [...], 'intercept': ...}) or None if
-            weights can't be determined.
-            """
-            try:
-                from sklearn.pipeline import Pipeline
-            except Exception:
-                Pipeline = None
-
-            est = pipe
-            try:
-                if Pipeline is not None and isinstance(pipe, Pipeline):
-                    est = pipe.steps[-1][1]
-            except Exception:
-                est = pipe
-
-            weights = None
-            try:
-                if hasattr(est, "coef_"):
-                    coef = getattr(est, "coef_")
-                    intercept = getattr(est, "intercept_", None)
-                    try:
-                        coef = coef.tolist()
-                    except Exception:
-                        pass
-                    try:
-                        if intercept is not None:
-                            intercept = float(intercept)
-                    except Exception:
-                        pass
-                    weights = {"coef": coef, "intercept": intercept}
-                elif hasattr(est, "feature_importances_"):
-                    fi = getattr(est, "feature_importances_")
-                    try:
-                        fi = fi.tolist()
-                    except Exception:
-                        pass
-                    weights = {"feature_importances": fi}
-            except Exception:
-                weights = None
-
-            return weights
-
-        for ModelClass in models:
-            model_name = ModelClass.MODEL_NAME
-            save_path = self.output_path / f"{model_name}.joblib"
-
-            model = ModelClass()
-            pipe, metrics, metadata = model.train_model(
-                X_train=X_train,
-                y_train=y_train,
-                X_val=X_val,
-                y_val=y_val,
-                save_path=save_path
-            )
-
-            # Include validation predictions for visualization (Actual vs Predicted)
-            try:
-                val_preds = pipe.predict(X_val)
-                # Convert to list to ensure JSON serializable
-                val_preds = val_preds.tolist()
-                val_actual = y_val.tolist()
-            except Exception:
-                val_preds = None
-                val_actual = None
-
-            results[model_name] = {
-                "metrics": metrics,
-                "metadata": metadata,
-                "val_predictions": val_preds,
-                "val_actual": val_actual
-            }
+        self.pipelines = {}
+        # raw validation predictions per model, reused by the ensemble stage
+        self.val_outputs = {}
+        # preprocessing fits (e.g. the StandardScaler) are shared by all scripts of this run
+        transform_cache = TransformCache()
+        reuse = self.cache is not None or self.checkpoint is not None
+        data_fp = data_fingerprint(X_train, y_train, X_val, y_val) if reuse else None
+        self.failures = {}
+        restored = set()
+
+        # artifacts are written by a background thread while the next model trains
+        supervisor = ModelSupervisor(self, (X_train, y_train, X_val, y_val), self.isolation)
+        with ArtifactWriter(compress=self.compress) as writer, supervisor:
+            for ModelClass in models:
+                model_name = ModelClass.MODEL_NAME
+                save_path = self.output_path / f"{model_name}.joblib"
+                model_params = (params or {}).get(model_name, {})
+                key = model_key(ModelClass, data_fp, "regression", model_params) if reuse else None
+
+                previous = restore_model(model_name, key, save_path, self.cache, self.checkpoint)
+                if previous is not None:
+                    pipe, results[model_name], val_preds = previous
+                    self.pipelines[model_name] = pipe
+                    if val_preds is not None:
+                        self.val_outputs[model_name] = val_preds
+                    restored.add(model_name)
+                    continue
+
+                try:
+                    if self.isolation is not None:
+                        results[model_name] = supervisor.train(ModelClass, save_path, model_params, writer)
+                    else:
+                        results[model_name] = self._train_one(ModelClass, X_train, y_train, X_val, y_val, save_path,
+                                                              transform_cache, model_params)
+                except Exception as e:  # one failing script must not abort the others
+                    self.failures[model_name] = failure_record(e)
+                    print(f"❌ {model_name} failed: {self.failures[model_name]['error']}")
+                    continue
+                record_model(writer, model_name, key, save_path, results[model_name],
+                             self.val_outputs.get(model_name), self.cache, self.checkpoint)
+
+        for model_name, result in results.items():
+            if model_name not in restored:
+                result["metadata"]["artifact"] = writer.info_for(self.output_path / f"{model_name}.joblib")
+        if self.cache is not None:
+            self.cache.evict()
 
         return results
@@ -1,87 +1,307 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.decomposition import PCA
+import hashlib
+import time
+from pathlib import Path
+from sklearn.decomposition import PCA, IncrementalPCA
 from scipy.sparse import issparse
+from sklearn.utils import gen_batches
+from sklearn.utils.sparsefuncs import mean_variance_axis
+from typing import Optional
+from .correlation import correlation_drop_candidates
+from .eda_report import REPORT_DIRNAME, render_correlation_heatmap, start_eda_report
 
-def plot_correlation_heatmap(df: pd.DataFrame, threshold: float = 0.9):
+# sparse inputs larger than this (rows * cols) are reduced without densifying
+SPARSE_DENSIFY_MAX_ELEMENTS = 50_000_000
+# "auto" PCA uses the covariance solver on dense matrices at least this many
+# times taller than wide
+COVARIANCE_MIN_ROWS_PER_COL = 10
+
+def plot_correlation_heatmap(df: pd.DataFrame, threshold: float = 0.9, corr_result: Optional[dict] = None,
+                             save_dir: Optional[str] = None, max_features: int = 100):
     """
-    Plots correlation heatmap and returns columns to drop based on threshold.
+    Renders the correlation heatmap headlessly (Agg backend) and returns columns
+    to drop based on threshold. The figure is written as PNG/SVG to
+    <save_dir>/eda/ when save_dir is given; nothing is ever shown interactively.
+    Pass corr_result (from correlation_drop_candidates with return_matrix=True)
+    to reuse an already computed matrix.
     """
-    corr_matrix = df.corr().abs()
-    upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
-    drop_cols = [col for col in upper.columns if any(upper[col] > threshold)]
+    if corr_result is None or corr_result.get("corr") is None:
+        corr_result = correlation_drop_candidates(df.to_numpy(), threshold=threshold, return_matrix=True)
+    drop_cols = [df.columns[i] for i in corr_result["drop"]]
 
-    plt.figure(figsize=(12, 10))
-    sns.heatmap(corr_matrix, annot=False, cmap="coolwarm")
-    plt.title("Feature Correlation Heatmap")
-    plt.show()
+    if save_dir is not None:
+        out_dir = Path(save_dir) / REPORT_DIRNAME
+        out_dir.mkdir(parents=True, exist_ok=True)
+        render_correlation_heatmap(corr_result["corr"], out_dir, list(df.columns), max_features)
 
     return drop_cols
 
-def remove_highly_correlated_features(df: pd.DataFrame, threshold: float = 0.9):
+def remove_highly_correlated_features(df: pd.DataFrame, threshold: float = 0.9, corr_result: Optional[dict] = None):
     """
     Automatically remove columns with correlation above threshold.
     Returns filtered DataFrame and list of removed columns.
+    Pass corr_result to reuse drop candidates that were already computed.
     """
-    corr_matrix = df.corr().abs()
-    upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
-    drop_cols = [col for col in upper.columns if any(upper[col] > threshold)]
+    if corr_result is None:
+        corr_result = correlation_drop_candidates(df.to_numpy(), threshold=threshold)
+    drop_cols = [df.columns[i] for i in corr_result["drop"]]
     df_filtered = df.drop(columns=drop_cols)
     return df_filtered, drop_cols
 
-def pca_reduction(X, variance_threshold: float = 0.95):
+def _unique_columns(X: np.ndarray, candidates, duplicates: list) -> list:
+    """First occurrence of each distinct column among candidates; the rest go to duplicates."""
+    seen = {}
+    unique_cols = []
+    for j in candidates:
+        col = np.ascontiguousarray(X[:, j])
+        digest = hashlib.blake2b(col.tobytes(), digest_size=16).digest()
+        matches = seen.setdefault(digest, [])
+        if any(np.array_equal(col, X[:, k]) for k in matches):
+            duplicates.append(j)
+            continue
+        matches.append(j)
+        unique_cols.append(j)
+    return unique_cols
+
+def prune_redundant_columns(X: np.ndarray, corr_threshold: float = 0.9,
+                            var_threshold: float = 1e-12, block_size: int = 512):
+    """
+    Cheap pre-reduction of a dense numeric matrix before PCA:
+      1. Drop zero / near-constant variance columns
+      2. Drop exact duplicate columns (hashed column bytes, verified on collision)
+      3. Drop highly correlated columns, correlation computed block-wise on the array
+    A column is dropped in step 3 when its absolute correlation with any earlier
+    column exceeds corr_threshold (same rule as remove_highly_correlated_features).
+    Returns the pruned array and a dict of original column indices per stage.
+    X itself is returned (not a copy) when no column is dropped.
+
+    Sparse matrices only go through step 1 (steps 2 and 3 need dense columns).
+    """
+    if issparse(X):
+        X = X if X.format in ("csr", "csc") else X.tocsr()
+    else:
+        X = np.asarray(X)
+    n_rows, n_cols = X.shape
+    info = {"constant": [], "duplicate": [], "correlated": [], "kept": list(range(n_cols))}
+    if n_rows < 2 or n_cols < 2:
+        return X, info
+
+    # 1) near-constant columns, variances taken a column block at a time
+    if issparse(X):
+        variances = mean_variance_axis(X, axis=0)[1]
+    else:
+        variances = np.concatenate([X[:, start:start + block_size].var(axis=0)
+                                    for start in range(0, n_cols, block_size)])
+    candidates = [j for j in range(n_cols) if variances[j] > var_threshold]
+    info["constant"] = [j for j in range(n_cols) if variances[j] <= var_threshold]
+
+    # 2) exact duplicates via hashing of the column bytes
+    if issparse(X):
+        unique_cols = candidates
+    else:
+        unique_cols = _unique_columns(X, candidates, info["duplicate"])
+
+    # 3) blocked correlation pruning on the remaining columns
+    if corr_threshold is not None and len(unique_cols) > 1 and not issparse(X):
+        subset = len(unique_cols) < n_cols
+        # a column subset is already a fresh copy, so it can be standardized in place
+        corr_result = correlation_drop_candidates(X[:, unique_cols] if subset else X, threshold=corr_threshold,
+                                                  block_size=block_size, overwrite_input=subset)
+        dropped = set(corr_result["drop"])
+        info["correlated"] = [unique_cols[j] for j in sorted(dropped)]
+        unique_cols = [c for j, c in enumerate(unique_cols) if j not in dropped]
+
+    if not unique_cols:
+        # never hand PCA an empty matrix; keep the first column
+        unique_cols = [0]
+    info["kept"] = unique_cols
+    if len(unique_cols) == n_cols:
+        return X, info
+    return X[:, unique_cols], info
+
+def _truncate_components(pca, n_components: int):
+    """Keep only the leading n_components of a fitted (Incremental)PCA in place."""
+    pca.components_ = pca.components_[:n_components]
+    pca.explained_variance_ = pca.explained_variance_[:n_components]
+    pca.explained_variance_ratio_ = pca.explained_variance_ratio_[:n_components]
+    pca.singular_values_ = pca.singular_values_[:n_components]
+    pca.n_components_ = n_components
+    pca.n_components = n_components
+    return pca
+
+def _components_for_variance(ratios: np.ndarray, variance_threshold: float) -> int:
+    cumulative = np.cumsum(ratios)
+    return int(min(np.searchsorted(cumulative, variance_threshold) + 1, len(ratios)))
+
+def _choose_pca_strategy(X, max_dense_elements: int, randomized_min_dim: int, covariance_max_cols: int) -> str:
+    n_rows, n_cols = X.shape
+    if isinstance(X, np.memmap):
+        return "incremental"
+    if n_cols <= covariance_max_cols and n_rows >= COVARIANCE_MIN_ROWS_PER_COL * n_cols:
+        # tall and narrow: no centered copy of X and no (n_rows, n_cols) U factor
+        return "covariance"
+    if n_rows * n_cols > max_dense_elements:
+        return "incremental"
+    if min(n_rows, n_cols) > randomized_min_dim:
+        return "randomized"
+    return "full"
+
+def _randomized_pca(X, variance_threshold: float, random_state: int):
+    """Randomized SVD with a doubling rank search until the variance target is met."""
+    max_rank = min(X.shape)
+    rank = min(max_rank, 32)
+    while True:
+        if rank > max_rank // 2:
+            # close to full rank: a full SVD is cheaper than another randomized pass
+            return PCA(n_components=variance_threshold, svd_solver="full").fit(X), "full"
+        pca = PCA(n_components=rank, svd_solver="randomized", random_state=random_state).fit(X)
+        if pca.explained_variance_ratio_.sum() >= variance_threshold:
+            k = _components_for_variance(pca.explained_variance_ratio_, variance_threshold)
+            return _truncate_components(pca, k), "randomized"
+        rank *= 2
+
+def _incremental_pca(X, variance_threshold: float, batch_size: int):
+    """
+    IncrementalPCA over row batches (works on np.memmap without loading it).
+    Like _randomized_pca, the number of components doubles until the
+    variance target is met, so wide inputs are not fit at full rank.
+    """
+    n_rows, n_cols = X.shape
+    max_rank = min(n_rows, n_cols)
+    rank = min(max_rank, 32)
+    while True:
+        if rank > max_rank // 2:
+            rank = max_rank
+        pca = IncrementalPCA(n_components=rank)
+        # partial_fit needs at least n_components rows per batch
+        for batch in gen_batches(n_rows, max(batch_size, rank), min_batch_size=rank):
+            pca.partial_fit(X[batch])
+        if rank == max_rank or pca.explained_variance_ratio_.sum() >= variance_threshold:
+            k = _components_for_variance(pca.explained_variance_ratio_, variance_threshold)
+            return _truncate_components(pca, k)
+        rank *= 2
+
+def pca_reduction(X, variance_threshold: float = 0.95, strategy: str = "auto",
+                  batch_size: int = 10000, max_dense_elements: int = 200_000_000,
+                  randomized_min_dim: int = 1000, random_state: int = 42, covariance_max_cols: int = 5000):
     """
     Reduces features using PCA while retaining specified variance.
-    Works with dense NumPy arrays or sparse matrices.
+    Works with dense NumPy arrays, np.memmap, a path to a .npy file or sparse matrices.
+
+    strategy:
+      • "full": exact SVD (PCA(n_components=variance_threshold))
+      • "randomized": randomized SVD, doubling the rank until the variance target is met
+      • "incremental": IncrementalPCA over row batches, memory-mapped inputs stay on disk
+      • "covariance": eigendecomposition of the (n_cols, n_cols) covariance;
+        accepts sparse X without densifying it
+      • "auto": incremental for memmaps; covariance for sparse matrices and
+        tall dense ones (COVARIANCE_MIN_ROWS_PER_COL) of at most
+        covariance_max_cols columns; incremental for other very large matrices,
+        randomized when both dimensions exceed randomized_min_dim, otherwise full
+    Other strategies densify sparse input first.
+    Returns (X_reduced, pca, info) where info reports the strategy used,
+    n_components, retained variance and seconds taken.
     """
+    start_time = time.perf_counter()
+    if isinstance(X, (str, Path)):
+        X = np.load(X, mmap_mode="r")
     if issparse(X):
-        X_dense = X.toarray()
+        if strategy in ("auto", "covariance") and X.shape[1] <= covariance_max_cols:
+            strategy = "covariance"
+        else:
+            X = X.toarray()
+
+    if strategy == "auto":
+        strategy = _choose_pca_strategy(X, max_dense_elements, randomized_min_dim, covariance_max_cols)
+
+    if strategy == "incremental":
+        pca = _incremental_pca(X, variance_threshold, batch_size)
+        X_reduced = np.vstack([pca.transform(X[i:i + batch_size]) for i in range(0, X.shape[0], batch_size)])
+    elif strategy == "randomized":
+        pca, strategy = _randomized_pca(X, variance_threshold, random_state)
+        X_reduced = pca.transform(X)
+    elif strategy == "full":
+        pca = PCA(n_components=variance_threshold)
+        X_reduced = pca.fit_transform(X)
+    elif strategy == "covariance":
+        pca = PCA(n_components=variance_threshold, svd_solver="covariance_eigh")
+        X_reduced = pca.fit_transform(X)
     else:
-        X_dense = X
-    pca = PCA(n_components=variance_threshold)
-    X_reduced = pca.fit_transform(X_dense)
-    return X_reduced, pca
+        raise ValueError(f"Unknown PCA strategy: {strategy}")
+
+    info = {
+        "strategy": strategy,
+        "n_components": int(pca.n_components_),
+        "explained_variance": float(np.sum(pca.explained_variance_ratio_)),
+        "seconds": round(time.perf_counter() - start_time, 4),
+    }
+    return X_reduced, pca, info
 
 def perform_eda(X, target_col: str = "", corr_threshold: float = 0.9,
-                pca_variance: float = 0.95, plot_corr: bool = True):
+                pca_variance: float = 0.95, plot_corr: bool = True,
+                report_dir: Optional[str] = None, feature_names: Optional[list] = None):
     """
     Perform EDA and PCA:
       - If input is DataFrame:
-          • Optionally plot correlation heatmap
           • Remove highly correlated features automatically
-      - If input is NumPy array / sparse, skip correlation heatmap
+      - If input is NumPy array / sparse, prune constant, duplicate and
+        highly correlated columns on the array (sparse input above
+        SPARSE_DENSIFY_MAX_ELEMENTS is never densified: only constant columns
+        are pruned)
       - Apply PCA for dimensionality reduction
+      - If plot_corr and report_dir are set, render the EDA report (heatmap,
+        distributions, PCA variance) headlessly to <report_dir>/eda/ on a
+        background thread
     Returns:
       dict containing:
         • X_original: array before PCA
         • X_reduced: array after PCA
         • pca_model: fitted PCA object
-        • removed_corr_columns: dropped columns due to correlation (names or info)
+        • pca_info: PCA strategy used, n_components, retained variance, seconds
+        • removed_corr_columns: dropped column names (DataFrame) or a dict of
+          dropped column indices per pruning stage (arrays)
+        • report: EDAReportJob (call .wait() for the manifest) or None
     """
     removed_cols = []
+    render_report = plot_corr and report_dir is not None
+    report_kwargs = {}
 
     if isinstance(X, pd.DataFrame):
         numeric_df = X.select_dtypes(include=np.number)
-        if plot_corr:
-            _ = plot_correlation_heatmap(numeric_df, threshold=corr_threshold)
-        X_filtered, removed_cols = remove_highly_correlated_features(numeric_df, threshold=corr_threshold)
+        # correlations are computed once and shared by the report and the filter
+        corr_result = correlation_drop_candidates(numeric_df.to_numpy(), threshold=corr_threshold,
+                                                  return_matrix=render_report)
+        X_filtered, removed_cols = remove_highly_correlated_features(numeric_df, threshold=corr_threshold,
+                                                                     corr_result=corr_result)
         X_numeric = X_filtered.to_numpy()
+        X_pruned = X_numeric
+        if render_report:
+            report_kwargs = {"X": numeric_df.to_numpy(), "feature_names": list(numeric_df.columns),
+                             "corr": corr_result["corr"]}
     else:
-        # X is already numeric (NumPy array or sparse)
-        if issparse(X):
+        # X is already numeric (NumPy array or sparse); large sparse matrices
+        # stay sparse (constant-column pruning, covariance PCA)
+        if issparse(X) and X.shape[0] * X.shape[1] <= SPARSE_DENSIFY_MAX_ELEMENTS:
             X_numeric = X.toarray()
         else:
             X_numeric = X
-        removed_cols = f"PCA will reduce dimensions from {X_numeric.shape[1]} features"
+        X_pruned, removed_cols = prune_redundant_columns(X_numeric, corr_threshold=corr_threshold)
+        if render_report:
+            report_kwargs = {"X": X_numeric, "feature_names": feature_names}
+
+    # Apply PCA reduction on what remains after pruning
+    X_reduced, pca_model, pca_info = pca_reduction(X_pruned, variance_threshold=pca_variance)
 
-    # Apply PCA reduction
-    X_reduced, pca_model = pca_reduction(X_numeric, variance_threshold=pca_variance)
+    report = None
+    if render_report:
+        report = start_eda_report(output_dir=report_dir, pca_model=pca_model, **report_kwargs)
 
     return {
         "X_original": X_numeric,
         "X_reduced": X_reduced,
         "pca_model": pca_model,
-        "removed_corr_columns": removed_cols
-    }
\ No newline at end of file
+        "pca_info": pca_info,
+        "removed_corr_columns": removed_cols,
+        "report": report
+    }
@@ -0,0 +1,123 @@
+import numpy as np
+from typing import Optional
+
+
+def _standardize_columns(X: np.ndarray, copy: bool = True) -> np.ndarray:
+    """Return float32 columns scaled to zero mean and unit L2 norm.
+
+    Dot products of the returned columns are Pearson correlations.
+    Constant columns become all zeros (correlation 0 with everything).
+    With copy=False a writable float32 X is standardized in place.
+    """
+    if copy or not X.flags.writeable:
+        Z = np.array(X, dtype=np.float32, copy=True)
+    else:
+        Z = np.asarray(X, dtype=np.float32)
+    Z -= Z.mean(axis=0)
+    norms = np.linalg.norm(Z, axis=0)
+    norms[norms == 0] = 1.0
+    Z /= norms
+    return Z
+
+
+def _exact_pair_corr(Z: np.ndarray, rows: np.ndarray, cols: np.ndarray, chunk: int = 4096) -> np.ndarray:
+    """Exact |corr| for the column pairs (rows[k], cols[k]) of a standardized matrix."""
+    out = np.empty(len(rows), dtype=np.float32)
+    for start in range(0, len(rows), chunk):
+        stop = start + chunk
+        out[start:stop] = np.abs(np.einsum("ij,ij->j", Z[:, rows[start:stop]], Z[:, cols[start:stop]]))
+    return out
+
+
+def correlation_drop_candidates(
+    X,
+    threshold: float = 0.9,
+    block_size: int = 512,
+    approximate: Optional[bool] = None,
+    approx_min_cols: int = 2000,
+    sketch_dim: int = 256,
+    sample_rows: Optional[int] = None,
+    return_matrix: bool = False,
+    random_state: int = 0,
+    overwrite_input: bool = False,
+):
+    """
+    Compute absolute feature correlations once, in float32 column blocks, and
+    return the columns to drop: column j is dropped when |corr(i, j)| > threshold
+    for some earlier column i < j.
+
+    Modes:
+      • exact: Z[:, :stop].T @ Z[:, block] for each column block
+      • approximate (default for >= approx_min_cols columns): columns are first
+        screened on a Gaussian random projection of the rows (sketch_dim rows),
+        then every screened pair is verified with its exact correlation
+      • sample_rows: compute on a random row subsample instead of all rows
+
+    overwrite_input lets a float32 X be standardized in place instead of
+    copied (for callers passing a temporary, e.g. a column subset).
+
+    Returns dict:
+      • drop: list of column indices to drop
+      • corr: |corr| matrix as float32 (only if return_matrix, exact mode)
+      • method: "exact" or "sketch"
+      • rows_used: number of rows the correlations were computed on
+    """
+    X = np.asarray(X)
+    n_rows, n_cols = X.shape
+    rng = np.random.default_rng(random_state)
+
+    if sample_rows is not None and n_rows > sample_rows:
+        X = X[np.sort(rng.choice(n_rows, size=sample_rows, replace=False))]
+        n_rows = sample_rows
+
+    if approximate is None:
+        approximate = n_cols >= approx_min_cols and n_rows > sketch_dim
+    if return_matrix:
+        approximate = False
+
+    result = {"drop": [], "corr": None, "method": "sketch" if approximate else "exact", "rows_used": int(n_rows)}
+    if n_cols < 2 or n_rows < 2:
+        return result
+
+    Z = _standardize_columns(X, copy=not overwrite_input)
+    drop_mask = np.zeros(n_cols, dtype=bool)
+    corr_full = np.zeros((n_cols, n_cols), dtype=np.float32) if return_matrix else None
+
+    if approximate:
+        # sketch the rows: inner products of unit columns are preserved up to ~1/sqrt(k)
+        sketch = np.zeros((sketch_dim, n_cols), dtype=np.float32)
+        for start in range(0, n_rows, 65536):
+            chunk = Z[start:start + 65536]
+            proj = rng.standard_normal((sketch_dim, len(chunk)), dtype=np.float32)
+            sketch += proj @ chunk
+        sketch /= np.sqrt(np.float32(sketch_dim))
+        screen = max(0.0, threshold - 4.0 / np.sqrt(sketch_dim))
+        source = sketch
+    else:
+        screen = threshold
+        source = Z
+
+    for start in range(0, n_cols, block_size):
+        stop = min(start + block_size, n_cols)
+        corr = np.abs(source[:, :stop].T @ source[:, start:stop])
+        # keep only pairs (i, j) with i < j
+        corr[np.tril_indices(stop, k=-start, m=stop - start)] = 0.0
+
+        if approximate:
+            rows, cols = np.nonzero(corr > screen)
+            if len(rows):
+                exact = _exact_pair_corr(Z, rows, cols + start)
+                drop_mask[np.unique(cols[exact > threshold] + start)] = True
+        else:
+            drop_mask[start:stop] = (corr > threshold).any(axis=0)
+
+        if corr_full is not None:
+            corr_full[:stop, start:stop] = corr
+
+    if corr_full is not None:
+        corr_full = np.maximum(corr_full, corr_full.T)
+        np.fill_diagonal(corr_full, 1.0)
+        result["corr"] = corr_full
+
+    result["drop"] = np.flatnonzero(drop_mask).tolist()
+    return result
@@ -1,8 +1,19 @@
+from contextlib import nullcontext
+
 import pandas as pd
 import numpy as np
 
+from .dtypes import FLOAT_DTYPE, downcast_frame, memory_report
+
+
+def copy_on_write():
+    """Enable pandas Copy-on-Write for a block (always on from pandas 3)."""
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return nullcontext()
+    return pd.option_context("mode.copy_on_write", True)
 
-def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+
+def clean_dataframe(df: pd.DataFrame, float_dtype=FLOAT_DTYPE) -> pd.DataFrame:
     """
     Cleans a DataFrame by performing:
       1. Drop unnamed columns (common in Excel/CSV exports)
@@ -12,68 +23,97 @@ def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
       5. Remove duplicate rows
       6. Remove numeric outliers using 1.5*IQR rule
       7. Reset index after cleaning
+      8. Downcast numeric columns (floats to float_dtype, integers to the
+         smallest fitting type; float_dtype=None keeps float64)
 
-    Returns a cleaned, warning-free DataFrame.
+    Returns a cleaned, warning-free DataFrame. The bytes saved by step 8 are
+    in df.attrs["memory_report"]. The input frame is not modified, and its
+    data is only copied where a step actually changes it.
     """
 
-    # ✅ Always work on a copy to avoid SettingWithCopyWarning
-    df = df.copy()
+    with copy_on_write():
+        return _clean(df, float_dtype)
+
+
+def _clean(df: pd.DataFrame, float_dtype) -> pd.DataFrame:
+    # Shallow copy: below, columns are only ever replaced (df[col] = ...), never
+    # written into, so the caller's frame is untouched without copying its data.
+    df = df.copy(deep=False)
 
     # 1️⃣ Drop unnamed columns (like "Unnamed: 0" from CSVs)
-    df = df.loc[:, ~df.columns.str.contains("^Unnamed")]
+    unnamed = df.columns[df.columns.astype(str).str.contains("^Unnamed")]
+    if len(unnamed):
+        df = df.drop(columns=unnamed)
 
     # 2️⃣ Fix inconsistent column types
     for col in df.columns:
+        # numeric / bool / datetime columns hold a single type by construction
+        if df[col].dtype != object:
+            continue
         non_null_values = df[col].dropna()
         if non_null_values.empty:
             continue
 
         # Find the most frequent data type in column
-        majority_type = non_null_values.map(type).value_counts().idxmax()
+        type_counts = non_null_values.map(type).value_counts()
+        if len(type_counts) == 1:
+            continue  # homogeneous: converting would only copy the column
+        majority_type = type_counts.idxmax()
 
         def convert_value(val):
+            if pd.isna(val):
+                return val  # stays missing and is imputed in step 4
             try:
                 return majority_type(val)
             except Exception:
                 return np.nan
 
-        # Use .loc to safely assign values
-        df.loc[:, col] = df[col].apply(convert_value)
+        df[col] = df[col].apply(convert_value)
 
     # 3️⃣ Drop columns that are completely NULL
     df.dropna(axis=1, how="all", inplace=True)
 
     # 4️⃣ Handle missing values (median for numeric, mode for categorical)
     for col in df.columns:
-        if np.issubdtype(df[col].dtype, np.number):
+        if not df[col].isna().any():
+            continue
+        if pd.api.types.is_numeric_dtype(df[col]):
             median_value = df[col].median()
-            df.loc[:, col] = df[col].fillna(median_value)
+            df[col] = df[col].fillna(median_value)
         else:
-            if not df[col].mode().empty:
-                mode_value = df[col].mode().iloc[0]
-                df.loc[:, col] = df[col].fillna(mode_value)
-            else:
-                df.loc[:, col] = df[col].fillna("")
+            mode = df[col].mode()
+            df[col] = df[col].fillna(mode.iloc[0] if not mode.empty else "")
 
     # 5️⃣ Remove duplicate rows
     df.drop_duplicates(inplace=True)
 
-    # 6️⃣ Remove outliers using IQR for numeric columns
+    # 6️⃣ Remove outliers using IQR for numeric columns. Columns are filtered
+    # one after another (each column's quartiles see only the rows kept so far),
+    # but through one boolean mask and a single row selection at the end.
     numeric_cols = df.select_dtypes(include=np.number).columns
+    keep = np.ones(len(df), dtype=bool)
     for col in numeric_cols:
-        if df[col].nunique() < 5:  # skip small unique sets (e.g., categories)
+        values = df[col].to_numpy()
+        kept_values = pd.Series(values[keep])
+        if kept_values.nunique() < 5:  # skip small unique sets (e.g., categories)
             continue
 
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
+        Q1 = kept_values.quantile(0.25)
+        Q3 = kept_values.quantile(0.75)
         IQR = Q3 - Q1
         lower_bound = Q1 - 1.5 * IQR
         upper_bound = Q3 + 1.5 * IQR
 
-        # Use .loc to filter safely
-        df = df.loc[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
+        keep &= (values >= lower_bound) & (values <= upper_bound)
+    if not keep.all():
+        df = df.loc[keep]
 
     # 7️⃣ Reset index
     df.reset_index(drop=True, inplace=True)
 
+    # 8️⃣ Downcast numeric columns (shallow sizes: only numeric columns change)
+    before = int(df.memory_usage(index=False).sum())
+    downcast_frame(df, float_dtype=float_dtype)
+    df.attrs["memory_report"] = memory_report(before, int(df.memory_usage(index=False).sum()))
+
     return df
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import issparse
+
+# Dtype policy: features and regression targets are float32, label-encoded
+# categoricals and class labels use the smallest signed integer type that fits.
+FLOAT_DTYPE = np.float32
+
+
+def smallest_int_dtype(n_values: int) -> np.dtype:
+    """Smallest signed integer dtype holding codes 0..n_values-1."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_values - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def array_nbytes(X) -> int:
+    """Bytes held by a dense or sparse array."""
+    if issparse(X):
+        X = X.tocsr()
+        return int(X.data.nbytes + X.indices.nbytes + X.indptr.nbytes)
+    return int(np.asarray(X).nbytes)
+
+
+def downcast_frame(df: pd.DataFrame, float_dtype=FLOAT_DTYPE) -> pd.DataFrame:
+    """
+    Downcast numeric columns in place: floats to float_dtype, integers to the
+    smallest integer type holding their range. Booleans and non-numeric
+    columns are left alone. A float_dtype of None (or float64) keeps floats.
+    """
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast="integer")
+        elif float_dtype is not None and series.dtype != float_dtype:
+            df[col] = series.astype(float_dtype)
+    return df
+
+
+def memory_report(before_bytes: int, after_bytes: int) -> dict:
+    """Bytes before/after a dtype change and the fraction saved."""
+    saved = int(before_bytes) - int(after_bytes)
+    return {
+        "bytes_before": int(before_bytes),
+        "bytes_after": int(after_bytes),
+        "bytes_saved": saved,
+        "fraction_saved": round(saved / before_bytes, 4) if before_bytes else 0.0,
+    }
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from scipy.sparse import issparse
+
+from .correlation import correlation_drop_candidates
+
+REPORT_DIRNAME = "eda"
+MANIFEST_NAME = "manifest.json"
+_HASH_BLOCK_ROWS = 65536
+
+
+def dataset_fingerprint(X) -> str:
+    """Stable hash of a feature matrix (shape, dtype and raw bytes)."""
+    if issparse(X):
+        X = X.tocsr()
+        parts = [X.data, X.indices, X.indptr]
+    elif np.asarray(X).flags.c_contiguous:
+        X = np.asarray(X)
+        parts = [X]
+    else:
+        # hash C-order bytes row block by row block instead of copying all of X
+        parts = (X[start:start + _HASH_BLOCK_ROWS] for start in range(0, X.shape[0], _HASH_BLOCK_ROWS))
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((X.shape, str(X.dtype))).encode())
+    for part in parts:
+        h.update(memoryview(np.ascontiguousarray(part)).cast("B"))
+    return h.hexdigest()
+
+
+def downsample_corr(corr: np.ndarray, max_features: int) -> np.ndarray:
+    """Average-pool a square correlation matrix down to at most max_features bins."""
+    n = corr.shape[0]
+    if n <= max_features:
+        return corr
+    edges = np.linspace(0, n, max_features + 1).astype(int)
+    rows = np.add.reduceat(corr, edges[:-1], axis=0) / np.diff(edges)[:, None]
+    return np.add.reduceat(rows, edges[:-1], axis=1) / np.diff(edges)[None, :]
+
+
+def _new_figure(figsize):
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)  # headless: never touches pyplot / GUI backends
+    return fig, fig.add_subplot(111)
+
+
+def _save(fig, out_dir: Path, stem: str, formats: Iterable[str]) -> List[str]:
+    paths = []
+    for fmt in formats:
+        path = out_dir / f"{stem}.{fmt}"
+        fig.savefig(path, format=fmt, bbox_inches="tight")
+        paths.append(str(path))
+    return paths
+
+
+def render_correlation_heatmap(corr: np.ndarray, out_dir: Path, feature_names: Optional[Sequence[str]] = None,
+                               max_features: int = 100, formats: Iterable[str] = ("png", "svg")) -> List[str]:
+    """Render an |corr| heatmap with the Agg backend, pooling it to max_features first."""
+    pooled = downsample_corr(corr, max_features)
+    labels = feature_names if feature_names is not None and pooled.shape[0] == len(feature_names) else False
+
+    fig, ax = _new_figure((12, 10))
+    sns.heatmap(pooled, annot=False, cmap="coolwarm", ax=ax, xticklabels=labels, yticklabels=labels)
+    title = "Feature Correlation Heatmap"
+    if pooled.shape[0] < corr.shape[0]:
+        title += f" ({corr.shape[0]} features pooled to {pooled.shape[0]} bins)"
+    ax.set_title(title)
+    return _save(fig, out_dir, "correlation_heatmap", formats)
+
+
+def _render_distributions(X: np.ndarray, out_dir: Path, feature_names: Sequence[str],
+                          max_plots: int, formats: Iterable[str]) -> List[str]:
+    cols = list(range(min(X.shape[1], max_plots)))
+    n_grid = int(np.ceil(np.sqrt(len(cols))))
+    fig = Figure(figsize=(3 * n_grid, 2.5 * n_grid))
+    FigureCanvasAgg(fig)
+    for k, j in enumerate(cols):
+        ax = fig.add_subplot(n_grid, n_grid, k + 1)
+        ax.hist(X[:, j], bins=30, color="steelblue")
+        ax.set_title(str(feature_names[j])[:30], fontsize=8)
+        ax.tick_params(labelsize=6)
+    fig.tight_layout()
+    return _save(fig, out_dir, "feature_distributions", formats)
+
+
+def _render_pca_variance(pca_model, out_dir: Path, formats: Iterable[str]) -> List[str]:
+    ratios = np.cumsum(pca_model.explained_variance_ratio_)
+    fig, ax = _new_figure((6, 4))
+    ax.plot(np.arange(1, len(ratios) + 1), ratios, marker="o")
+    ax.set_xlabel("Components")
+    ax.set_ylabel("Cumulative explained variance")
+    ax.set_title("PCA Explained Variance")
+    return _save(fig, out_dir, "pca_explained_variance", formats)
+
+
+def build_eda_report(X, output_dir, feature_names: Optional[Sequence[str]] = None, pca_model=None,
+                     corr: Optional[np.ndarray] = None, max_heatmap_features: int = 100, max_corr_features: int = 2000,
+                     max_rows: int = 50000, formats: Iterable[str] = ("png", "svg")) -> dict:
+    """
+    Render the EDA plots for X into <output_dir>/eda/ and return the manifest.
+
+    The manifest stores the dataset fingerprint; if it matches on a re-run and
+    all artifacts still exist, nothing is re-rendered.
+    A precomputed |corr| matrix for X's columns can be passed to skip that step;
+    otherwise correlations are computed on at most max_rows sampled rows and,
+    for wide data, on the max_corr_features highest-variance columns.
+    """
+    out_dir = Path(output_dir) / REPORT_DIRNAME
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST_NAME
+
+    fingerprint = dataset_fingerprint(X)
+    if manifest_path.exists():
+        with open(manifest_path, "r") as f:
+            cached = json.load(f)
+        if cached.get("dataset_hash") == fingerprint and all(Path(p).exists() for p in cached.get("artifacts", [])):
+            cached["cached"] = True
+            return cached
+
+    X = X.tocsr() if issparse(X) else X
+    if feature_names is None or len(feature_names) != X.shape[1]:
+        feature_names = [f"feature_{i}" for i in range(X.shape[1])]
+    if X.shape[0] > max_rows:
+        rng = np.random.default_rng(0)
+        X = X[np.sort(rng.choice(X.shape[0], size=max_rows, replace=False))]
+    # sparse input is densified only after row sampling
+    X = X.toarray() if issparse(X) else np.asarray(X)
+
+    artifacts = []
+    if corr is not None:
+        artifacts += render_correlation_heatmap(corr, out_dir, feature_names, max_heatmap_features, formats)
+    elif X.shape[1] > 1:
+        cols = np.arange(X.shape[1])
+        if len(cols) > max_corr_features:
+            cols = np.sort(np.argsort(X.var(axis=0))[::-1][:max_corr_features])
+        corr = correlation_drop_candidates(X[:, cols], return_matrix=True)["corr"]
+        names = [feature_names[j] for j in cols]
+        artifacts += render_correlation_heatmap(corr, out_dir, names, max_heatmap_features, formats)
+    artifacts += _render_distributions(X, out_dir, feature_names, 16, formats)
+    if pca_model is not None:
+        artifacts += _render_pca_variance(pca_model, out_dir, formats)
+
+    manifest = {"dataset_hash": fingerprint, "artifacts": artifacts, "cached": False}
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+
+class EDAReportJob:
+    """Runs build_eda_report on a background thread; call wait() for the manifest."""
+
+    def __init__(self, *args, **kwargs):
+        self.manifest = None
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=args, kwargs=kwargs,
+                                        name="eda-report", daemon=False)
+        self._thread.start()
+
+    def _run(self, *args, **kwargs):
+        try:
+            self.manifest = build_eda_report(*args, **kwargs)
+        except Exception as e:  # a failed report must never break training
+            self.error = f"{type(e).__name__}: {e}"
+
+    def wait(self, timeout: Optional[float] = None) -> dict:
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return {"status": "running"}
+        if self.error is not None:
+            return {"status": "failed", "error": self.error}
+        return {"status": "done", **self.manifest}
+
+
+def start_eda_report(X, output_dir, **kwargs) -> EDAReportJob:
+    """Start rendering the EDA report in the background (see build_eda_report)."""
+    return EDAReportJob(X, output_dir, **kwargs)
@@ -0,0 +1,383 @@
+"""Append detection and incremental preprocessing for growing datasets.
+
+A full run records a SourceState next to the cleaned-frame cache: the raw
+columns and dtypes, the row count, a digest of the raw rows and a
+CleaningState (the statistics clean_dataframe derives from the data). When a
+later upload starts with exactly those rows, only the appended rows are
+cleaned, with statistics updated from them, and mapped into the existing
+feature space with the feature state saved by process_features. Anything
+that cannot be handled incrementally raises ValueError with the reason, and
+the caller falls back to a full run.
+"""
+import hashlib
+import json
+import os
+import shutil
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from sklearn.model_selection import train_test_split
+
+from .datacleaning import copy_on_write
+
+SOURCE_STATE_FILE = "source_state.joblib"
+FEATURE_STATE_FILE = "feature_state.joblib"
+# values kept per numeric column to estimate medians and IQR bounds
+RESERVOIR_SIZE = 10000
+# columns with fewer distinct values skip the IQR filter (as in clean_dataframe)
+IQR_MIN_UNIQUE = 5
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """One uint64 hash per row (values only, index ignored)."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def rows_digest(df: pd.DataFrame) -> str:
+    """Digest of all rows of df, in order."""
+    return hashlib.blake2b(row_hashes(df).tobytes(), digest_size=16).hexdigest()
+
+
+def _convert_majority(series: pd.Series, majority_type) -> pd.Series:
+    def convert_value(val):
+        if pd.isna(val):
+            return val
+        try:
+            return majority_type(val)
+        except Exception:
+            return np.nan
+    return series.map(convert_value)
+
+
+class CleaningState:
+    """
+    The statistics clean_dataframe uses, kept up to date as rows are appended:
+    medians and IQR bounds (from a uniform reservoir sample of each numeric
+    column, so they are estimates), modes (exact value counts), majority types
+    of mixed-type columns, the cleaned columns and dtypes, and hashes of the
+    cleaned rows for de-duplication.
+    """
+
+    def __init__(self, reservoir_size: int = RESERVOIR_SIZE, random_state: int = 0):
+        self.reservoir_size = reservoir_size
+        self.rng = np.random.default_rng(random_state)
+        self.columns = []
+        self.dtypes: Dict[str, str] = {}
+        self.majority_types: Dict[str, type] = {}
+        self.reservoirs: Dict[str, np.ndarray] = {}
+        self.seen: Dict[str, int] = {}
+        self.value_counts: Dict[str, Counter] = {}
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    @classmethod
+    def fit(cls, raw_df: pd.DataFrame, cleaned_df: pd.DataFrame, **kwargs) -> "CleaningState":
+        """State after clean_dataframe(raw_df) returned cleaned_df."""
+        state = cls(**kwargs)
+        state.columns = list(cleaned_df.columns)
+        state.dtypes = {col: str(dtype) for col, dtype in cleaned_df.dtypes.items()}
+        for col in state.columns:
+            values = raw_df[col].dropna()
+            if raw_df[col].dtype == object and not values.empty:
+                type_counts = values.map(type).value_counts()
+                if len(type_counts) > 1:
+                    state.majority_types[col] = type_counts.idxmax()
+            if state._is_numeric(col):
+                state.reservoirs[col] = np.empty(0)
+                state.seen[col] = 0
+            else:
+                state.value_counts[col] = Counter()
+        state.update(state._conform(raw_df))
+        state.hashes = np.unique(row_hashes(cleaned_df))
+        return state
+
+    def _is_numeric(self, col) -> bool:
+        dtype = np.dtype(self.dtypes[col]) if self.dtypes[col] not in ("category", "object") else None
+        return dtype is not None and np.issubdtype(dtype, np.number)
+
+    def _conform(self, raw_df: pd.DataFrame) -> pd.DataFrame:
+        df = raw_df[self.columns].copy(deep=False)
+        for col, majority_type in self.majority_types.items():
+            df[col] = _convert_majority(df[col], majority_type)
+        for col in self.reservoirs:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        return df
+
+    def update(self, df: pd.DataFrame) -> "CleaningState":
+        """Fold the (type-conformed) rows of df into the statistics."""
+        for col, reservoir in self.reservoirs.items():
+            values = df[col].dropna().to_numpy(dtype=np.float64)
+            seen = self.seen[col]
+            room = max(self.reservoir_size - len(reservoir), 0)
+            reservoir = np.concatenate([reservoir, values[:room]])
+            rest = values[room:]
+            if len(rest):
+                # Algorithm R: the i-th value replaces a random slot with probability size / (i + 1)
+                positions = seen + room + np.arange(len(rest))
+                slots = self.rng.integers(0, positions + 1)
+                take = slots < self.reservoir_size
+                reservoir[slots[take]] = rest[take]
+            self.reservoirs[col] = reservoir
+            self.seen[col] = seen + len(values)
+        for col, counts in self.value_counts.items():
+            counts.update(df[col].dropna().astype(str).tolist())
+        return self
+
+    def median(self, col) -> float:
+        return float(np.median(self.reservoirs[col])) if len(self.reservoirs[col]) else 0.0
+
+    def mode(self, col) -> str:
+        counts = self.value_counts[col]
+        return counts.most_common(1)[0][0] if counts else ""
+
+    def iqr_bounds(self, col) -> Optional[Tuple[float, float]]:
+        reservoir = self.reservoirs[col]
+        if len(np.unique(reservoir)) < IQR_MIN_UNIQUE:
+            return None
+        q1, q3 = np.quantile(reservoir, [0.25, 0.75])
+        return q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+
+    def clean(self, raw_new: pd.DataFrame) -> pd.DataFrame:
+        """
+        Clean appended raw rows like clean_dataframe, with the statistics
+        first updated from them: fill with medians / modes, drop rows
+        duplicating each other or any earlier row, apply the IQR bounds and
+        cast to the dtypes of the first cleaning.
+        """
+        with copy_on_write():
+            df = self._conform(raw_new)
+            self.update(df)
+            for col in self.columns:
+                if df[col].isna().any():
+                    fill = self.median(col) if col in self.reservoirs else self.mode(col)
+                    df[col] = df[col].fillna(fill)
+
+            for col in self.columns:
+                dtype = self.dtypes[col]
+                if col in self.reservoirs and np.issubdtype(np.dtype(dtype), np.integer):
+                    info = np.iinfo(np.dtype(dtype))
+                    if df[col].min() < info.min or df[col].max() > info.max:
+                        continue  # out of the first cleaning's integer range: keep the wider type
+                    df[col] = df[col].round()
+                df[col] = df[col].astype(dtype)
+
+            keep = np.ones(len(df), dtype=bool)
+            for col in self.reservoirs:
+                bounds = self.iqr_bounds(col)
+                if bounds is not None:
+                    values = df[col].to_numpy()
+                    keep &= (values >= bounds[0]) & (values <= bounds[1])
+            hashes = row_hashes(df)
+            keep &= ~pd.Series(hashes).duplicated().to_numpy() & ~np.isin(hashes, self.hashes)
+
+            df = df.loc[keep].reset_index(drop=True)
+            self.hashes = np.union1d(self.hashes, hashes[keep])
+        return df
+
+
+def source_state(raw_df: pd.DataFrame, cleaned_df: pd.DataFrame) -> Dict[str, Any]:
+    """What a later upload is compared against to recognise it as an append."""
+    return {
+        "columns": [str(c) for c in raw_df.columns],
+        "dtypes": {str(c): str(t) for c, t in raw_df.dtypes.items()},
+        "rows": len(raw_df),
+        "digest": rows_digest(raw_df),
+        "cleaning": CleaningState.fit(raw_df, cleaned_df),
+    }
+
+
+def detect_append(raw_df: pd.DataFrame, state: Dict[str, Any]) -> int:
+    """
+    Number of rows appended to the dataset described by state.
+
+    Raises ValueError when raw_df is not the recorded rows plus new ones
+    (different columns, fewer rows, or changed leading rows). Columns whose
+    parsed dtype changed because of the new rows (e.g. int -> float) are cast
+    back before hashing the leading rows.
+    """
+    if [str(c) for c in raw_df.columns] != state["columns"]:
+        raise ValueError("columns differ from the processed dataset")
+    n_old = state["rows"]
+    if len(raw_df) < n_old:
+        raise ValueError("fewer rows than the processed dataset")
+    head = raw_df.iloc[:n_old]
+    changed = {c: t for c, t in state["dtypes"].items() if str(head[c].dtype) != t}
+    if changed:
+        try:
+            head = head.astype(changed)
+        except (TypeError, ValueError):
+            raise ValueError(f"column types changed: {sorted(changed)}")
+    if rows_digest(head) != state["digest"]:
+        raise ValueError("leading rows differ from the processed dataset")
+    return len(raw_df) - n_old
+
+
+def advance_source_state(state: Dict[str, Any], raw_df: pd.DataFrame) -> Dict[str, Any]:
+    """State after the append: raw_df is now the recorded dataset."""
+    state.update({"rows": len(raw_df), "digest": rows_digest(raw_df.astype(state["dtypes"], errors="ignore"))})
+    return state
+
+
+def transform_rows(cleaned: pd.DataFrame, feature_state: Dict[str, Any]):
+    """
+    Map cleaned appended rows into the feature space of the processed dataset.
+
+    The saved transform (label codes, scaling, pruned columns, PCA) is applied
+    unchanged, so existing arrays and models stay valid. The running
+    statistics are still updated: unseen categories get new codes, and the
+    scaler's mean / variance are updated with partial_fit. Returns
+    (X, y, info); info reports the new categories and how far the updated
+    means have drifted from the frozen ones, in frozen standard deviations.
+    Raises ValueError for text columns (the TF-IDF vocabulary would need a
+    refit) and for class labels not seen before.
+    """
+    if feature_state["text_cols"]:
+        raise ValueError("text columns need a TF-IDF refit")
+    dtype = np.dtype(feature_state["dtype"])
+    dense_cols = feature_state["dense_cols"]
+    X = np.empty((len(cleaned), len(dense_cols)), dtype=dtype, order="F")
+    new_categories = {}
+    for j, col in enumerate(dense_cols):
+        if col in feature_state["encoders"]:
+            codes = feature_state["encoders"][col]
+            values = cleaned[col].astype(str)
+            unseen = sorted(set(values.unique()) - set(codes))
+            for value in unseen:
+                codes[value] = len(codes)
+            if unseen:
+                new_categories[col] = unseen
+            X[:, j] = values.map(codes).to_numpy()
+        else:
+            X[:, j] = cleaned[col].to_numpy()
+
+    drift = 0.0
+    scaled = feature_state["scaled_idx"]
+    if scaled:
+        mean, scale = feature_state["scale_mean"], feature_state["scale_scale"]
+        if len(X):
+            feature_state["scaler"].partial_fit(X[:, scaled])
+        drift = float(np.max(np.abs(feature_state["scaler"].mean_ - mean) / scale))
+        for j, m, s in zip(scaled, mean, scale):
+            column = X[:, j]
+            column -= m
+            column /= s
+
+    kept = feature_state["kept"]
+    X = X[:, kept] if len(kept) < X.shape[1] else X
+    X = feature_state["pca"].transform(X).astype(dtype, copy=False) if len(X) else \
+        np.empty((0, feature_state["pca"].n_components_), dtype=dtype)
+
+    target = feature_state["target_col"]
+    y = None
+    if feature_state["task_type"] == "classification":
+        labels = cleaned[target].astype(str)
+        unseen = set(labels.unique()) - set(feature_state["target_codes"])
+        if unseen:
+            raise ValueError(f"new target classes: {sorted(unseen)}")
+        y = labels.map(feature_state["target_codes"]).to_numpy(dtype=feature_state["target_dtype"])
+    elif feature_state["task_type"] == "regression":
+        y = cleaned[target].to_numpy(dtype=dtype)
+
+    return X, y, {"new_categories": new_categories, "scaler_mean_drift": round(drift, 4)}
+
+
+def _append_npy(path: Path, rows: np.ndarray) -> np.ndarray:
+    existing = np.load(path)
+    grown = np.concatenate([existing, rows.astype(existing.dtype, copy=False)])
+    del existing
+    tmp = path.with_name(path.stem + ".tmp.npy")
+    np.save(tmp, grown)
+    os.replace(tmp, path)  # readers never see a half-written array
+    return grown
+
+
+def append_processed(processed_dir, X_new: np.ndarray, y_new: Optional[np.ndarray] = None,
+                     test_size: float = 0.2, random_state: int = 42):
+    """
+    Append transformed rows to the arrays process_features saved in
+    processed_dir. New rows are split into train / val with the same
+    test_size (all go to train when there are fewer than two). Returns
+    (X_train, y_train, X_val, y_val, metadata) for the grown dataset, like
+    load_processed_dataset, with metadata.json updated; its "appended" list
+    records {rows, train_rows} per append (the new training rows are the
+    last train_rows of X_train).
+    """
+    processed_dir = Path(processed_dir)
+    with open(processed_dir / "metadata.json", "r") as f:
+        metadata = json.load(f)
+    if metadata.get("feature_matrix_format") != "dense_npy":
+        raise ValueError("only dense feature matrices can be appended to")
+
+    if metadata["problem_type"] == "clustering":
+        X_full = _append_npy(processed_dir / "X_full.npy", X_new)
+        metadata["samples"] = int(X_full.shape[0])
+        X_train, y_train, X_val, y_val = X_full, None, None, None
+        train_rows = len(X_new)
+    else:
+        if len(X_new) >= 2:
+            X_tr, X_va, y_tr, y_va = train_test_split(X_new, y_new, test_size=test_size, random_state=random_state)
+        else:
+            X_tr, X_va, y_tr, y_va = X_new, X_new[:0], y_new, y_new[:0]
+        X_train = _append_npy(processed_dir / "X_train.npy", X_tr)
+        y_train = _append_npy(processed_dir / "y_train.npy", y_tr)
+        X_val = _append_npy(processed_dir / "X_val.npy", X_va)
+        y_val = _append_npy(processed_dir / "y_val.npy", y_va)
+        metadata["train_samples"] = int(X_train.shape[0])
+        metadata["val_samples"] = int(X_val.shape[0])
+        train_rows = len(X_tr)
+
+    metadata.setdefault("appended", []).append({"rows": int(len(X_new)), "train_rows": int(train_rows)})
+    tmp = processed_dir / "metadata.tmp.json"
+    with open(tmp, "w") as f:
+        json.dump(metadata, f, indent=4)
+    os.replace(tmp, processed_dir / "metadata.json")
+    return X_train, y_train, X_val, y_val, metadata
+
+
+def write_state(state: Dict[str, Any], path) -> None:
+    """joblib.dump state to path through a temporary file, so path is replaced atomically."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    joblib.dump(state, tmp)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def restore_on_error(paths: Iterable):
+    """
+    Put paths back as they were if the block raises: existing files are
+    hard-linked aside (copied where links are not supported) and restored,
+    files the block created are removed. The links share the originals'
+    contents, so the block must replace these files (write to a temporary
+    file and os.replace) rather than rewrite them in place.
+    """
+    backups = {}
+    for path in map(Path, paths):
+        backup = None
+        if path.exists():
+            backup = path.with_name(path.name + ".bak")
+            backup.unlink(missing_ok=True)
+            try:
+                os.link(path, backup)
+            except OSError:
+                shutil.copy2(path, backup)
+        backups[path] = backup
+    try:
+        yield
+    except BaseException:
+        for path, backup in backups.items():
+            if backup is None:
+                path.unlink(missing_ok=True)
+            elif path.exists() and os.path.samefile(backup, path):
+                backup.unlink()  # never replaced (renaming a link onto itself does nothing)
+            else:
+                os.replace(backup, path)
+        raise
+    for backup in backups.values():
+        if backup is not None:
+            backup.unlink(missing_ok=True)
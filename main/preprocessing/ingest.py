@@ -0,0 +1,275 @@
+"""Dataset loading and the columnar cache of cleaned frames.
+
+load_dataset() reads CSV, Excel, ZIP, Parquet and Feather uploads (calamine
+for Excel when installed, multi-file CSV ZIPs in parallel). Parsing a
+CSV again on every run is the slow part of a re-run, so load_clean_dataset()
+persists the cleaned frame once per source file in a columnar layout and
+later runs read back only the columns they ask for: Parquet when pyarrow is
+installed, otherwise one .npy file per column.
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .datacleaning import clean_dataframe
+
+try:  # optional dependency
+    import pyarrow
+except ImportError:  # pragma: no cover - depends on environment
+    pyarrow = None
+
+try:  # optional dependency: Rust Excel reader, far faster than openpyxl
+    import python_calamine
+except ImportError:  # pragma: no cover - depends on environment
+    python_calamine = None
+
+CSV_SUFFIXES = (".csv",)
+EXCEL_SUFFIXES = (".xls", ".xlsx")
+PARQUET_SUFFIXES = (".parquet", ".pq")
+FEATHER_SUFFIXES = (".feather", ".arrow")
+SUPPORTED_SUFFIXES = CSV_SUFFIXES + EXCEL_SUFFIXES + PARQUET_SUFFIXES + FEATHER_SUFFIXES + (".zip",)
+
+# Excel members of a ZIP larger than this are spooled to disk, not memory
+SPOOL_MAX_BYTES = 64 * 1024 * 1024
+
+CACHE_MANIFEST = "manifest.json"
+_PARQUET_FILE = "frame.parquet"
+
+
+def excel_engine() -> Optional[str]:
+    """pandas read_excel engine: "calamine" when python-calamine is installed, else pandas' default."""
+    return "calamine" if python_calamine is not None else None
+
+
+def _read_excel(source, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    return pd.read_excel(source, usecols=columns, engine=excel_engine())
+
+
+def _zip_members(z: zipfile.ZipFile, suffixes) -> List[str]:
+    # directories and macOS resource forks are not data
+    return sorted(info.filename for info in z.infolist()
+                  if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+                  and info.filename.lower().endswith(suffixes))
+
+
+def _read_zip_csv(path: Path, member: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    # own ZipFile handle per call so members can be read from several threads;
+    # the member is decompressed as the parser consumes it, never held whole
+    with zipfile.ZipFile(path, "r") as z, z.open(member) as f:
+        return pd.read_csv(f, usecols=columns)
+
+
+def _csv_header(path: Path, member: str) -> List[str]:
+    with zipfile.ZipFile(path, "r") as z, z.open(member) as f:
+        return list(pd.read_csv(f, nrows=0).columns)
+
+
+def _read_zip(path: Path, columns: Optional[Sequence[str]] = None,
+              max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    CSV members with the same header are one dataset split across files: the
+    header group holding the most (uncompressed) data is parsed in parallel,
+    in member-name order, and concatenated; other CSVs (lookups, notes) are
+    skipped. Without CSVs the first Excel member is read, spooled to a
+    temporary file rather than held in memory.
+    """
+    with zipfile.ZipFile(path, "r") as z:
+        csv_files = _zip_members(z, CSV_SUFFIXES)
+        xlsx_files = _zip_members(z, EXCEL_SUFFIXES)
+        sizes = {m: z.getinfo(m).file_size for m in csv_files}
+
+        if not csv_files and xlsx_files:
+            with z.open(xlsx_files[0]) as member, \
+                    tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+                shutil.copyfileobj(member, spool)
+                spool.seek(0)
+                return _read_excel(spool, columns)
+    if not csv_files:
+        raise ValueError("❌ ZIP contains no CSV/XLSX file")
+
+    groups: Dict[tuple, List[str]] = {}
+    for member in csv_files:
+        groups.setdefault(tuple(_csv_header(path, member)), []).append(member)
+    parts = max(groups.values(), key=lambda members: sum(sizes[m] for m in members))
+    skipped = [m for m in csv_files if m not in parts]
+    if skipped:
+        print(f"⚠️ Skipping ZIP members with a different header: {', '.join(skipped)}")
+    if len(parts) == 1:
+        return _read_zip_csv(path, parts[0], columns)
+
+    workers = min(len(parts), max_workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(lambda member: _read_zip_csv(path, member, columns), parts))
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_dataset(path, columns: Optional[Sequence[str]] = None,
+                 max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Read an uploaded dataset into a DataFrame.
+
+    columns restricts the read to those columns; Parquet and Feather only
+    decode the requested columns. Parquet/Feather need pyarrow (pandas raises
+    an ImportError naming it otherwise). Excel files are read with calamine
+    when it is installed (see excel_engine). ZIPs holding one dataset split
+    over several CSVs are read with up to max_workers threads (see _read_zip).
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    columns = list(columns) if columns is not None else None
+
+    if suffix in CSV_SUFFIXES:
+        return pd.read_csv(path, usecols=columns)
+    if suffix in EXCEL_SUFFIXES:
+        return _read_excel(path, columns)
+    if suffix in PARQUET_SUFFIXES:
+        return pd.read_parquet(path, columns=columns)
+    if suffix in FEATHER_SUFFIXES:
+        return pd.read_feather(path, columns=columns)
+    if suffix == ".zip":
+        return _read_zip(path, columns, max_workers)
+    raise ValueError("❌ Unsupported format. Use .csv, .xlsx, .parquet, .feather, or .zip")
+
+
+def source_fingerprint(path) -> Dict[str, object]:
+    """Identity of a source file for cache validation (name, size, mtime)."""
+    stat = Path(path).stat()
+    return {"name": Path(path).name, "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def columnar_format() -> str:
+    """Layout used for new caches: "parquet" with pyarrow, else "npy"."""
+    return "parquet" if pyarrow is not None else "npy"
+
+
+def write_columnar(df: pd.DataFrame, cache_dir, fmt: Optional[str] = None,
+                   extra: Optional[dict] = None) -> dict:
+    """
+    Persist df under cache_dir and return the manifest.
+
+    fmt is "parquet" or "npy" (one file per column, object columns pickled);
+    it defaults to columnar_format(). The manifest is written last, so a cache
+    interrupted mid-write is never read back. extra is stored in the manifest.
+    """
+    cache_dir = Path(cache_dir)
+    fmt = fmt or columnar_format()
+    manifest_path = cache_dir / CACHE_MANIFEST
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # invalidate first, then drop the previous cache's files
+    manifest_path.unlink(missing_ok=True)
+    for old in [*cache_dir.glob("col_*.npy"), cache_dir / _PARQUET_FILE]:
+        old.unlink(missing_ok=True)
+
+    files, pickled = {}, []
+    if fmt == "parquet":
+        df.to_parquet(cache_dir / _PARQUET_FILE, index=False)
+    elif fmt == "npy":
+        for i, col in enumerate(df.columns):
+            values = df[col].to_numpy()
+            files[str(col)] = f"col_{i}.npy"
+            if values.dtype == object:
+                pickled.append(str(col))
+            np.save(cache_dir / files[str(col)], values, allow_pickle=values.dtype == object)
+    else:
+        raise ValueError(f"Unknown columnar format: {fmt}")
+
+    manifest = {
+        "format": fmt,
+        "rows": len(df),
+        "columns": [str(c) for c in df.columns],
+        "dtypes": {str(c): str(t) for c, t in df.dtypes.items()},
+        "files": files,
+        "pickled": pickled,
+        **(extra or {}),
+    }
+    tmp = manifest_path.with_name(CACHE_MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp, manifest_path)
+    return manifest
+
+
+def read_manifest(cache_dir) -> Optional[dict]:
+    """The cache manifest under cache_dir, or None if there is no complete cache."""
+    manifest_path = Path(cache_dir) / CACHE_MANIFEST
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def read_columnar(cache_dir, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read a cache written by write_columnar, decoding only the given columns."""
+    cache_dir = Path(cache_dir)
+    manifest = read_manifest(cache_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No columnar cache at {cache_dir}")
+    columns = manifest["columns"] if columns is None else list(columns)
+
+    if manifest["format"] == "parquet":
+        return pd.read_parquet(cache_dir / _PARQUET_FILE, columns=columns)
+
+    data = {}
+    for col in columns:
+        dtype = manifest["dtypes"][col]
+        values = np.load(cache_dir / manifest["files"][col], allow_pickle=col in manifest["pickled"])
+        series = pd.Series(values, name=col)
+        data[col] = series if str(series.dtype) == dtype else series.astype(dtype)
+    return pd.DataFrame(data, columns=columns)
+
+
+def load_clean_dataset(path, cache_dir, columns: Optional[Sequence[str]] = None,
+                       clean: Callable[[pd.DataFrame], pd.DataFrame] = clean_dataframe,
+                       on_parse: Optional[Callable[[pd.DataFrame, pd.DataFrame], None]] = None
+                       ) -> Tuple[pd.DataFrame, dict]:
+    """
+    Cleaned DataFrame for the dataset at path, parsed and cleaned at most once.
+
+    The first call loads and cleans the whole file and caches the cleaned frame
+    under cache_dir. Later calls with the same source file (name, size, mtime)
+    read only `columns` from the cache. Requested columns the dataset does not
+    have are ignored, so callers can report them. Cleaning is always done on
+    all columns, so the rows kept never depend on the projection.
+    on_parse(raw_df, cleaned_df) is called whenever the file is parsed.
+
+    Returns (df, info) where info reports cache "hit"/"miss", format and seconds.
+    """
+    start = time.perf_counter()
+    source = source_fingerprint(path)
+    manifest = read_manifest(cache_dir)
+    hit = manifest is not None and manifest.get("source") == source
+
+    if hit:
+        if columns is not None:
+            columns = [c for c in manifest["columns"] if c in set(columns)]
+        df = read_columnar(cache_dir, columns)
+        df.attrs["memory_report"] = manifest.get("memory_report")
+    else:
+        raw = load_dataset(path)
+        df = clean(raw)
+        if on_parse is not None:
+            on_parse(raw, df)
+        del raw
+        manifest = write_columnar(df, cache_dir, extra={"source": source,
+                                                        "memory_report": df.attrs.get("memory_report")})
+        if columns is not None:
+            wanted = set(columns)
+            df = df[[c for c in df.columns if c in wanted]]
+
+    info = {
+        "cache": "hit" if hit else "miss",
+        "format": manifest["format"],
+        "columns_read": len(df.columns),
+        "columns_total": len(manifest["columns"]),
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+    return df, info
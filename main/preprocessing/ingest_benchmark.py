@@ -0,0 +1,119 @@
+"""Read/write throughput of the supported on-disk formats, CSV as the baseline."""
+import importlib.util
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .ingest import load_dataset, pyarrow, read_columnar, write_columnar
+
+
+def _excel_writer_available() -> bool:
+    return any(importlib.util.find_spec(m) is not None for m in ("openpyxl", "xlsxwriter"))
+
+
+def _write_zip(df: pd.DataFrame, path: Path, parts: int):
+    """df as `parts` CSV members of one deflated ZIP (one dataset split across files)."""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        for i, chunk in enumerate(np.array_split(np.arange(len(df)), parts)):
+            z.writestr(f"part_{i:03d}.csv", df.iloc[chunk].to_csv(index=False))
+
+
+def _median_seconds(fn: Callable[[], Any], repeats: int) -> float:
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return float(np.median(runs))
+
+
+def _dir_bytes(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _formats(work_dir: Path, zip_parts: int) -> Dict[str, Dict[str, Any]]:
+    """{name: {path, write(df), read(columns)}} for every format available here."""
+    csv_path = work_dir / "frame.csv"
+    zip_path, parts_path = work_dir / "frame.zip", work_dir / "frame_parts.zip"
+    formats = {
+        "csv": {
+            "path": csv_path,
+            "write": lambda df: df.to_csv(csv_path, index=False),
+            "read": lambda columns: pd.read_csv(csv_path, usecols=columns),
+        },
+        "npy_columns": {
+            "path": work_dir / "npy_columns",
+            "write": lambda df: write_columnar(df, work_dir / "npy_columns", fmt="npy"),
+            "read": lambda columns: read_columnar(work_dir / "npy_columns", columns),
+        },
+        "zip_csv": {
+            "path": zip_path,
+            "write": lambda df: _write_zip(df, zip_path, 1),
+            "read": lambda columns: load_dataset(zip_path, columns),
+        },
+        f"zip_csv_{zip_parts}_parts": {
+            "path": parts_path,
+            "write": lambda df: _write_zip(df, parts_path, zip_parts),
+            "read": lambda columns: load_dataset(parts_path, columns),
+        },
+    }
+    if _excel_writer_available():
+        xlsx_path = work_dir / "frame.xlsx"
+        formats["xlsx"] = {
+            "path": xlsx_path,
+            "write": lambda df: df.to_excel(xlsx_path, index=False),
+            "read": lambda columns: load_dataset(xlsx_path, columns),
+        }
+    if pyarrow is not None:
+        parquet_path, feather_path = work_dir / "frame.parquet", work_dir / "frame.feather"
+        formats["parquet"] = {
+            "path": parquet_path,
+            "write": lambda df: df.to_parquet(parquet_path, index=False),
+            "read": lambda columns: pd.read_parquet(parquet_path, columns=columns),
+        }
+        formats["feather"] = {
+            "path": feather_path,
+            "write": lambda df: df.reset_index(drop=True).to_feather(feather_path),
+            "read": lambda columns: pd.read_feather(feather_path, columns=columns),
+        }
+    return formats
+
+
+def benchmark_formats(df: pd.DataFrame, work_dir, columns: Optional[Sequence[str]] = None,
+                      repeats: int = 3, zip_parts: int = 4) -> Dict[str, Dict[str, Any]]:
+    """
+    Write df in every available format under work_dir and time reading it back.
+
+    Per format: bytes on disk, write_seconds, read_seconds and rows_per_second
+    for a full read, and projected_read_seconds for reading only `columns`
+    (default: the first column). ZIPs are timed as one CSV member and as
+    zip_parts members read in parallel. Parquet/Feather are included when
+    pyarrow is installed, xlsx when an Excel writer is (it is read with the
+    engine load_dataset picks). Reads report the median of `repeats` runs.
+    """
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    columns = list(columns) if columns is not None else [df.columns[0]]
+
+    report = {}
+    for name, fmt in _formats(work_dir, zip_parts).items():
+        write_seconds = _median_seconds(lambda: fmt["write"](df), 1)
+        read_seconds = _median_seconds(lambda: fmt["read"](None), repeats)
+        report[name] = {
+            "bytes": _dir_bytes(fmt["path"]),
+            "write_seconds": round(write_seconds, 4),
+            "read_seconds": round(read_seconds, 4),
+            "rows_per_second": round(len(df) / max(read_seconds, 1e-9), 1),
+            "projected_columns": len(columns),
+            "projected_read_seconds": round(_median_seconds(lambda: fmt["read"](columns), repeats), 4),
+        }
+    csv_seconds = report["csv"]["read_seconds"]
+    for entry in report.values():
+        entry["speedup_vs_csv"] = round(csv_seconds / max(entry["read_seconds"], 1e-9), 2)
+    return report
@@ -1,15 +1,19 @@
 import numpy as np
 import pandas as pd
 import json
-import os
+import joblib
 from pathlib import Path
-from .datacleaning import clean_dataframe
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.model_selection import train_test_split
 from scipy.sparse import hstack, issparse, save_npz
 from typing import Optional
-from .EDA import perform_eda, plot_correlation_heatmap, pca_reduction
+from .EDA import perform_eda
+from .dtypes import FLOAT_DTYPE, array_nbytes, memory_report, smallest_int_dtype
+from .incremental import FEATURE_STATE_FILE
+
+# rows per StandardScaler.partial_fit call when scaling in place
+SCALE_CHUNK_ROWS = 65536
 
 def infer_task_type(y: pd.Series, classification_threshold=20, ratio_threshold=0.05):
     """Infer ML task type (classification or regression)."""
@@ -26,18 +30,68 @@ def infer_task_type(y: pd.Series, classification_threshold=20, ratio_threshold=0
     return "classification"
 
 
+def _is_numeric(series: pd.Series) -> bool:
+    # same columns as select_dtypes(include=np.number), without building a frame
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def _scale_columns_inplace(X: np.ndarray, columns, chunk_rows: Optional[int] = None) -> StandardScaler:
+    """
+    Standardize X[:, columns] in place. The scaler is fitted with partial_fit
+    over row chunks (SCALE_CHUNK_ROWS by default), so only a chunk of the
+    selected columns is ever copied.
+    """
+    chunk_rows = chunk_rows or SCALE_CHUNK_ROWS
+    scaler = StandardScaler()
+    for start in range(0, X.shape[0], chunk_rows):
+        scaler.partial_fit(X[start:start + chunk_rows, columns])
+    for j, mean, scale in zip(columns, scaler.mean_, scaler.scale_):
+        column = X[:, j]
+        column -= mean
+        column /= scale
+    return scaler
+
+
+def _save_feature_state(feature_state, save_path: Path):
+    path = save_path / FEATURE_STATE_FILE
+    if feature_state is None:
+        path.unlink(missing_ok=True)  # a stale state must not describe these arrays
+    else:
+        joblib.dump(feature_state, path)
+
+
 def process_features(
     cleaned_df: pd.DataFrame,
     target_col: str = "",
     save_dir: Optional[str] = None,
     test_size: float = 0.2,
     random_state: int = 42,
+    report_dir: Optional[str] = None,
+    float_dtype=FLOAT_DTYPE,
 ):
     """
     Process features for ML tasks and optionally save train/val arrays + metadata.
 
-    Minimal return (per request): returns only X, y, and task_type.
+    If report_dir is given, the EDA report is rendered there in the background;
+    the returned "eda_report" job can be waited on for its manifest.
+
+    Dtype policy: features (and regression targets) are produced and saved as
+    float_dtype (float32 by default; None keeps float64); label-encoded
+    categoricals and class labels use int8/int16 where they fit. The bytes
+    saved against float64 are reported in metadata["memory"].
+
+    Copies: cleaned_df is read column by column into one Fortran-ordered
+    feature matrix, numeric columns are scaled in place, and PCA / pruning
+    avoid full-size temporaries where they can, so peak memory stays within
+    about twice the cleaned frame.
+
+    Minimal return (per request): returns X, y, task_type, the EDA report job,
+    the memory report and the feature state (the fitted encoders, scaler,
+    pruned columns and PCA, saved as feature_state.joblib with the arrays)
+    that incremental.transform_rows applies to appended rows. The state is
+    None when there are text columns.
     """
+    dtype = np.dtype(float_dtype or np.float64)
     encoders = {}
     vectorizers = {}
 
@@ -47,68 +101,113 @@ def process_features(
     
     if target_col and target_col in cleaned_df.columns:
         y = cleaned_df[target_col]
-        X_df = cleaned_df.drop(columns=[target_col]).copy()
         task_type = infer_task_type(y)
     else:
         y = None
-        X_df = cleaned_df.copy()
         task_type = "clustering"
+    feature_cols = [col for col in cleaned_df.columns if y is None or col != target_col]
 
     # --- Detect column types ---
-    numeric_cols = X_df.select_dtypes(include=np.number).columns
+    numeric_cols = [col for col in feature_cols if _is_numeric(cleaned_df[col])]
     categorical_cols = []
     text_cols = []
 
-    for col in X_df.select_dtypes(include=["object", "category"]).columns:
-        n_unique = X_df[col].nunique()
+    for col in feature_cols:
+        if not (cleaned_df[col].dtype == object or isinstance(cleaned_df[col].dtype, pd.CategoricalDtype)):
+            continue
+        n_unique = cleaned_df[col].nunique()
         if n_unique < 50:  # treat as categorical
             categorical_cols.append(col)
         else:  # treat as free text
             text_cols.append(col)
 
-    # --- Encode categorical features ---
-    for col in categorical_cols:
-        le = LabelEncoder()
-        X_df[col] = le.fit_transform(X_df[col].astype(str))
-        encoders[col] = dict(zip(le.classes_, le.transform(le.classes_)))
-
     # --- Vectorize text features ---
     text_features = []
     text_feature_names = []
+    text_term_names = []
     for col in text_cols:
-        vectorizer = TfidfVectorizer(max_features=500)
-        text_matrix = vectorizer.fit_transform(X_df[col].astype(str).fillna(""))
+        vectorizer = TfidfVectorizer(max_features=500, dtype=dtype)
+        text_matrix = vectorizer.fit_transform(cleaned_df[col].astype(str).fillna(""))
         text_features.append(text_matrix)
         text_feature_names.append(col)
+        text_term_names.extend(f"{col}:{term}" for term in vectorizer.get_feature_names_out())
         vectorizers[col] = vectorizer
-        X_df = X_df.drop(columns=[col])
 
-    # --- Scale numeric features ---
-    scaler = StandardScaler()
+    # --- Fill the numeric + categorical block column by column ---
+    # Fortran order keeps each column contiguous, so writes and in-place scaling
+    # touch one column at a time and no second full-size array is made.
+    dense_cols = [col for col in feature_cols if col not in vectorizers]
+    X_numeric = np.empty((len(cleaned_df), len(dense_cols)), dtype=dtype, order="F")
+    for j, col in enumerate(dense_cols):
+        if col in categorical_cols:
+            # --- Encode categorical features ---
+            le = LabelEncoder()
+            codes = le.fit_transform(cleaned_df[col].astype(str))
+            encoders[col] = dict(zip(le.classes_, le.transform(le.classes_)))
+            X_numeric[:, j] = codes.astype(smallest_int_dtype(len(le.classes_)))
+        else:
+            X_numeric[:, j] = cleaned_df[col].to_numpy()
+
+    # --- Scale numeric features (in place) ---
     if len(numeric_cols) > 0:
-        X_df[numeric_cols] = scaler.fit_transform(X_df[numeric_cols])
+        scaler = _scale_columns_inplace(X_numeric, [dense_cols.index(col) for col in numeric_cols])
     else:
         scaler = None
 
     # --- Combine numeric + categorical + text ---
-    X_numeric = X_df.to_numpy()
     if text_features:
-        X_final = hstack([X_numeric] + text_features)
+        X_final = hstack([X_numeric] + text_features, format="csr")
     else:
         X_final = X_numeric
 
     # --- Encode target if classification ---
     if task_type == "classification" and y is not None:
         le_target = LabelEncoder()
-        y_final = le_target.fit_transform(y.astype(str))
+        y_final = le_target.fit_transform(y.astype(str)).astype(smallest_int_dtype(len(le_target.classes_)))
         encoders["target"] = dict(zip(le_target.classes_, le_target.transform(le_target.classes_)))
     elif task_type == "regression" and y is not None:
-        y_final = y.astype(float).to_numpy()
+        y_final = y.to_numpy(dtype=dtype)
     else:
         y_final = None
     
-    eda_result = perform_eda(X_final, corr_threshold=0.9, pca_variance=0.95)
-    X_final=eda_result["X_reduced"]
+    eda_result = perform_eda(X_final, corr_threshold=0.9, pca_variance=0.95, report_dir=report_dir,
+                             feature_names=dense_cols + text_term_names)
+    X_final = eda_result["X_reduced"].astype(dtype, copy=False)
+    # float64 equivalent of what is kept in memory and saved
+    float64_bytes = array_nbytes(X_final) * 8 // dtype.itemsize if not issparse(X_final) else \
+        array_nbytes(X_final) + X_final.nnz * (8 - dtype.itemsize)
+    memory = {
+        "float_dtype": dtype.name,
+        "features": memory_report(float64_bytes, array_nbytes(X_final)),
+        "cleaning": cleaned_df.attrs.get("memory_report"),
+    }
+    removed = eda_result["removed_corr_columns"]
+    if isinstance(removed, dict):
+        pruned_summary = {stage: len(cols) for stage, cols in removed.items() if stage != "kept"}
+    else:
+        pruned_summary = {"correlated": len(removed)}
+
+    feature_state = None
+    if not text_cols:
+        scaled_idx = [dense_cols.index(col) for col in numeric_cols]
+        feature_state = {
+            "task_type": task_type,
+            "target_col": target_col or None,
+            "dtype": dtype.name,
+            "dense_cols": dense_cols,
+            "text_cols": list(text_cols),
+            "encoders": {col: {str(k): int(v) for k, v in codes.items()}
+                         for col, codes in encoders.items() if col != "target"},
+            "target_codes": {str(k): int(v) for k, v in encoders.get("target", {}).items()},
+            "target_dtype": y_final.dtype.name if task_type == "classification" else None,
+            "scaled_idx": scaled_idx,
+            # frozen transform; "scaler" keeps updating as rows are appended
+            "scale_mean": scaler.mean_.copy() if scaler is not None else None,
+            "scale_scale": scaler.scale_.copy() if scaler is not None else None,
+            "scaler": scaler,
+            "kept": list(removed["kept"]) if isinstance(removed, dict) else list(range(len(dense_cols))),
+            "pca": eda_result["pca_model"],
+        }
     # --- Optionally save train/val arrays + metadata ---
 
     if save_dir:
@@ -149,11 +248,16 @@ def process_features(
                 "encoders": list(encoders.keys()),
                 "vectorizers": list(vectorizers.keys()),
                 "scaler_present": scaler is not None,
-                "notes": "Encoders/vectorizers are kept in memory; metadata lists their keys only."
+                "pruned_columns": pruned_summary,
+                "pca": eda_result["pca_info"],
+                "dtypes": {"X": str(X_train.dtype), "y": str(y_train.dtype)},
+                "memory": memory,
+                "notes": "Encoders, scaler and PCA are saved in feature_state.joblib; metadata lists their keys only."
             }
 
             with open(save_path / "metadata.json", "w") as f:
                 json.dump(metadata, f, indent=4)
+            _save_feature_state(feature_state, save_path)
 
             print(f"✅ Saved train/val arrays and metadata to: {save_path}")
 
@@ -178,11 +282,16 @@ def process_features(
                 "encoders": list(encoders.keys()),
                 "vectorizers": list(vectorizers.keys()),
                 "scaler_present": scaler is not None,
+                "pruned_columns": pruned_summary,
+                "pca": eda_result["pca_info"],
+                "dtypes": {"X": str(X_final.dtype)},
+                "memory": memory,
                 "notes": "Clustering mode: no y saved."
             }
 
             with open(save_path / "metadata.json", "w") as f:
                 json.dump(metadata, f, indent=4)
+            _save_feature_state(feature_state, save_path)
 
             print(f"✅ Saved full feature matrix and metadata to: {save_path}")
 
@@ -190,22 +299,8 @@ def process_features(
     return {
         "X": X_final,
         "y": y_final,
-        "task_type": task_type
+        "task_type": task_type,
+        "eda_report": eda_result["report"],
+        "memory_report": memory,
+        "feature_state": feature_state,
     }
-
-# Refer here to run preprocessing on all files in a directory
-# if __name__ == "__main__":
-
-#     for files in os.listdir('main/raw_data'):
-#         if files.endswith('.csv'):
-#             df = pd.read_csv(os.path.join('main/raw_data',files))
-#             df= clean_dataframe(df)
-#             result = process_features(df, target_col="Sales ($)", save_dir="./processed_data")
-#         if files.endswith('.xlsx'):
-#             df = pd.read_excel(os.path.join('main/raw_data',files))
-#             df= clean_dataframe(df)
-#             result = process_features(df, target_col="Sales ($)", save_dir="./processed_data")
-    
-    
-    
-
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+
+def stratified_subsample(
+    df: pd.DataFrame,
+    n_rows: int,
+    target_col: str = "",
+    problem_type: str = "classification",
+    n_bins: int = 10,
+    random_state: int = 42,
+) -> pd.DataFrame:
+    """
+    Draw a subsample of about n_rows rows that preserves the target distribution.
+
+      - classification: stratified by class, every class keeps at least one row
+      - regression: stratified by quantile bins of the target (n_bins)
+      - clustering / no target: uniform random sample
+
+    Returns the original frame unchanged if it already has <= n_rows rows.
+    """
+    if len(df) <= n_rows:
+        return df
+
+    if not target_col or problem_type not in ("classification", "regression"):
+        return df.sample(n=n_rows, random_state=random_state).reset_index(drop=True)
+
+    y = df[target_col]
+    if problem_type == "regression":
+        strata = pd.qcut(y.astype(float), q=n_bins, labels=False, duplicates="drop")
+    else:
+        strata = y.astype(str)
+
+    rng = np.random.default_rng(random_state)
+    fraction = n_rows / len(df)
+    picked = []
+    for _, idx in strata.groupby(strata, sort=False).indices.items():
+        take = max(1, int(round(len(idx) * fraction)))
+        picked.append(rng.choice(idx, size=min(take, len(idx)), replace=False))
+
+    rows = np.sort(np.concatenate(picked))
+    return df.iloc[rows].reset_index(drop=True)
+
+
+def estimate_fit_seconds(small_n: int, small_seconds: float, large_n: int, large_seconds: float,
+                         target_n: int, min_seconds: float = 0.01) -> dict:
+    """
+    Extrapolate fit time to target_n rows assuming t = a * n**b, with the
+    exponent b measured from two subsample sizes (clamped to [0.5, 3]).
+
+    When the measured times are too small to be reliable, b falls back to 1;
+    without a measured row count there is nothing to extrapolate from (None).
+    """
+    if large_n <= 0:
+        return {"scaling_exponent": None, "estimated_full_fit_seconds": None}
+    if small_seconds >= min_seconds and large_seconds >= min_seconds and large_n > small_n > 0:
+        exponent = np.log(large_seconds / small_seconds) / np.log(large_n / small_n)
+        exponent = float(np.clip(exponent, 0.5, 3.0))
+    else:
+        exponent = 1.0
+    estimate = large_seconds * (target_n / large_n) ** exponent
+    return {"scaling_exponent": round(exponent, 3), "estimated_full_fit_seconds": round(float(estimate), 3)}
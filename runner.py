@@ -5,24 +5,244 @@ import io
 from contextlib import redirect_stdout
 import pandas as pd
 from pathlib import Path
-import zipfile
 import sys, os
-import joblib
 import numpy as np
+import joblib
 
 # Make project importable regardless of run context
 ROOT = Path(__file__).resolve().parent
 if str(ROOT.parent) not in sys.path:
     sys.path.insert(0, str(ROOT.parent))
 
+# trained models shared across runs, keyed by processed data, script source and params
+MODEL_CACHE_DIR = ROOT / "main" / "model_cache"
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
 # Project imports
-from main.preprocessing.datacleaning import clean_dataframe
+from main.preprocessing.ingest import (
+    load_clean_dataset, load_dataset, read_columnar, read_manifest, source_fingerprint, write_columnar,
+)
+from main.preprocessing.incremental import (
+    FEATURE_STATE_FILE, SOURCE_STATE_FILE, advance_source_state, append_processed, detect_append,
+    restore_on_error, source_state, transform_rows, write_state,
+)
 from main.preprocessing.preprocessor import process_features
+from main.preprocessing.sampling import stratified_subsample, estimate_fit_seconds
 from main.model_training.orchestrator import Orchestrator
-from main.final_model_selection.final_model_sel import compute_model_scores
+from main.model_training.ensemble import ENSEMBLE_NAME
+from main.model_training.batch import load_batch_manifest, run_batch
+from main.model_training.incremental import update_models
+from main.model_training.cache import TrainingCache
+from main.model_training.checkpoint import RunCheckpoint, run_key
+from main.model_training.isolation import ResourceLimits
+from main.final_model_selection.final_model_sel import rank_models
+
+
+def run_preview(df: pd.DataFrame, problem_type: str, target_col: str, preview_rows: int, results_dir: Path,
+                test_size: float = 0.2, isolation: ResourceLimits = None):
+    """
+    Fast preview: train every model script on a stratified (classification) or
+    quantile-binned (regression) subsample of preview_rows rows, and on half of
+    that sample, to rank the models and extrapolate their full-data fit times
+    from the measured scaling.
+    """
+    project_root = ROOT / "main"
+    preview_dir = results_dir / "preview"
+    sample = stratified_subsample(df, preview_rows, target_col=target_col, problem_type=problem_type)
+    half = stratified_subsample(sample, preview_rows // 2, target_col=target_col, problem_type=problem_type)
+
+    runs = {}
+    for size, frame in ((len(half), half), (len(sample), sample)):
+        processed_dir = preview_dir / f"processed_{size}"
+        process_features(frame, target_col=target_col, save_dir=str(processed_dir), test_size=test_size)
+        runs[size] = Orchestrator(
+            dataset_path=processed_dir,
+            model_scripts_path=project_root / "model_scripts",
+            output_path=preview_dir / f"models_{size}",
+            ensemble=False,  # the preview ranks and times the model scripts themselves
+            isolation=isolation
+        ).run()
+
+    small, large = sorted(runs)
+    ranked = rank_models(runs[large])
+    full_train_rows = int(len(df) * (1 - test_size))
+    models = {}
+    for model_name, info in runs[large].items():
+        small_meta = runs[small].get(model_name, {}).get("metadata", {})
+        large_meta = info["metadata"]
+        models[model_name] = {
+            "score": ranked["scores"][model_name],
+            "val_metrics": info["metrics"].get("val"),
+            "preview_fit_seconds": large_meta["fit_seconds"],
+            **estimate_fit_seconds(
+                small_meta.get("train_samples", 0), small_meta.get("fit_seconds", 0.0),
+                large_meta.get("train_samples", 0), large_meta["fit_seconds"],
+                full_train_rows,
+            ),
+        }
+
+    return {"rows": len(sample), "full_train_rows": full_train_rows, "ranking": ranked["ranking"], "models": models}
+
+
+def _coefficients(results: dict, best_model: str, meta: dict):
+    """Coefficients of the best regression model, from the weights the trainer extracted in memory."""
+    weights = results[best_model].get("weights") or {}
+    if meta.get("problem_type") != "regression" or weights.get("coef") is None:
+        return None
+    feature_names = meta.get("numeric_cols", [])
+    coef = np.asarray(weights["coef"], dtype=float)
+    intercept = weights.get("intercept")
+
+    if coef.ndim > 1:
+        coef = coef[0]
+        intercept = np.ravel(intercept)[0] if intercept is not None else None
+
+    if len(coef) != len(feature_names):
+        feature_names = [f"feature_{i}" for i in range(len(coef))]
+
+    coef_map = {feature_names[i]: float(coef[i]) for i in range(len(coef))}
+    coef_map["intercept"] = float(np.ravel(intercept)[0]) if intercept is not None else 0.0
+    return coef_map
+
+
+def _write_summary(results: dict, summary_path: Path):
+    # renamed into place: an interrupted write keeps the previous summary
+    tmp_path = summary_path.with_name(summary_path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(results, f, indent=4)
+    os.replace(tmp_path, summary_path)
+
+
+def run_incremental(dataset_path: Path, problem_type: str, target_col: str, processed_dir: Path,
+                    results_dir: Path, budgets: dict, compress=None):
+    """
+    Update a previous run of this dataset when the upload only appends rows
+    to the file it was trained on (same columns, identical leading rows).
+
+    The new rows are cleaned with the saved cleaning statistics (updated
+    from them), mapped into the saved feature space and appended to the
+    processed arrays; models supporting partial_fit / warm_start are updated,
+    the others are re-scored and flagged for a full retrain. Returns the
+    results, or None (with the reason printed) when a full run is needed.
+
+    The processed arrays, model artifacts, summary and states are restored if
+    any step fails, so a retry appends the same rows once; the source state
+    is written last and commits the update.
+    """
+    cleaned_dir = processed_dir / "cleaned"
+    summary_path = results_dir / "training_summary.json"
+    paths = (cleaned_dir / SOURCE_STATE_FILE, processed_dir / FEATURE_STATE_FILE, summary_path)
+    manifest = read_manifest(cleaned_dir)
+    if manifest is None or not all(path.exists() for path in paths):
+        print("ℹ️ No previous run to update; running the full pipeline")
+        return None
+    state, feature_state = joblib.load(paths[0]), joblib.load(paths[1])
+    with open(summary_path, "r") as f:
+        previous = json.load(f)
+    if feature_state["task_type"] != problem_type or (feature_state["target_col"] or None) != (target_col or None):
+        print("ℹ️ Problem type or target changed; running the full pipeline")
+        return None
+
+    raw = load_dataset(dataset_path)
+    try:
+        n_added = detect_append(raw, state)
+        cleaned_new = state["cleaning"].clean(raw.iloc[state["rows"]:])
+        X_new, y_new, drift = transform_rows(cleaned_new, feature_state)
+    except ValueError as e:
+        print(f"ℹ️ Not an append-only update ({e}); running the full pipeline")
+        return None
+    print(f"➕ {n_added} appended rows, {len(cleaned_new)} kept after cleaning")
+
+    artifacts = [name for name, r in previous.items() if isinstance(r, dict) and "metrics" in r]
+    written = {*paths, *(p for p in processed_dir.iterdir() if p.is_file()),
+               *(results_dir / f"{name}.joblib" for name in {*artifacts, ENSEMBLE_NAME})}
+    with restore_on_error(written):
+        X_train, y_train, X_val, y_val, meta = append_processed(processed_dir, X_new, y_new)
+        results, _ = update_models(results_dir, previous, problem_type, meta["appended"][-1]["train_rows"],
+                                   X_train, y_train, X_val, y_val, compress=compress)
+
+        ranking = rank_models(results, **budgets)
+        # no model within the serving budgets: fall back to the best-scoring one
+        best_model = ranking["best"] or ranking["ranking"][0]
+        results["best_model"] = best_model
+        results["model_scores"] = results[best_model].get("weights")
+        results["ranking"] = ranking
+        models = [n for n, r in results.items() if isinstance(r, dict) and "incremental" in r.get("metadata", {})]
+        results["incremental"] = {
+            "rows_added": n_added,
+            "rows_kept": int(len(cleaned_new)),
+            "updated": [n for n in models if results[n]["metadata"]["incremental"]["mode"] is not None],
+            "needs_full_retrain": [n for n in models if results[n]["metadata"]["incremental"]["needs_full_retrain"]],
+            **drift,
+        }
+        for key in ("ingest", "eda_report"):
+            if key in previous:
+                results[key] = previous[key]
+        _write_summary(results, summary_path)
+        write_state(feature_state, paths[1])
+        write_state(advance_source_state(state, raw), paths[0])
+
+    # the cleaned-frame cache now describes the grown file; write_columnar drops
+    # its manifest first, so if it fails here the next run rebuilds the cache
+    cached = pd.concat([read_columnar(cleaned_dir), cleaned_new], ignore_index=True)
+    write_columnar(cached, cleaned_dir, fmt=manifest["format"],
+                   extra={"source": source_fingerprint(dataset_path), "memory_report": manifest.get("memory_report")})
+    print(f"📄 Summary saved: {summary_path}")
+    results["summary_path"] = str(summary_path)
 
+    coefficients = _coefficients(results, best_model, meta)
+    if coefficients is not None:
+        results["coefficients"] = coefficients
+    return results
 
-def run_pipeline(file_path: str, problem_type: str, target_col: str = None):
+
+def run_pipeline(file_path: str, problem_type: str, target_col: str = None,
+                 preview_rows: int = None, preview_top_k: int = None, max_predict_seconds: float = None,
+                 min_rows_per_second: float = None, columns: list = None, incremental: bool = False,
+                 weights: dict = None, use_cache: bool = True, cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 resume: bool = True, model_limits: dict = None, compress: int = None):
+    """
+    Run the full AutoML pipeline on one dataset.
+
+    Fast preview: when preview_rows is set and the cleaned dataset is larger,
+    all models are first ranked on a subsample (see run_preview). Without
+    preview_top_k only the preview is returned; with it, the full-data run
+    trains just the top-k preview models.
+
+    max_predict_seconds / min_rows_per_second: serving budgets (validation-split
+    predict time, single-core predict throughput); the best model is chosen
+    among models within them (see rank_models).
+
+    Accepts .csv, .xls/.xlsx, .parquet, .feather and .zip. The cleaned frame
+    is cached in a columnar format under processed_data/<name>/cleaned, so
+    re-runs on the same file skip parsing and cleaning; columns (feature
+    columns, the target is added) limits what is read back.
+
+    incremental: when the file only appends rows to the one the previous run
+    used, that run is updated instead of repeated (see run_incremental);
+    otherwise the full pipeline runs.
+
+    weights: model selection weights (see rank_models). Trained models are
+    cached under MODEL_CACHE_DIR (use_cache=False disables it; least recently
+    used entries are evicted beyond cache_max_bytes), so re-running on an
+    unchanged dataset, e.g. with other weights, skips training.
+
+    resume: stages and models are checkpointed under
+    model_results/<name>/checkpoints as they complete, so re-running an
+    interrupted run with the same inputs continues after the last completed
+    stage / model (resume=False starts over). A model script that raises is
+    reported in results["failed_models"] instead of aborting the run.
+
+    model_limits: ResourceLimits fields (memory_mb, cpu_seconds,
+    timeout_seconds, threads). When given, every model script trains in a
+    supervised subprocess under them (see isolation.py); a model exceeding a
+    limit is killed and reported as failed. Each isolated model's wall / CPU
+    seconds and peak RSS are in results["resource_usage"].
+
+    compress: joblib compression level for every saved model; by default KNN,
+    SVM and the ensemble are saved uncompressed (memory-mapped on load) and
+    the others with DEFAULT_COMPRESS.
+    """
     print("\n===============================")
     print("🚀 Starting AutoML Pipeline")
     print("===============================\n")
@@ -33,36 +253,43 @@ def run_pipeline(file_path: str, problem_type: str, target_col: str = None):
 
     dataset_name = dataset_path.stem
     project_root = ROOT / "main"
+    processed_dir = project_root / "processed_data" / dataset_name
+    results_dir = project_root / "model_results" / dataset_name
+    isolation = ResourceLimits(**model_limits) if model_limits is not None else None
+    budgets = {"weights": weights, "max_predict_seconds": max_predict_seconds,
+               "min_rows_per_second": min_rows_per_second}
+
+    if incremental:
+        if problem_type not in ["regression", "classification"]:
+            target_col = None
+        results = run_incremental(dataset_path, problem_type, target_col, processed_dir, results_dir, budgets,
+                                  compress=compress)
+        if results is not None:
+            print("\n🎉 AutoML Pipeline completed (incremental update).\n")
+            return results
 
     # -------------------------------------------------------
     # 1) LOAD DATASET
     # -------------------------------------------------------
     print(f"📂 Loading dataset: {dataset_path.name}")
 
-    if dataset_path.suffix.lower() == ".csv":
-        df = pd.read_csv(dataset_path)
-    elif dataset_path.suffix.lower() in [".xls", ".xlsx"]:
-        df = pd.read_excel(dataset_path)
-    elif dataset_path.suffix.lower() == ".zip":
-        with zipfile.ZipFile(dataset_path, 'r') as z:
-            file_list = z.namelist()
-            csv_files = [f for f in file_list if f.lower().endswith(".csv")]
-            xlsx_files = [f for f in file_list if f.lower().endswith((".xls", ".xlsx"))]
-
-            if csv_files:
-                df = pd.read_csv(z.open(csv_files[0]))
-            elif xlsx_files:
-                df = pd.read_excel(z.open(xlsx_files[0]))
-            else:
-                raise ValueError("❌ ZIP contains no CSV/XLSX file")
+    # Parsed and cleaned once per source file; later runs read the cleaned
+    # columns back from the columnar cache (only the requested ones)
+    needed = None
+    if columns:
+        needed = list(columns) + ([target_col] if target_col and target_col not in columns else [])
+    cleaned_dir = processed_dir / "cleaned"
+
+    def record_state(raw, cleaned):
+        # the raw rows' digest and cleaning statistics, for later incremental runs
+        cleaned_dir.mkdir(parents=True, exist_ok=True)
+        joblib.dump(source_state(raw, cleaned), cleaned_dir / SOURCE_STATE_FILE)
+
+    df, ingest_info = load_clean_dataset(dataset_path, cleaned_dir, columns=needed, on_parse=record_state)
+    if ingest_info["cache"] == "hit":
+        print(f"⚡ Read {ingest_info['columns_read']}/{ingest_info['columns_total']} cleaned columns from cache")
     else:
-        raise ValueError("❌ Unsupported format. Use .csv, .xlsx, or .zip")
-
-    # -------------------------------------------------------
-    # 2) CLEAN & VALIDATE TARGET
-    # -------------------------------------------------------
-    print("🧹 Cleaning dataset...")
-    df = clean_dataframe(df)
+        print("🧹 Cleaning dataset...")
 
     if problem_type in ["regression", "classification"]:
         if not target_col:
@@ -72,74 +299,133 @@ def run_pipeline(file_path: str, problem_type: str, target_col: str = None):
     else:
         target_col = None
 
+    results_dir.mkdir(parents=True, exist_ok=True)
+    # completed stages / models of an earlier run with these exact inputs
+    checkpoint = None
+    resumed_stages = []
+    if resume:
+        key = run_key(source=source_fingerprint(dataset_path), problem_type=problem_type, target_col=target_col,
+                      columns=needed, preview_rows=preview_rows, preview_top_k=preview_top_k)
+        checkpoint = RunCheckpoint(results_dir / "checkpoints", key)
+
+    # -------------------------------------------------------
+    # 2b) OPTIONAL FAST PREVIEW ON A SUBSAMPLE
+    # -------------------------------------------------------
+    preview = None
+    include_models = None
+    if preview_rows and len(df) > preview_rows:
+        done = checkpoint.stage("preview") if checkpoint is not None else None
+        if done is not None:
+            print("⏩ Preview restored from checkpoint")
+            preview = done["preview"]
+            resumed_stages.append("preview")
+        else:
+            print(f"🔎 Fast preview on {preview_rows} sampled rows...")
+            preview = run_preview(df, problem_type, target_col, preview_rows, results_dir, isolation=isolation)
+            if checkpoint is not None:
+                checkpoint.complete_stage("preview", {"preview": preview})
+        if not preview_top_k:
+            return {"preview": preview}
+        # top-k among the model scripts: the ensemble is rebuilt from whichever of them train
+        include_models = [name for name in preview["ranking"] if name != ENSEMBLE_NAME][:preview_top_k]
+        print(f"➡️ Continuing full-data fit for: {', '.join(include_models)}")
+
     # -------------------------------------------------------
     # 3) PREPROCESS & SAVE PROCESSED DATA
     # -------------------------------------------------------
-    processed_dir = project_root / "processed_data" / dataset_name
-    print("⚙️ Preprocessing features...")
-    process_features(df, target_col=target_col, save_dir=str(processed_dir))
-    print(f"✅ Processed data saved at: {processed_dir}")
+    done = checkpoint.stage("preprocess") if checkpoint is not None else None
+    metadata_path = processed_dir / "metadata.json"
+    if done is not None and metadata_path.exists() and done.get("metadata_mtime_ns") == metadata_path.stat().st_mtime_ns:
+        print(f"⏩ Processed data restored from checkpoint: {processed_dir}")
+        processed = {"eda_manifest": done.get("eda_report")}
+        resumed_stages.append("preprocess")
+    else:
+        print("⚙️ Preprocessing features...")
+        # EDA plots render in the background into results_dir/eda while models train
+        processed = process_features(df, target_col=target_col, save_dir=str(processed_dir),
+                                     report_dir=str(results_dir))
+        print(f"✅ Processed data saved at: {processed_dir}")
+        if checkpoint is not None:
+            checkpoint.complete_stage("preprocess", {"metadata_mtime_ns": metadata_path.stat().st_mtime_ns})
 
     # -------------------------------------------------------
     # 4) TRAIN MODELS
     # -------------------------------------------------------
     print(f"🤖 Training {problem_type} models...")
-    results_dir = project_root / "model_results" / dataset_name
-    results_dir.mkdir(parents=True, exist_ok=True)
 
+    cache = TrainingCache(MODEL_CACHE_DIR, max_bytes=cache_max_bytes) if use_cache else None
     orchestrator = Orchestrator(
         dataset_path=processed_dir,
         model_scripts_path=project_root / "model_scripts",
-        output_path=results_dir
+        output_path=results_dir,
+        include_models=include_models,
+        cache=cache,
+        checkpoint=checkpoint,
+        isolation=isolation,
+        compress=compress
     )
 
     results = orchestrator.run()
+    failures = orchestrator.failures
+    if not results:
+        raise RuntimeError("❌ Every model script failed: " +
+                           "; ".join(f"{name}: {info['error']}" for name, info in failures.items()))
+    if checkpoint is not None:
+        checkpoint.complete_stage("train", {"models": sorted(results), "failed": sorted(failures)})
 
     # -------------------------------------------------------
     # 5) BEST MODEL SELECTION
     # -------------------------------------------------------
-    best_model, scores = compute_model_scores(results)
+    ranking = rank_models(results, **budgets)
+    # no model within the serving budgets: fall back to the best-scoring one
+    best_model = ranking["best"] or ranking["ranking"][0]
     results["best_model"] = best_model
-    results["model_scores"] = scores
+    results["model_scores"] = results[best_model].get("weights")
+    results["ranking"] = ranking
+
+    results["ingest"] = ingest_info
+    if failures:
+        results["failed_models"] = {name: info["error"] for name, info in failures.items()}
+    if isolation is not None:
+        usage = {n: r["metadata"]["resources"] for n, r in results.items()
+                 if isinstance(r, dict) and "resources" in r.get("metadata", {})}
+        usage.update({n: info["resources"] for n, info in failures.items() if "resources" in info})
+        results["resource_usage"] = usage
+    if checkpoint is not None:
+        results["checkpoint"] = {"run_key": checkpoint.key, "resumed_models": checkpoint.resumed,
+                                 "resumed_stages": resumed_stages}
+    if cache is not None:
+        results["training_cache"] = cache.stats()
+    if preview is not None:
+        results["preview"] = preview
+
+    eda_report = processed.get("eda_report")
+    if eda_report is not None:
+        results["eda_report"] = eda_report.wait()
+        if checkpoint is not None:
+            # kept with the stage, so a resumed run still reports it
+            checkpoint.complete_stage("preprocess", {**checkpoint.stage("preprocess"),
+                                                     "eda_report": results["eda_report"]})
+    elif processed.get("eda_manifest") is not None:
+        results["eda_report"] = processed["eda_manifest"]
 
     # Save summary JSON
     summary_path = results_dir / "training_summary.json"
-    with open(summary_path, "w") as f:
-        json.dump(results, f, indent=4)
+    _write_summary(results, summary_path)
+    if checkpoint is not None:
+        checkpoint.complete_stage("summary")
 
     print(f"📄 Summary saved: {summary_path}")
+    results["summary_path"] = str(summary_path)
     print("\n🎉 AutoML Pipeline completed.\n")
 
     # -------------------------------------------------------
-    # 6) SAFE COEFFICIENT EXTRACTION (Regression only)
+    # 6) COEFFICIENTS OF THE BEST MODEL (Regression only)
+    #    built from the weights the trainer extracted in memory
     # -------------------------------------------------------
-    meta_file = processed_dir / "metadata.json"
-    if meta_file.exists():
-        with open(meta_file, "r") as f:
-            meta = json.load(f)
-
-        if meta.get("problem_type") == "regression":
-            feature_names = meta.get("numeric_cols", [])
-
-            model_path = results_dir / f"{best_model}.joblib"
-            if model_path.exists():
-                pipe = joblib.load(model_path)
-                est = getattr(pipe, "named_steps", {}).get("est", pipe)
-
-                coef = getattr(est, "coef_", None)
-                intercept = getattr(est, "intercept_", None)
-
-                if coef is not None:
-                    coef = np.asarray(coef)
-                    if coef.ndim > 1:
-                        coef = coef[0]
-
-                    if len(coef) != len(feature_names):
-                        feature_names = [f"feature_{i}" for i in range(len(coef))]
-
-                    coef_map = {feature_names[i]: float(coef[i]) for i in range(len(coef))}
-                    coef_map["intercept"] = float(intercept) if intercept is not None else 0.0
-                    results["coefficients"] = coef_map
+    coefficients = _coefficients(results, best_model, orchestrator.metadata or {})
+    if coefficients is not None:
+        results["coefficients"] = coefficients
 
     return results
 
@@ -149,20 +435,83 @@ def run_pipeline(file_path: str, problem_type: str, target_col: str = None):
 # =======================================================
 def main():
     parser = argparse.ArgumentParser(description="Run AutoML pipeline.")
-    parser.add_argument("--file", required=True)
-    parser.add_argument("--problem", required=True, choices=["regression", "classification", "clustering"])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file")
+    source.add_argument("--batch",
+                        help="Directory of datasets or a .json/.csv manifest (file, target, problem) to run in parallel")
+    parser.add_argument("--problem", required=False, choices=["regression", "classification", "clustering"],
+                        help="Problem type (with --batch: default for entries without one)")
     parser.add_argument("--target", required=False)
     parser.add_argument("--json", action="store_true")
+    parser.add_argument("--preview-rows", type=int, default=None,
+                        help="Rank all models on a stratified subsample of this many rows first")
+    parser.add_argument("--preview-top-k", type=int, default=None,
+                        help="After the preview, fit only the top-k models on the full data")
+    parser.add_argument("--max-predict-seconds", type=float, default=None,
+                        help="Only pick a best model whose validation-set predict time is within this budget")
+    parser.add_argument("--min-rows-per-second", type=float, default=None,
+                        help="Only pick a best model predicting at least this many rows/sec on one core")
+    parser.add_argument("--columns", default=None,
+                        help="Comma-separated feature columns to use (default: all)")
+    parser.add_argument("--weights", default=None,
+                        help='Model selection weights as JSON, e.g. \'{"r2": 2, "fit_seconds": 1}\'')
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always retrain models instead of reusing cached fits")
+    parser.add_argument("--cache-max-gb", type=float, default=DEFAULT_CACHE_MAX_BYTES / 1024 ** 3,
+                        help="Evict least recently used cached models beyond this size")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Start over instead of resuming an interrupted run with the same inputs")
+    parser.add_argument("--isolate", action="store_true",
+                        help="Train each model script in a supervised subprocess (implied by the limits below)")
+    parser.add_argument("--max-memory-mb", type=float, default=None,
+                        help="Per-model address-space limit (RLIMIT_AS) in MB")
+    parser.add_argument("--max-cpu-seconds", type=float, default=None,
+                        help="Per-model CPU time limit (RLIMIT_CPU)")
+    parser.add_argument("--model-timeout", type=float, default=None,
+                        help="Kill a model's process after this many wall-clock seconds")
+    parser.add_argument("--threads-per-model", type=int, default=None,
+                        help="BLAS / OpenMP / joblib threads for each model's process")
+    parser.add_argument("--compress", type=int, default=None,
+                        help="joblib compression level (0-9) for every saved model; 0 lets them be memory-mapped "
+                             "(default: 0 for KNN, SVM and the ensemble, 3 otherwise)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="If the file only appends rows to the previous run's, update that run's models")
+
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Batch mode: maximum number of datasets processed at once")
+    parser.add_argument("--batch-index", default=str(ROOT / "main" / "model_results" / "batch_index.json"),
+                        help="Batch mode: where to write the consolidated results index")
 
     args = parser.parse_args()
+    if args.batch:
+        datasets = load_batch_manifest(args.batch, problem_type=args.problem, target_col=args.target)
+        index = run_batch(datasets, run_pipeline, args.batch_index, max_workers=args.workers)
+        print(json.dumps(index) if args.json else json.dumps(index, indent=2))
+        return
+    if not args.problem:
+        parser.error("--problem is required with --file")
+    pipeline_kwargs = {"preview_rows": args.preview_rows, "preview_top_k": args.preview_top_k,
+                       "max_predict_seconds": args.max_predict_seconds,
+                       "min_rows_per_second": args.min_rows_per_second,
+                       "columns": args.columns.split(",") if args.columns else None,
+                       "incremental": args.incremental,
+                       "weights": json.loads(args.weights) if args.weights else None,
+                       "use_cache": not args.no_cache,
+                       "cache_max_bytes": int(args.cache_max_gb * 1024 ** 3),
+                       "resume": not args.no_resume,
+                       "compress": args.compress}
+    model_limits = {"memory_mb": args.max_memory_mb, "cpu_seconds": args.max_cpu_seconds,
+                    "timeout_seconds": args.model_timeout, "threads": args.threads_per_model}
+    if args.isolate or any(v is not None for v in model_limits.values()):
+        pipeline_kwargs["model_limits"] = model_limits
 
     if args.json:
         buf = io.StringIO()
         with redirect_stdout(buf):
-            result = run_pipeline(args.file, args.problem, args.target)
+            result = run_pipeline(args.file, args.problem, args.target, **pipeline_kwargs)
         print(json.dumps(result))
     else:
-        result = run_pipeline(args.file, args.problem, args.target)
+        result = run_pipeline(args.file, args.problem, args.target, **pipeline_kwargs)
         print(json.dumps(result, indent=2))
 
 
@@ -0,0 +1,85 @@
+import numpy as np
+
+from main.final_model_selection.final_model_sel import (
+    compute_model_scores,
+    normalize_scores,
+    pareto_ranks,
+    rank_models,
+    score_model,
+)
+
+
+def _reg(mse, r2, fit, predict, size):
+    rmse = float(np.sqrt(mse))
+    return {
+        "metrics": {"val": {"mse": mse, "rmse": rmse, "mae": rmse, "r2": r2}},
+        "metadata": {"fit_seconds": fit, "predict_seconds": predict, "artifact": {"bytes": size}},
+    }
+
+
+RESULTS = {
+    "linear": _reg(4.0, 0.80, 0.01, 0.001, 1_000),
+    "forest": _reg(1.0, 0.95, 2.00, 0.200, 5_000_000),
+    "ridge": _reg(4.0, 0.80, 0.02, 0.002, 1_000),
+    "knn": _reg(9.0, 0.60, 0.01, 0.500, 80_000),
+}
+
+
+def test_perfect_fit_does_not_divide_by_zero():
+    perfect = _reg(0.0, 1.0, 0.1, 0.1, 10)
+    assert np.isfinite(score_model(perfect["metrics"]))
+    ranked = rank_models({"perfect": perfect, **RESULTS})
+    assert ranked["ranking"][0] == "perfect"
+
+
+def test_normalize_scores_directions_and_missing():
+    table = np.array([[1.0, 0.5], [2.0, np.nan], [3.0, 0.9]])
+    rank = normalize_scores(table, [False, True], method="rank")
+    assert np.allclose(rank[:, 0], [1.0, 0.5, 0.0])
+    assert rank[1, 1] == 0.0 and rank[2, 1] > rank[0, 1]
+
+    minmax = normalize_scores(table, [False, True], method="minmax")
+    assert np.allclose(minmax[:, 0], [1.0, 0.5, 0.0])
+    assert np.allclose(minmax[[0, 2], 1], [0.0, 1.0])
+
+
+def test_pareto_ranks():
+    objectives = np.array([[0.0, 5.0], [1.0, 1.0], [2.0, 2.0], [3.0, 0.0]])
+    assert pareto_ranks(objectives).tolist() == [0, 0, 1, 0]
+
+
+def test_rank_models_weights_pareto_and_latency_budget():
+    ranked = rank_models(RESULTS)
+    assert ranked["best"] == "forest"
+    assert ranked["ranking"][-1] == "knn"
+    # linear is as accurate as ridge but cheaper on every cost column
+    assert ranked["pareto_rank"]["linear"] == 0 and ranked["pareto_rank"]["ridge"] == 1
+    assert "knn" not in ranked["pareto_front"]
+
+    cheap = rank_models(RESULTS, weights={"r2": 1.0, "predict_seconds": 3.0})
+    assert cheap["best"] == "linear"
+
+    budget = rank_models(RESULTS, max_predict_seconds=0.1)
+    assert budget["best"] == "linear"
+    assert "forest" not in budget["eligible"]
+    assert compute_model_scores(RESULTS, max_predict_seconds=0.1)[0] == "linear"
+    # nothing fits the budget: fall back to the best score
+    assert compute_model_scores(RESULTS, max_predict_seconds=1e-6)[0] == "forest"
+
+
+def test_rank_models_classification_without_val():
+    results = {
+        "a": {"metrics": {"train": {"accuracy": 0.9, "precision": 0.9, "recall": 0.9, "f1": 0.9}}},
+        "b": {"metrics": {"train": {"accuracy": 0.7, "precision": 0.7, "recall": 0.7, "f1": 0.7}}},
+    }
+    assert rank_models(results)["ranking"] == ["a", "b"]
+
+
+def test_throughput_budget_excludes_slow_models():
+    results = {name: {**info, "metadata": {**info["metadata"], "inference": {"rows_per_second_per_core": rps}}}
+               for (name, info), rps in zip(RESULTS.items(), (900_000, 20_000, 800_000, 5_000))}
+
+    ranked = rank_models(results, min_rows_per_second=50_000)
+    assert ranked["eligible"] == ["linear", "ridge"]
+    assert compute_model_scores(results, min_rows_per_second=50_000)[0] == "linear"
+    assert compute_model_scores(results)[0] == "forest"
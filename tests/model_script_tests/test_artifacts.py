@@ -0,0 +1,104 @@
+import numpy as np
+from pathlib import Path
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neighbors import KNeighborsClassifier
+
+from main.model_scripts.artifacts import ArtifactWriter, is_compressed, load_artifact, save_artifact
+from main.model_training.classification import ClassificationTrainer
+from main.model_training.regression import RegressionTrainer
+
+
+def _forest():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 6))
+    y = (X[:, 0] > 0).astype(int)
+    return RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y), X
+
+
+def test_compressed_and_mmap_artifacts(tmp_path):
+    """
+    Compressed artifacts are smaller; uncompressed ones load with their numpy
+    buffers memory-mapped, and both predict identically to the original.
+    """
+    forest, X = _forest()
+    packed = save_artifact(forest, tmp_path / "packed.joblib", compress=3)
+    raw = save_artifact(forest, tmp_path / "raw.joblib", compress=0)
+
+    assert packed["bytes"] < raw["bytes"]
+    assert is_compressed(tmp_path / "packed.joblib")
+    assert not is_compressed(tmp_path / "raw.joblib")
+
+    for loaded in (load_artifact(tmp_path / "raw.joblib"), load_artifact(tmp_path / "packed.joblib")):
+        assert np.array_equal(loaded.predict(X), forest.predict(X))
+
+    knn = KNeighborsClassifier(algorithm="brute").fit(X, forest.predict(X))
+    save_artifact(knn, tmp_path / "knn.joblib", compress=0)
+    assert isinstance(load_artifact(tmp_path / "knn.joblib")._fit_X, np.memmap)
+    assert not isinstance(load_artifact(tmp_path / "knn.joblib", mmap=False)._fit_X, np.memmap)
+
+
+def test_background_writer(tmp_path):
+    """
+    Inside an ArtifactWriter block saves are queued and finished on exit,
+    with write and load timings recorded per path; failures are collected.
+    """
+    forest, _ = _forest()
+    with ArtifactWriter(compress=0) as writer:
+        assert save_artifact(forest, tmp_path / "a.joblib") is None
+        save_artifact(forest, tmp_path / "b" / "b.joblib")
+        save_artifact(lambda x: x, tmp_path / "bad.joblib")  # not picklable
+
+    for name in ("a.joblib", "b/b.joblib"):
+        info = writer.info_for(tmp_path / name)
+        assert (tmp_path / name).exists()
+        assert info["bytes"] > 0 and info["load_seconds"] >= 0
+    assert "error" in writer.info_for(tmp_path / "bad.joblib")
+    assert not (tmp_path / "bad.joblib").exists()
+
+    # outside the block writes are synchronous again
+    assert save_artifact(forest, tmp_path / "c.joblib")["bytes"] > 0
+
+
+def test_trainer_records_artifact_metadata(tmp_path):
+    """The regression trainer reports each saved pipeline's size and load time."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, 3))
+    y = X @ np.array([1.0, -2.0, 0.5])
+    scripts = Path(__file__).resolve().parents[2] / "main" / "model_scripts"
+
+    trainer = RegressionTrainer(scripts_path=scripts, output_path=tmp_path, compress=0)
+    results = trainer.train_all(X[:40], y[:40], X[40:], y[40:], include={"linear", "ridge"})
+
+    for name in ("linear", "ridge"):
+        artifact = results[name]["metadata"]["artifact"]
+        assert artifact["path"] == str(tmp_path / f"{name}.joblib")
+        assert artifact["compress"] == 0
+        assert "load_seconds" in artifact
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path):
+    path = tmp_path / "bad.joblib"
+    with ArtifactWriter() as writer:
+        save_artifact(lambda x: x, path)  # not picklable
+    assert "bad.joblib" in "".join(writer.errors)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_large_buffer_models_default_to_uncompressed(tmp_path):
+    """KNN saves uncompressed (memory-mapped on load) unless the run sets compress."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(80, 3))
+    y = (X[:, 0] > 0).astype(int)
+    scripts = Path(__file__).resolve().parents[2] / "main" / "model_scripts"
+
+    results = ClassificationTrainer(scripts, tmp_path / "default").train_all(
+        X[:60], y[:60], X[60:], y[60:], include={"knn", "logistic"})
+    assert results["knn"]["metadata"]["artifact"]["compress"] == 0
+    assert results["logistic"]["metadata"]["artifact"]["compress"] == 3
+
+    results = ClassificationTrainer(scripts, tmp_path / "packed", compress=3).train_all(
+        X[:60], y[:60], X[60:], y[60:], include={"knn"})
+    assert is_compressed(tmp_path / "packed" / "knn.joblib")
@@ -0,0 +1,48 @@
+import numpy as np
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+
+from sklearn.datasets import make_blobs
+
+from main.model_scripts import birch, minibatch_kmeans
+from main.model_scripts.utils import choose_n_clusters, evaluate_clustering_model
+
+
+def test_clustering_scripts_pick_k_and_report_sampled_metrics(tmp_path):
+    """
+    Both clustering scripts choose the number of clusters from a sampled
+    silhouette sweep, fit without labels and save their pipeline.
+    """
+    X, _ = make_blobs(n_samples=3000, centers=4, n_features=5, cluster_std=0.5, random_state=0)
+
+    for module in (minibatch_kmeans, birch):
+        save_file = tmp_path / f"{module.MODEL_NAME}.joblib"
+        pipeline, metrics, metadata = module.Model().train_model(X_train=X, y_train=None, save_path=save_file)
+
+        assert metadata["name"] == module.MODEL_NAME
+        assert metadata["n_clusters"] == 4
+        assert metrics["train"]["silhouette"] > 0.6
+        assert metrics["train"]["davies_bouldin"] < 0.6
+        assert pipeline.predict(X[:10]).shape == (10,)
+        assert save_file.exists()
+
+
+def test_birch_calibrates_threshold_and_respects_n_clusters():
+    X, _ = make_blobs(n_samples=20000, centers=3, n_features=4, cluster_std=2.0, random_state=1)
+    _, _, metadata = birch.train_model(X, n_clusters=3)
+    assert metadata["n_subclusters"] <= 5 * birch.TARGET_SUBCLUSTERS
+    assert metadata["threshold"] >= birch.INITIAL_THRESHOLD
+    assert "n_clusters_selection" not in metadata
+
+
+def test_clustering_metrics_are_computed_on_a_sample():
+    X, _ = make_blobs(n_samples=12000, centers=2, n_features=3, random_state=2)
+    pipeline, _, _ = minibatch_kmeans.train_model(X, n_clusters=2)
+
+    metrics = evaluate_clustering_model(pipeline, X, sample_size=500)
+    assert metrics["metric_sample_size"] == 500
+    assert metrics["n_clusters"] == 2
+
+    one_cluster = evaluate_clustering_model(minibatch_kmeans.train_model(X, n_clusters=1)[0], X)
+    assert one_cluster["silhouette"] is None
+    assert choose_n_clusters(X, k_values=range(2, 5))["n_clusters"] == 2
@@ -0,0 +1,51 @@
+import numpy as np
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+
+from main.model_scripts import histgb_classifier, histgb_regressor
+
+
+def test_histgb_classifier_training(tmp_path):
+    """
+    Test that the histogram gradient boosting classifier trains, early-stops
+    on the supplied validation split and saves its pipeline.
+    """
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 5))
+    y = (X[:, 0] + X[:, 1] > 0).astype(int)
+
+    save_file = tmp_path / "histgb_classifier_model.joblib"
+    pipeline, metrics, metadata = histgb_classifier.Model().train_model(
+        X_train=X[:400], y_train=y[:400], X_val=X[400:], y_val=y[400:], save_path=save_file,
+    )
+
+    assert pipeline.predict(X[400:]).shape == (200,)
+    assert metrics["val"]["accuracy"] > 0.85
+    assert metadata["name"] == histgb_classifier.MODEL_NAME
+    assert metadata["train_samples"] == 400
+    assert metadata["n_iter"] < histgb_classifier.DEFAULT_PARAMS["max_iter"]
+    assert metadata["early_stopping_on"] in ("val", "internal")
+    assert save_file.exists()
+
+
+def test_histgb_regressor_training(tmp_path):
+    """
+    Test that the histogram gradient boosting regressor trains with and
+    without a validation split and respects hyperparameter overrides.
+    """
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(500, 4))
+    y = 3 * X[:, 0] - 2 * X[:, 1] + rng.normal(scale=0.1, size=500)
+
+    pipeline, metrics, metadata = histgb_regressor.Model().train_model(
+        X_train=X[:400], y_train=y[:400], X_val=X[400:], y_val=y[400:],
+    )
+    assert metrics["val"]["r2"] > 0.8
+    assert metadata["name"] == histgb_regressor.MODEL_NAME
+
+    pipeline, metrics, metadata = histgb_regressor.Model().train_model(
+        X_train=X, y_train=y, max_iter=20, early_stopping=False,
+    )
+    assert "val" not in metrics
+    assert metadata["n_iter"] == 20
+    assert metadata["early_stopping_on"] == "none"
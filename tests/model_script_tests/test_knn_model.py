@@ -1,5 +1,4 @@
 import numpy as np
-from pathlib import Path
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
 
@@ -39,3 +38,42 @@ def test_knn_model_training(tmp_path):
     assert "hyperparams" in metadata
     assert metadata["train_samples"] == len(X_train)
     assert save_file.exists()
+
+
+def test_knn_ivf_backend_reports_tradeoff(tmp_path):
+    """
+    The approximate IVF backend trains, reports recall / speed against
+    exact search in metadata and saves a pipeline that loads again.
+    """
+    import joblib
+
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(4, 8)) * 5
+    labels = rng.integers(0, 4, size=1200)
+    X = centers[labels] + rng.normal(size=(1200, 8))
+
+    save_file = tmp_path / "knn_ivf.joblib"
+    pipeline, metrics, metadata = Model().train_model(
+        X_train=X[:1000], y_train=labels[:1000], X_val=X[1000:], y_val=labels[1000:],
+        save_path=save_file, backend="ivf", n_neighbors=5,
+    )
+
+    assert metadata["backend"] == "ivf"
+    tradeoff = metadata["ann_tradeoff"]
+    assert 0.0 <= tradeoff["recall_at_k"] <= 1.0
+    assert tradeoff["prediction_agreement"] > 0.9
+    assert metrics["val"]["accuracy"] > 0.9
+
+    loaded = joblib.load(save_file)
+    np.testing.assert_array_equal(loaded.predict(X[1000:]), pipeline.predict(X[1000:]))
+    assert pipeline[-1].predict(X[:0]).shape == (0,)  # the estimator itself, past the scaler
+
+
+def test_knn_auto_backend_uses_tree_for_low_dimensions():
+    X_train = np.random.default_rng(1).normal(size=(50, 3))
+    y_train = (X_train[:, 0] > 0).astype(int)
+
+    _, _, metadata = Model().train_model(X_train=X_train, y_train=y_train)
+
+    assert metadata["backend"] == "kd_tree"
+    assert "leaf_size" in metadata
@@ -1,5 +1,4 @@
 import numpy as np
-from pathlib import Path
 
 from main.model_scripts.lasso import Model, MODEL_NAME
 
@@ -53,3 +52,33 @@ def test_lasso_model_training(tmp_path):
 
     # ✅ Model saved correctly
     assert save_file.exists()
+
+
+def test_lasso_tunes_alpha_along_path(tmp_path):
+    """
+    Without an explicit alpha the Lasso script walks a warm-started path,
+    picks alpha on a holdout of the training rows (the validation data only
+    reports) and saves a self-contained pipeline.
+    """
+    import joblib
+
+    rng = np.random.default_rng(0)
+    w = np.zeros(10)
+    w[:3] = [2.0, -1.0, 0.5]
+    X_train = rng.normal(size=(200, 10))
+    y_train = X_train @ w + 0.1 * rng.normal(size=200)
+    X_val = rng.normal(size=(50, 10))
+    y_val = X_val @ w + 0.1 * rng.normal(size=50)
+
+    save_file = tmp_path / "lasso_model.joblib"
+    pipeline, metrics, metadata = Model().train_model(
+        X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val, save_path=save_file
+    )
+
+    path = metadata["regularization_path"]
+    assert path["selection"] == "holdout"
+    assert path["n_alphas"] > 1
+    assert metrics["val"]["r2"] > 0.95
+
+    loaded = joblib.load(save_file)
+    np.testing.assert_allclose(loaded.predict(X_val), pipeline.predict(X_val))
@@ -1,5 +1,4 @@
 import numpy as np
-from pathlib import Path
 
 # Ensure project root is on path (if needed)
 import sys, os
@@ -55,3 +54,39 @@ def test_ridge_model_training(tmp_path):
 
     # ✅ Saved file exists
     assert save_file.exists()
+
+
+def test_ridge_path_matches_ridgecv_loo():
+    """
+    The single-eigendecomposition path selects alpha by leave-one-out error
+    on the training rows, the same choice RidgeCV makes; validation data is
+    only scored, never used to pick alpha.
+    """
+    from sklearn.linear_model import RidgeCV
+    from main.model_scripts.ridge import RIDGE_ALPHAS
+
+    rng = np.random.default_rng(1)
+    X_train = rng.normal(size=(300, 30))
+    y_train = X_train @ (0.3 * rng.normal(size=30)) + 3 * rng.normal(size=300)
+
+    X_val, y_val = X_train[:50] + 1.0, -y_train[:50]
+    pipeline, _, metadata = Model().train_model(X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val,
+                                                scale=False)
+
+    reference = RidgeCV(alphas=RIDGE_ALPHAS).fit(X_train, y_train)
+    assert metadata["regularization_path"]["selection"] == "loo"
+    assert metadata["regularization_path"]["alpha"] == reference.alpha_
+    np.testing.assert_allclose(pipeline.predict(X_train), reference.predict(X_train), rtol=1e-6)
+
+
+def test_ridge_keeps_alpha_path_with_solver_params():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(100, 5))
+    y = X @ np.arange(1.0, 6.0) + rng.normal(size=100)
+
+    _, _, metadata = Model().train_model(X_train=X, y_train=y, max_iter=500)
+    assert "regularization_path" in metadata
+    _, _, metadata = Model().train_model(X_train=X, y_train=y, alpha=2.0)
+    assert "regularization_path" not in metadata
+    _, _, metadata = Model().train_model(X_train=X, y_train=y, fit_intercept=False)
+    assert "regularization_path" not in metadata
@@ -1,5 +1,4 @@
 import numpy as np
-from pathlib import Path
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
 
@@ -38,3 +37,34 @@ def test_svm_model_training(tmp_path):
     assert "train_samples" in metadata
     assert metadata["train_samples"] == len(X_train)
     assert save_file.exists()
+
+
+def test_svm_switches_to_kernel_approximation_above_exact_limit(tmp_path):
+    """
+    Above max_exact_samples the script trains a Nystroem + hinge-loss model,
+    records the mode, and still reports roc_auc via the decision function.
+    """
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(700, 2))
+    y = ((X ** 2).sum(axis=1) > 1.4).astype(int)
+
+    pipeline, metrics, metadata = Model().train_model(
+        X_train=X[:500], y_train=y[:500], X_val=X[500:], y_val=y[500:],
+        save_path=tmp_path / "svm.joblib", max_exact_samples=100,
+    )
+
+    assert metadata["mode"] == "nystroem"
+    assert "features" in pipeline.named_steps
+    assert "roc_auc" in metrics["val"]
+    assert metrics["val"]["accuracy"] > 0.8
+
+
+def test_exact_svc_records_kernel_cache():
+    X_train = np.array([[0.0, 0.0], [0.1, 0.2], [1.0, 1.0], [0.9, 1.1]])
+    y_train = np.array([0, 0, 1, 1])
+
+    _, metrics, metadata = Model().train_model(X_train=X_train, y_train=y_train)
+
+    assert metadata["mode"] == "svc"
+    assert metadata["cache_size_mb"] >= 200
+    assert "roc_auc" in metrics["train"]
@@ -0,0 +1,31 @@
+import numpy as np
+import joblib
+
+from main.model_scripts.utils import TransformCache
+from main.model_scripts import linear, logistic
+
+
+def test_scaler_is_fit_once_and_shared_across_scripts(tmp_path):
+    """
+    Scripts that receive the same TransformCache reuse one scaler fit,
+    and every saved pipeline still carries its own fitted scaler.
+    """
+    rng = np.random.default_rng(0)
+    X_train = rng.normal(loc=5.0, scale=3.0, size=(60, 3))
+    y_train = (X_train[:, 0] > 5).astype(int)
+    X_val = rng.normal(loc=5.0, scale=3.0, size=(20, 3))
+    y_val = (X_val[:, 0] > 5).astype(int)
+    cache = TransformCache()
+
+    reg_pipe, _, _ = linear.train_model(X_train, X_train[:, 0], X_val, X_val[:, 0],
+                                        save_path=tmp_path / "linear.joblib", transform_cache=cache)
+    clf_pipe, metrics, _ = logistic.train_model(X_train, y_train, X_val, y_val,
+                                                save_path=tmp_path / "logistic.joblib", transform_cache=cache)
+
+    assert cache.misses == 1
+    assert cache.hits == 1
+    assert reg_pipe.named_steps["scaler"] is not clf_pipe.named_steps["scaler"]
+
+    loaded = joblib.load(tmp_path / "logistic.joblib")
+    np.testing.assert_array_equal(loaded.predict(X_val), clf_pipe.predict(X_val))
+    assert metrics["val"]["accuracy"] == np.mean(clf_pipe.predict(X_val) == y_val)
@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+from main.model_training.batch import allocate_cores, load_batch_manifest, run_batch
+
+
+def fake_run(file, problem, target):
+    """Stands in for runner.run_pipeline inside the worker processes."""
+    print(f"running {file}")
+    if "broken" in file:
+        raise ValueError("bad data")
+    return {
+        "best_model": "linear",
+        "linear": {"metrics": {"val": {"r2": 0.9}}},
+        "ranking": {"ranking": ["linear", "ridge"]},
+        "summary_path": f"{file}.summary.json",
+    }
+
+
+def test_load_batch_manifest_json_csv_and_directory(tmp_path):
+    (tmp_path / "a.csv").write_text("x,y\n1,2\n")
+    (tmp_path / "b.xlsx").write_bytes(b"")
+    (tmp_path / "notes.txt").write_text("")
+
+    entries = load_batch_manifest(tmp_path, problem_type="clustering")
+    assert [os.path.basename(e["file"]) for e in entries] == ["a.csv", "b.xlsx"]
+    assert all(e["problem"] == "clustering" and e["target"] is None for e in entries)
+    with pytest.raises(ValueError, match="Target column"):
+        load_batch_manifest(tmp_path, problem_type="regression")
+
+    (tmp_path / "manifest.json").write_text(json.dumps(
+        {"datasets": [{"file": "a.csv", "problem": "regression", "target": "y"}]}))
+    entries = load_batch_manifest(tmp_path)
+    assert entries == [{"file": str(tmp_path / "a.csv"), "problem": "regression", "target": "y"}]
+
+    manifest = tmp_path / "jobs.csv"
+    manifest.write_text("file,target,problem\na.csv,y,classification\nb.xlsx,,\n")
+    entries = load_batch_manifest(manifest, problem_type="clustering")
+    assert [(e["problem"], e["target"]) for e in entries] == [("classification", "y"), ("clustering", None)]
+
+
+def test_allocate_cores_splits_cores_evenly():
+    assert allocate_cores(3, total_cores=8) == (3, 2)
+    assert allocate_cores(10, total_cores=4) == (4, 1)
+    assert allocate_cores(10, total_cores=8, max_workers=2) == (2, 4)
+    assert allocate_cores(1, total_cores=1) == (1, 1)
+
+
+def test_run_batch_isolates_failures_and_writes_index(tmp_path):
+    datasets = [{"file": str(tmp_path / name), "problem": "regression", "target": "y"}
+                for name in ("sales.csv", "broken.csv", "wine.csv")]
+    index_path = tmp_path / "results" / "index.json"
+
+    index = run_batch(datasets, fake_run, index_path, total_cores=4, max_workers=2)
+
+    assert index["workers"] == 2 and index["cores_per_dataset"] == 2
+    assert list(index["datasets"]) == ["sales", "broken", "wine"]
+    ok, broken = index["datasets"]["sales"], index["datasets"]["broken"]
+    assert ok["status"] == "ok" and ok["best_model"] == "linear" and ok["best_metrics"] == {"r2": 0.9}
+    assert ok["ranking"] == ["linear", "ridge"] and ok["cores"] == 2
+    assert broken["status"] == "error" and "bad data" in broken["error"]
+    assert "running" in open(ok["log"]).read()
+    assert "Traceback" in open(broken["log"]).read()
+
+    with open(index_path) as f:
+        assert json.load(f) == json.loads(json.dumps(index))
+
+    with pytest.raises(ValueError, match="share a name"):
+        run_batch(datasets + datasets[:1], fake_run, index_path)
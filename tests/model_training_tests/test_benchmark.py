@@ -0,0 +1,37 @@
+from pathlib import Path
+import numpy as np
+from sklearn.neighbors import KNeighborsRegressor
+
+from main.model_training.benchmark import benchmark_predict, in_memory_bytes, profile_inference
+from main.model_training.regression import RegressionTrainer
+
+SCRIPTS = Path(__file__).resolve().parents[2] / "main" / "model_scripts"
+
+
+def test_benchmark_predict_single_core_and_leaves_n_jobs():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    knn = KNeighborsRegressor(n_jobs=-1).fit(X, X[:, 0])
+
+    stats = benchmark_predict(knn, X, batch_rows=100)
+    assert stats["batch_rows"] == 100
+    assert stats["rows_per_second_per_core"] > 0
+    assert knn.n_jobs == -1
+
+    # the training data dominates the footprint of a KNN model
+    assert in_memory_bytes(knn) >= X.nbytes
+    assert profile_inference("PIPE", X) == {}
+
+
+def test_trainer_records_inference_profile(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(80, 3))
+    y = X @ np.array([1.0, 2.0, 3.0])
+
+    trainer = RegressionTrainer(scripts_path=SCRIPTS, output_path=tmp_path)
+    results = trainer.train_all(X[:60], y[:60], X[60:], y[60:], include={"linear"})
+    metadata = results["linear"]["metadata"]
+    assert metadata["inference"]["batch_rows"] == 20
+    assert metadata["inference"]["rows_per_second_per_core"] > 0
+    assert metadata["memory_bytes"] > 0
+    assert metadata["artifact"]["bytes"] > 0
@@ -0,0 +1,94 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+from main.model_scripts import linear
+from main.model_scripts.artifacts import ArtifactWriter
+from main.model_training.cache import data_fingerprint, model_key
+from main.model_training.checkpoint import RunCheckpoint
+from main.model_training.regression import RegressionTrainer
+
+SCRIPTS = Path(__file__).resolve().parents[2] / "main" / "model_scripts"
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(120, 4)).astype(np.float32)
+    y = X @ np.array([1.0, 2.0, 0.0, -1.0], dtype=np.float32)
+    return X[:100], y[:100], X[100:], y[100:]
+
+
+def test_failing_script_does_not_abort_the_others(tmp_path, monkeypatch):
+    X_train, y_train, X_val, y_val = _data()
+    train_one = RegressionTrainer._train_one
+
+    def flaky(self, ModelClass, *args):
+        if ModelClass.MODEL_NAME == "ridge":
+            raise MemoryError("out of memory")
+        return train_one(self, ModelClass, *args)
+
+    monkeypatch.setattr(RegressionTrainer, "_train_one", flaky)
+    trainer = RegressionTrainer(SCRIPTS, tmp_path / "run")
+    results = trainer.train_all(X_train, y_train, X_val, y_val, include={"linear", "ridge", "lasso"})
+
+    assert set(results) == {"linear", "lasso"} and set(trainer.pipelines) == {"linear", "lasso"}
+    assert trainer.failures["ridge"]["error"] == "MemoryError: out of memory"
+    assert "Traceback" in trainer.failures["ridge"]["traceback"]
+
+
+def test_rerun_resumes_checkpointed_models(tmp_path):
+    X_train, y_train, X_val, y_val = _data()
+    checkpoint = RunCheckpoint(tmp_path / "checkpoints", "run-a")
+    first = RegressionTrainer(SCRIPTS, tmp_path / "run", checkpoint=checkpoint)
+    fresh = first.train_all(X_train, y_train, X_val, y_val, include={"linear"})
+    checkpoint.complete_stage("train", {"models": ["linear"]})
+    assert (tmp_path / "checkpoints" / "models" / "linear.json").exists()
+
+    resumed = RunCheckpoint(tmp_path / "checkpoints", "run-a")
+    assert resumed.stage("train")["models"] == ["linear"]
+    second = RegressionTrainer(SCRIPTS, tmp_path / "run", checkpoint=resumed)
+    again = second.train_all(X_train, y_train, X_val, y_val, include={"linear"})
+    assert resumed.resumed == ["linear"] and again["linear"]["metadata"]["resumed"] is True
+    assert again["linear"]["metrics"] == fresh["linear"]["metrics"]
+    np.testing.assert_allclose(second.val_outputs["linear"], first.val_outputs["linear"])
+
+    # other run inputs start without completed stages
+    assert RunCheckpoint(tmp_path / "checkpoints", "run-b").stage("train") is None
+
+
+def test_changed_artifact_or_data_is_not_restored(tmp_path):
+    X_train, y_train, X_val, y_val = _data()
+    checkpoint = RunCheckpoint(tmp_path / "checkpoints", "run")
+    RegressionTrainer(SCRIPTS, tmp_path / "run", checkpoint=checkpoint).train_all(
+        X_train, y_train, X_val, y_val, include={"linear"})
+    save_path = tmp_path / "run" / "linear.joblib"
+    key = model_key(linear.Model, data_fingerprint(X_train, y_train, X_val, y_val), "regression", {})
+
+    assert checkpoint.restore_model("linear", "other-key", save_path) is None
+    stamp = os.path.getmtime(save_path) - 60
+    os.utime(save_path, (stamp, stamp))
+    assert checkpoint.restore_model("linear", key, save_path) is None
+
+
+def test_when_written_runs_after_the_write(tmp_path):
+    seen = []
+    with ArtifactWriter(compress=0, measure_load=False) as writer:
+        path = tmp_path / "a.joblib"
+        writer.submit({"a": 1}, path)
+        writer.when_written(path, lambda info: seen.append((path.exists(), info["bytes"] > 0)))
+    writer.when_written(path, lambda info: seen.append("late"))
+    assert seen == [(True, True), "late"]
+
+
+def test_unreadable_checkpoint_falls_back_to_training(tmp_path):
+    X_train, y_train, X_val, y_val = _data()
+    checkpoint = RunCheckpoint(tmp_path / "checkpoints", "run")
+    RegressionTrainer(SCRIPTS, tmp_path / "run", checkpoint=checkpoint).train_all(
+        X_train, y_train, X_val, y_val, include={"linear", "ridge"})
+    (tmp_path / "checkpoints" / "models" / "linear.json").write_text("{not json")
+
+    trainer = RegressionTrainer(SCRIPTS, tmp_path / "run", checkpoint=RunCheckpoint(tmp_path / "checkpoints", "run"))
+    results = trainer.train_all(X_train, y_train, X_val, y_val, include={"linear", "ridge"})
+    assert set(results) == {"linear", "ridge"} and trainer.failures == {}
+    assert "resumed" not in results["linear"]["metadata"] and results["ridge"]["metadata"]["resumed"] is True
@@ -0,0 +1,33 @@
+import json
+from pathlib import Path
+import numpy as np
+from sklearn.datasets import make_blobs
+
+from main.final_model_selection.final_model_sel import compute_model_scores
+from main.model_training.orchestrator import Orchestrator, load_processed_dataset
+
+SCRIPTS = Path(__file__).resolve().parents[2] / "main" / "model_scripts"
+
+
+def test_orchestrator_runs_clustering_on_x_full(tmp_path):
+    dataset_dir = tmp_path / "dataset"
+    dataset_dir.mkdir()
+    X, _ = make_blobs(n_samples=600, centers=3, n_features=4, random_state=0)
+    np.save(dataset_dir / "X_full.npy", X)
+    with open(dataset_dir / "metadata.json", "w") as f:
+        json.dump({"problem_type": "clustering"}, f)
+
+    X_full, y_train, X_val, y_val, metadata = load_processed_dataset(dataset_dir)
+    assert X_full.shape == X.shape and y_train is None and X_val is None
+
+    orch = Orchestrator(dataset_path=dataset_dir, model_scripts_path=SCRIPTS, output_path=tmp_path)
+    results = orch.run()
+
+    assert set(results) == {"minibatch_kmeans", "birch"}
+    assert set(orch.pipelines) == set(results)
+    for info in results.values():
+        assert {"silhouette", "davies_bouldin", "calinski_harabasz"} <= set(info["metrics"]["train"])
+        assert info["metadata"]["fit_seconds"] >= 0
+
+    best_model, _ = compute_model_scores(results)
+    assert best_model in results
@@ -0,0 +1,63 @@
+import pickle
+from pathlib import Path
+import numpy as np
+
+from main.model_training.classification import ClassificationTrainer
+from main.model_training.ensemble import build_ensemble, caruana_selection
+
+SCRIPTS = Path(__file__).resolve().parents[2] / "main" / "model_scripts"
+
+
+def test_caruana_blends_complementary_models():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=200)
+    over, under, noisy = y + 1.0, y - 1.0, y + rng.normal(scale=2.0, size=200)
+    weights = caruana_selection(np.stack([over, under, noisy]), y, "regression", n_rounds=20)
+    assert np.isclose(weights.sum(), 1.0)
+    assert np.allclose(weights[:2], 0.5, atol=0.05)
+    assert weights[2] < 0.1
+
+
+class Shifted:
+    def __init__(self, shift):
+        self.shift = shift
+
+    def predict(self, X):
+        return X[:, 0] + self.shift
+
+
+def test_build_ensemble_regression_from_cached_predictions(tmp_path):
+    X_val = np.linspace(0, 1, 100)[:, None]
+    y_val = X_val[:, 0]
+    pipelines = {"over": Shifted(0.5), "under": Shifted(-0.5)}
+    outputs = {name: p.predict(X_val) for name, p in pipelines.items()}
+
+    result = build_ensemble(outputs, y_val, "regression", pipelines, output_path=tmp_path, X_val=X_val)
+    assert result["metrics"]["val"]["mse"] < 1e-6
+    assert set(result["metadata"]["members"]) == {"over", "under"}
+    assert (tmp_path / "ensemble.joblib").exists()
+    assert np.allclose(result["model"].predict(X_val), y_val)
+
+    assert build_ensemble({"over": outputs["over"]}, y_val, "regression", pipelines) is None
+
+
+def test_classification_ensemble_uses_cached_probabilities(tmp_path):
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(300, 4))
+    y = (X[:, 0] + 0.5 * X[:, 1] ** 2 > 0.3).astype(int)
+
+    trainer = ClassificationTrainer(scripts_path=SCRIPTS, output_path=tmp_path)
+    results = trainer.train_all(X[:200], y[:200], X[200:], y[200:], include={"logistic", "randomforest", "knn"})
+    assert set(trainer.val_outputs) == {"logistic", "randomforest", "knn"}
+
+    ensemble = build_ensemble(trainer.val_outputs, y[200:], "classification", trainer.pipelines,
+                              base_results=results, X_val=X[200:])
+    metrics = ensemble["metrics"]["val"]
+    assert {"accuracy", "f1", "roc_auc"} <= set(metrics)
+    assert metrics["accuracy"] >= min(r["metrics"]["val"]["accuracy"] for r in results.values()) - 0.05
+    assert ensemble["metadata"]["inference"]["rows_per_second_per_core"] > 0
+
+    model = pickle.loads(pickle.dumps(ensemble["model"]))
+    proba = model.predict_proba(X[200:])
+    assert np.allclose(proba.sum(axis=1), 1.0)
+    assert set(model.predict(X[200:])) <= {0, 1}
@@ -0,0 +1,113 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression, SGDRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from main.model_scripts.artifacts import load_artifact, save_artifact
+from main.model_training import incremental
+from main.model_training.incremental import update_capability, update_models, update_pipeline
+import runner
+
+
+def _data(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 3))
+    return X, X @ np.array([1.0, -2.0, 0.5]) + rng.normal(scale=0.1, size=n)
+
+
+def test_update_capability_by_final_estimator():
+    assert update_capability(Pipeline([("scaler", StandardScaler()), ("est", SGDRegressor())])) == "partial_fit"
+    assert update_capability(Pipeline([("est", RandomForestRegressor())])) == "warm_start"
+    assert update_capability(Pipeline([("est", LinearRegression())])) is None
+
+
+def test_update_pipeline_partial_fit_and_warm_start():
+    X, y = _data()
+    forest = Pipeline([("est", RandomForestRegressor(n_estimators=10, random_state=0))]).fit(X[:200], y[:200])
+    assert update_pipeline(forest, X, y, n_new=100) == "warm_start"
+    assert len(forest[-1].estimators_) == 15
+
+    kmeans = Pipeline([("est", MiniBatchKMeans(n_clusters=3, n_init=1, random_state=0))]).fit(X[:200])
+    steps = kmeans[-1].n_steps_
+    assert update_pipeline(kmeans, X, None, n_new=100) == "partial_fit"
+    assert kmeans[-1].n_steps_ > steps
+
+
+def test_update_models_updates_or_flags_and_rebuilds_ensemble(tmp_path):
+    X, y = _data()
+    X_train, y_train, X_val, y_val = X[:240], y[:240], X[240:], y[240:]
+    models = {
+        "sgd": Pipeline([("scaler", StandardScaler()), ("est", SGDRegressor(random_state=0))]),
+        "linear": Pipeline([("est", LinearRegression())]),
+    }
+    previous = {"best_model": "linear"}
+    for name, pipe in models.items():
+        pipe.fit(X_train[:200], y_train[:200])
+        save_artifact(pipe, tmp_path / f"{name}.joblib")
+        previous[name] = {"metrics": {}, "metadata": {"name": name, "train_samples": 200}}
+    before = load_artifact(tmp_path / "linear.joblib").predict(X_val)
+
+    results, pipelines = update_models(tmp_path, json.loads(json.dumps(previous)), "regression", 40,
+                                       X_train, y_train, X_val, y_val)
+
+    sgd, linear = results["sgd"]["metadata"], results["linear"]["metadata"]
+    assert sgd["incremental"] == {"mode": "partial_fit", "rows_added": 40, "needs_full_retrain": False}
+    assert sgd["train_samples"] == 240 and sgd["artifact"]["bytes"] > 0
+    assert linear["incremental"]["needs_full_retrain"] and "artifact" not in linear
+    np.testing.assert_allclose(load_artifact(tmp_path / "linear.joblib").predict(X_val), before)
+    assert set(results["linear"]["metrics"]) == {"train", "val"}
+    assert len(results["sgd"]["val_predictions"]) == len(y_val)
+    assert "ensemble" in results and Path(tmp_path / "ensemble.joblib").exists()
+
+
+def test_update_models_caps_train_scoring(tmp_path, monkeypatch):
+    X, y = _data()
+    monkeypatch.setattr(incremental, "MAX_TRAIN_EVAL_SAMPLES", 50)
+    previous = {}
+    for name, pipe in {"sgd": Pipeline([("est", SGDRegressor(random_state=0))]),
+                       "linear": Pipeline([("est", LinearRegression())])}.items():
+        save_artifact(pipe.fit(X[:200], y[:200]), tmp_path / f"{name}.joblib")
+        previous[name] = {"metrics": {"train": {"r2": 0.5}}, "metadata": {"name": name}}
+
+    results, _ = update_models(tmp_path, previous, "regression", 100, X, y, ensemble=False)
+
+    assert results["sgd"]["metadata"]["train_metric_samples"] == 50
+    # not updated: the previous fit's train metrics still hold
+    assert results["linear"]["metrics"]["train"] == {"r2": 0.5}
+    assert "train_metric_samples" not in results["linear"]["metadata"]
+
+
+def test_failed_incremental_run_is_rolled_back_and_retried(tmp_path, monkeypatch):
+    (tmp_path / "main").mkdir()
+    (tmp_path / "main" / "model_scripts").symlink_to(runner.ROOT / "main" / "model_scripts")
+    monkeypatch.setattr(runner, "ROOT", tmp_path)
+    X, y = _data(360)
+    frame = pd.DataFrame({"a": X[:, 0], "b": X[:, 1], "c": X[:, 2], "y": y})
+    csv = tmp_path / "grow.csv"
+    frame[:300].to_csv(csv, index=False)
+    runner.run_pipeline(str(csv), "regression", "y", use_cache=False, resume=False)
+    processed = tmp_path / "main" / "processed_data" / "grow"
+    summary = tmp_path / "main" / "model_results" / "grow" / "training_summary.json"
+    before = (np.load(processed / "X_train.npy").shape, summary.read_bytes())
+
+    frame.to_csv(csv, index=False)
+    update = runner.update_models
+    monkeypatch.setattr(runner, "update_models", lambda *a, **k: (_ for _ in ()).throw(RuntimeError("boom")))
+    with pytest.raises(RuntimeError, match="boom"):
+        runner.run_pipeline(str(csv), "regression", "y", incremental=True)
+    assert (np.load(processed / "X_train.npy").shape, summary.read_bytes()) == before
+    assert not list(processed.glob("*.bak")) and "appended" not in json.loads((processed / "metadata.json").read_text())
+
+    monkeypatch.setattr(runner, "update_models", update)
+    results = runner.run_pipeline(str(csv), "regression", "y", incremental=True)
+    assert results["incremental"]["rows_added"] == 60
+    appended = json.loads((processed / "metadata.json").read_text())["appended"]
+    assert len(appended) == 1
+    assert np.load(processed / "X_train.npy").shape[0] == before[0][0] + appended[0]["train_rows"]
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import numpy as np
+
+from main.model_training.isolation import ResourceLimits
+from main.model_training.regression import RegressionTrainer
+
+SCRIPTS = Path(__file__).resolve().parents[2] / "main" / "model_scripts"
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(120, 4)).astype(np.float32)
+    y = X @ np.array([1.0, 2.0, 0.0, -1.0], dtype=np.float32)
+    return X[:100], y[:100], X[100:], y[100:]
+
+
+def test_isolated_training_matches_in_process(tmp_path):
+    X_train, y_train, X_val, y_val = _data()
+    local = RegressionTrainer(SCRIPTS, tmp_path / "local")
+    expected = local.train_all(X_train, y_train, X_val, y_val, include={"linear"})
+
+    trainer = RegressionTrainer(SCRIPTS, tmp_path / "isolated", isolation=ResourceLimits(threads=1, memory_mb=4096))
+    results = trainer.train_all(X_train, y_train, X_val, y_val, include={"linear"})
+
+    assert results["linear"]["metrics"] == expected["linear"]["metrics"]
+    np.testing.assert_allclose(trainer.pipelines["linear"].predict(X_val), local.val_outputs["linear"])
+    np.testing.assert_allclose(trainer.val_outputs["linear"], local.val_outputs["linear"])
+    assert results["linear"]["metadata"]["artifact"]["bytes"] > 0
+
+    resources = results["linear"]["metadata"]["resources"]
+    assert resources["exit_code"] == 0 and resources["limits"]["threads"] == 1
+    assert resources["max_rss_mb"] > 0 and resources["cpu_user_seconds"] > 0
+
+
+def test_exceeded_limits_are_reported_as_failures(tmp_path):
+    X_train, y_train, X_val, y_val = _data()
+    trainer = RegressionTrainer(SCRIPTS, tmp_path / "slow", isolation=ResourceLimits(timeout_seconds=0.2))
+    assert trainer.train_all(X_train, y_train, X_val, y_val, include={"linear"}) == {}
+    failure = trainer.failures["linear"]
+    assert failure["error"] == "timed out after 0.2s"
+    assert failure["resources"]["wall_seconds"] < 10
+
+    trainer = RegressionTrainer(SCRIPTS, tmp_path / "small", isolation=ResourceLimits(memory_mb=64))
+    assert trainer.train_all(X_train, y_train, X_val, y_val, include={"linear"}) == {}
+    # MemoryError, or ENOMEM from mmap, depending on where the cap is hit
+    error = trainer.failures["linear"]["error"]
+    assert error.startswith("MemoryError") or "Cannot allocate memory" in error
+    assert "Traceback" in trainer.failures["linear"]["traceback"]
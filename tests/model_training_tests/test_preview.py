@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+import runner
+
+
+def _frame(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4))
+    label = np.where(X[:, 0] + X[:, 1] > 0, "yes", "no")
+    return pd.DataFrame({"a": X[:, 0], "b": X[:, 1], "c": X[:, 2], "d": X[:, 3], "label": label})
+
+
+def test_run_preview_ranks_and_times_model_scripts(tmp_path):
+    preview = runner.run_preview(_frame(), "classification", "label", 120, tmp_path)
+
+    assert preview["rows"] <= 130 and preview["ranking"]
+    assert "ensemble" not in preview["ranking"]
+    assert set(preview["models"]) == set(preview["ranking"])
+    for info in preview["models"].values():
+        assert info["estimated_full_fit_seconds"] >= 0
+
+
+def test_preview_top_k_trains_the_top_model_scripts(tmp_path, monkeypatch):
+    (tmp_path / "main").mkdir()
+    (tmp_path / "main" / "model_scripts").symlink_to(runner.ROOT / "main" / "model_scripts")
+    monkeypatch.setattr(runner, "ROOT", tmp_path)
+    csv = tmp_path / "preview.csv"
+    _frame().to_csv(csv, index=False)
+
+    results = runner.run_pipeline(str(csv), "classification", "label", preview_rows=120, preview_top_k=1,
+                                  use_cache=False, resume=False)
+
+    trained = [name for name, r in results["ranking"]["scores"].items() if name != "ensemble"]
+    assert trained == results["preview"]["ranking"][:1]
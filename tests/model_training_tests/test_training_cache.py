@@ -0,0 +1,93 @@
+import os
+from pathlib import Path
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from main.model_scripts import linear, ridge
+from main.model_training.cache import TrainingCache, data_fingerprint, script_fingerprint
+from main.model_training.regression import RegressionTrainer
+
+SCRIPTS = Path(__file__).resolve().parents[2] / "main" / "model_scripts"
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(120, 4)).astype(np.float32)
+    y = X @ np.array([1.0, 2.0, 0.0, -1.0], dtype=np.float32)
+    return X[:100], y[:100], X[100:], y[100:]
+
+
+def test_fingerprints_are_deterministic_and_content_based():
+    X, y, _, _ = _data()
+    assert data_fingerprint(X, y, None) == data_fingerprint(X.copy(), y.copy(), None)
+    assert data_fingerprint(X, y) == data_fingerprint(np.asfortranarray(X), y)
+    assert data_fingerprint(X, y) != data_fingerprint(X.astype(np.float64), y)
+    changed = X.copy()
+    changed[3, 1] += 1
+    assert data_fingerprint(changed, y) != data_fingerprint(X, y)
+    assert data_fingerprint(csr_matrix(X)) == data_fingerprint(csr_matrix(X.copy()))
+
+    assert script_fingerprint(linear.Model) == script_fingerprint(linear.Model)
+    assert script_fingerprint(linear.Model) != script_fingerprint(ridge.Model)
+
+
+def test_trainer_reuses_cached_fits(tmp_path):
+    X_train, y_train, X_val, y_val = _data()
+    cache = TrainingCache(tmp_path / "cache")
+
+    first = RegressionTrainer(SCRIPTS, tmp_path / "run1", cache=cache)
+    fresh = first.train_all(X_train, y_train, X_val, y_val, include={"linear"})
+    assert fresh["linear"]["metadata"]["cache"]["hit"] is False and cache.misses == 1
+
+    second = RegressionTrainer(SCRIPTS, tmp_path / "run2", cache=cache)
+    cached = second.train_all(X_train, y_train, X_val, y_val, include={"linear"})
+    assert cached["linear"]["metadata"]["cache"]["hit"] is True and cache.hits == 1
+    assert cached["linear"]["metrics"] == fresh["linear"]["metrics"]
+    assert (tmp_path / "run2" / "linear.joblib").exists()
+    np.testing.assert_allclose(second.pipelines["linear"].predict(X_val), first.val_outputs["linear"])
+    np.testing.assert_allclose(second.val_outputs["linear"], first.val_outputs["linear"])
+
+    # other hyperparameters or other data are different keys
+    third = RegressionTrainer(SCRIPTS, tmp_path / "run3", cache=cache)
+    third.train_all(X_train, y_train, X_val, y_val, include={"linear"}, params={"linear": {"fit_intercept": False}})
+    third.train_all(X_train + 1, y_train, X_val, y_val, include={"linear"})
+    assert cache.misses == 3 and cache.stats()["entries"] == 3
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    X_train, y_train, X_val, y_val = _data()
+    cache = TrainingCache(tmp_path / "cache")
+    keys = []
+    for shift in range(3):
+        trainer = RegressionTrainer(SCRIPTS, tmp_path / f"run{shift}", cache=cache)
+        result = trainer.train_all(X_train + shift, y_train, X_val, y_val, include={"linear"})
+        keys.append(result["linear"]["metadata"]["cache"]["key"])
+    for age, key in zip((300, 200, 100), keys):
+        stamp = os.path.getmtime(cache.root / key / "result.json") - age
+        os.utime(cache.root / key / "result.json", (stamp, stamp))
+    cache.load(keys[0], tmp_path / "restored.joblib")  # a hit refreshes the entry
+
+    cache.max_entries = 2
+    report = cache.evict()
+    assert report["evicted"] == [keys[1]] and report["entries"] == 2
+
+    cache.max_entries, cache.max_bytes = None, 0
+    assert sorted(cache.evict()["evicted"]) == sorted([keys[0], keys[2]])
+    assert cache.stats()["entries"] == 0
+
+
+def test_unreadable_entry_is_a_miss_and_keeps_the_run_artifact(tmp_path):
+    X_train, y_train, X_val, y_val = _data()
+    cache = TrainingCache(tmp_path / "cache")
+    trainer = RegressionTrainer(SCRIPTS, tmp_path / "run", cache=cache)
+    key = trainer.train_all(X_train, y_train, X_val, y_val, include={"linear"})["linear"]["metadata"]["cache"]["key"]
+    save_path = tmp_path / "run" / "linear.joblib"
+    good = save_path.read_bytes()
+
+    (cache.root / key / "model.joblib").write_bytes(b"")
+    assert cache.load(key, save_path) is None
+    assert save_path.read_bytes() == good and not (cache.root / key).exists()
+
+    retrained = trainer.train_all(X_train, y_train, X_val, y_val, include={"linear"})
+    assert retrained["linear"]["metadata"]["cache"]["hit"] is False and cache.stats()["entries"] == 1
@@ -0,0 +1,43 @@
+from pathlib import Path
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LogisticRegression
+
+from main.model_scripts.utils import extract_weights
+from main.model_training.classification import ClassificationTrainer
+from main.model_training.regression import RegressionTrainer
+
+SCRIPTS = Path(__file__).resolve().parents[2] / "main" / "model_scripts"
+
+
+def test_extract_weights_shapes():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, 3))
+    y = np.repeat([0, 1, 2], 20)
+
+    multi = extract_weights(LogisticRegression(max_iter=500).fit(X, y))
+    assert np.asarray(multi["coef"]).shape == (3, 3)
+    assert len(multi["intercept"]) == 3
+
+    forest = extract_weights(RandomForestRegressor(n_estimators=5, random_state=0).fit(X, X[:, 0]))
+    assert len(forest["feature_importances"]) == 3
+    assert extract_weights("PIPE") is None
+
+
+def test_trainers_keep_pipelines_and_weights(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(80, 3))
+    y = X @ np.array([2.0, -1.0, 0.0]) + 0.5
+
+    trainer = RegressionTrainer(scripts_path=SCRIPTS, output_path=tmp_path)
+    results = trainer.train_all(X[:60], y[:60], X[60:], y[60:], include={"linear"})
+    weights = results["linear"]["weights"]
+    assert np.allclose(weights["coef"], trainer.pipelines["linear"].named_steps["est"].coef_)
+    assert isinstance(weights["intercept"], float)
+
+    labels = (y > 0.5).astype(int)
+    trainer = ClassificationTrainer(scripts_path=SCRIPTS, output_path=tmp_path)
+    results = trainer.train_all(X[:60], labels[:60], X[60:], labels[60:], include={"logistic", "randomforest"})
+    assert set(trainer.pipelines) == {"logistic", "randomforest"}
+    assert "coef" in results["logistic"]["weights"]
+    assert "feature_importances" in results["randomforest"]["weights"]
@@ -0,0 +1,104 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import random as sparse_random
+from sklearn.preprocessing import StandardScaler
+
+from main.preprocessing.EDA import pca_reduction, prune_redundant_columns
+from main.preprocessing.datacleaning import clean_dataframe
+from main.preprocessing import preprocessor
+from main.preprocessing.preprocessor import _scale_columns_inplace, process_features
+
+
+def _numeric_frame(n=60000, n_cols=12, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(n, n_cols)), columns=[f"f{i}" for i in range(n_cols)])
+    df["city"] = rng.choice(["x", "y", "z", "w"], size=n)
+    df["target"] = df["f0"] - 2 * df["f1"] + rng.normal(scale=0.1, size=n)
+    return df
+
+
+def _peak_bytes(fn, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def test_preprocessing_peak_memory_stays_within_twice_the_input(monkeypatch):
+    # keep the scaler's fixed-size chunk as small relative to this frame as it is to a large one
+    monkeypatch.setattr(preprocessor, "SCALE_CHUNK_ROWS", 4096)
+    df = _numeric_frame()
+    input_bytes = df.memory_usage(deep=True, index=False).sum()
+    assert _peak_bytes(clean_dataframe, df) <= 1.5 * input_bytes
+
+    cleaned = clean_dataframe(df)
+    cleaned_bytes = cleaned.memory_usage(deep=True, index=False).sum()
+    assert _peak_bytes(process_features, cleaned, target_col="target") <= 2 * cleaned_bytes
+
+
+def test_clean_dataframe_keeps_input_and_sequential_outlier_rule():
+    df = _numeric_frame(n=2000)
+    df.loc[::97, "f2"] = 50.0
+    df.loc[::89, "f3"] = np.nan
+    snapshot = df.copy()
+    cleaned = clean_dataframe(df, float_dtype=None)
+    pd.testing.assert_frame_equal(df, snapshot)
+
+    # reference: fill, then filter column by column on what is left
+    expected = snapshot.copy()
+    expected["f3"] = expected["f3"].fillna(expected["f3"].median())
+    for col in expected.select_dtypes(include=np.number).columns:
+        if expected[col].nunique() < 5:
+            continue
+        q1, q3 = expected[col].quantile(0.25), expected[col].quantile(0.75)
+        iqr = q3 - q1
+        expected = expected[(expected[col] >= q1 - 1.5 * iqr) & (expected[col] <= q3 + 1.5 * iqr)]
+    assert len(cleaned) == len(expected)
+    np.testing.assert_allclose(cleaned["f2"].to_numpy(), expected["f2"].to_numpy())
+
+
+def test_clean_dataframe_keeps_missing_values_missing_in_mixed_columns():
+    df = pd.DataFrame({"id": np.arange(6.0), "mixed": ["a", "b", "a", 3, None, np.nan],
+                       "single": ["x", None, "x", "y", "x", "y"]})
+    cleaned = clean_dataframe(df)
+    # both imputed with the mode, never turned into the string "nan"
+    assert list(cleaned["mixed"]) == ["a", "b", "a", "3", "a", "a"]
+    assert cleaned["single"][1] == "x"
+
+
+def test_scale_columns_inplace_matches_standard_scaler():
+    rng = np.random.default_rng(1)
+    X = np.asfortranarray(rng.normal(loc=5, scale=3, size=(1000, 4)).astype(np.float32))
+    expected = X.copy()
+    expected[:, [0, 2]] = StandardScaler().fit_transform(expected[:, [0, 2]])
+
+    buffer = X.ctypes.data
+    scaler = _scale_columns_inplace(X, [0, 2], chunk_rows=300)
+    assert X.ctypes.data == buffer
+    np.testing.assert_allclose(X, expected, atol=1e-5)
+    assert scaler.n_samples_seen_ == 1000
+
+
+def test_sparse_inputs_are_reduced_without_densifying():
+    X = sparse_random(500, 60, density=0.05, format="csr", dtype=np.float32, random_state=0)
+    X = X.tolil()
+    X[:, 7] = 0
+    X = X.tocsr()
+
+    pruned, info = prune_redundant_columns(X)
+    assert info["constant"] == [7] and pruned.shape == (500, 59)
+    X_reduced, pca, info = pca_reduction(pruned, variance_threshold=0.9)
+    assert info["strategy"] == "covariance"
+    assert info["explained_variance"] >= 0.9
+    assert X_reduced.shape == (500, info["n_components"])
+
+    dense = np.asfortranarray(pruned.toarray())
+    np.testing.assert_allclose(np.abs(X_reduced), np.abs(pca.transform(dense)), atol=1e-4)
+
+    kept, _ = prune_redundant_columns(dense, corr_threshold=None)
+    assert np.shares_memory(kept, dense)
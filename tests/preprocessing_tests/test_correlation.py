@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from main.preprocessing.correlation import correlation_drop_candidates
+
+
+def _reference_drop(X, threshold):
+    corr = pd.DataFrame(X).corr().abs()
+    upper = corr.where(np.triu(np.ones(corr.shape), k=1).astype(bool))
+    return [col for col in upper.columns if any(upper[col] > threshold)]
+
+
+def _correlated_matrix(n_rows, n_cols, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_cols))
+    for j in range(5, n_cols, 7):
+        X[:, j] = X[:, j - 5] + 0.1 * rng.normal(size=n_rows)
+    return X
+
+
+def test_exact_mode_matches_pandas_corr():
+    X = _correlated_matrix(300, 40)
+
+    result = correlation_drop_candidates(X, threshold=0.9, block_size=8, return_matrix=True)
+
+    assert result["method"] == "exact"
+    assert result["drop"] == _reference_drop(X, 0.9)
+    np.testing.assert_allclose(result["corr"], pd.DataFrame(X).corr().abs().to_numpy(), atol=1e-4)
+
+
+def test_sketch_mode_verifies_candidates_exactly():
+    X = _correlated_matrix(2000, 120)
+
+    result = correlation_drop_candidates(X, threshold=0.9, approximate=True, sketch_dim=256)
+
+    assert result["method"] == "sketch"
+    assert result["corr"] is None
+    assert result["drop"] == _reference_drop(X, 0.9)
@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from main.model_training.classification import ClassificationTrainer
+from main.model_training.regression import RegressionTrainer
+from main.preprocessing.datacleaning import clean_dataframe
+from main.preprocessing.dtypes import downcast_frame, smallest_int_dtype
+from main.preprocessing.preprocessor import process_features
+
+SCRIPTS = Path(__file__).resolve().parents[2] / "main" / "model_scripts"
+
+
+def _frame(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "a": rng.normal(size=n),
+        "b": rng.normal(size=n) * 10,
+        "count": rng.integers(0, 100, size=n),
+        "city": rng.choice(["x", "y", "z"], size=n),
+    })
+    df["price"] = 3 * df["a"] - 0.2 * df["b"] + (df["city"] == "x") + rng.normal(scale=0.1, size=n)
+    df["label"] = np.where(df["a"] + 0.1 * df["b"] > 0, "hi", "lo")
+    return df
+
+
+def test_smallest_int_dtype_and_downcast_frame():
+    assert smallest_int_dtype(3) == np.int8
+    assert smallest_int_dtype(200) == np.int16
+    assert smallest_int_dtype(70000) == np.int32
+
+    df = pd.DataFrame({"f": [0.5, 1.5], "i": [1, 300], "b": [True, False], "s": ["u", "v"]})
+    downcast_frame(df)
+    assert df.dtypes.to_dict() == {"f": np.float32, "i": np.int16, "b": bool, "s": object}
+
+
+def test_clean_dataframe_downcasts_and_reports_savings():
+    cleaned = clean_dataframe(_frame())
+    assert cleaned["a"].dtype == np.float32
+    assert cleaned["count"].dtype == np.int8
+    report = cleaned.attrs["memory_report"]
+    assert report["bytes_saved"] > 0 and 0.3 < report["fraction_saved"] < 1
+
+    assert clean_dataframe(_frame(), float_dtype=None)["a"].dtype == np.float64
+
+
+def test_saved_arrays_follow_dtype_policy(tmp_path):
+    cleaned = clean_dataframe(_frame())
+    out = process_features(cleaned, target_col="label", save_dir=str(tmp_path))
+
+    assert np.load(tmp_path / "X_train.npy").dtype == np.float32
+    assert np.load(tmp_path / "y_train.npy").dtype == np.int8
+    with open(tmp_path / "metadata.json") as f:
+        metadata = json.load(f)
+    assert metadata["dtypes"] == {"X": "float32", "y": "int8"}
+    assert metadata["memory"]["features"]["fraction_saved"] == 0.5
+    assert out["memory_report"] == metadata["memory"]
+
+
+def test_float32_metrics_match_float64_within_tolerance(tmp_path):
+    metrics = {}
+    for name, float_dtype in (("f32", np.float32), ("f64", None)):
+        cleaned = clean_dataframe(_frame(), float_dtype=float_dtype)
+        for target, Trainer, include in (("price", RegressionTrainer, {"linear", "ridge", "lasso"}),
+                                         ("label", ClassificationTrainer, {"logistic", "randomforest"})):
+            save_dir = tmp_path / name / target
+            process_features(cleaned.drop(columns=["label" if target == "price" else "price"]),
+                             target_col=target, save_dir=str(save_dir), float_dtype=float_dtype)
+            X_train, X_val = np.load(save_dir / "X_train.npy"), np.load(save_dir / "X_val.npy")
+            y_train, y_val = np.load(save_dir / "y_train.npy"), np.load(save_dir / "y_val.npy")
+            results = Trainer(SCRIPTS, save_dir).train_all(X_train, y_train, X_val, y_val, include=include)
+            for model, info in results.items():
+                metrics[name, model] = info["metrics"]["val"]
+
+    for model in ("linear", "ridge", "lasso"):
+        assert abs(metrics["f32", model]["r2"] - metrics["f64", model]["r2"]) < 1e-3
+    for model in ("logistic", "randomforest"):
+        assert abs(metrics["f32", model]["accuracy"] - metrics["f64", model]["accuracy"]) <= 0.02
@@ -0,0 +1,59 @@
+import numpy as np
+
+from main.preprocessing.EDA import prune_redundant_columns, perform_eda, pca_reduction
+
+
+def test_prune_redundant_columns():
+    """
+    Constant, duplicate and highly correlated columns are removed
+    before PCA and reported by original column index.
+    """
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 6))
+    X[:, 1] = 3.0                      # constant
+    X[:, 2] = X[:, 0]                  # exact duplicate
+    X[:, 4] = 2 * X[:, 3] + 0.001 * rng.normal(size=200)  # near-collinear
+
+    X_pruned, info = prune_redundant_columns(X, corr_threshold=0.9, block_size=2)
+
+    assert info["constant"] == [1]
+    assert info["duplicate"] == [2]
+    assert info["correlated"] == [4]
+    assert info["kept"] == [0, 3, 5]
+    assert X_pruned.shape == (200, 3)
+
+
+def test_perform_eda_runs_pca_on_pruned_array():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(100, 4))
+    X = np.hstack([X, X])  # every column duplicated
+
+    result = perform_eda(X, pca_variance=0.95)
+
+    assert result["removed_corr_columns"]["duplicate"] == [4, 5, 6, 7]
+    assert result["pca_model"].n_features_in_ == 4
+
+
+def test_pca_reduction_strategies_keep_variance_contract(tmp_path):
+    """
+    Every PCA strategy retains at least the requested variance and
+    reports which strategy ran; .npy paths are read memory-mapped.
+    """
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(600, 5)) @ rng.normal(size=(5, 40)) + 0.01 * rng.normal(size=(600, 40))
+
+    for strategy in ("full", "randomized", "incremental"):
+        X_reduced, pca, info = pca_reduction(X, variance_threshold=0.95, strategy=strategy, batch_size=200)
+        assert info["explained_variance"] >= 0.95
+        assert X_reduced.shape == (600, info["n_components"])
+        assert info["seconds"] >= 0
+
+    np.save(tmp_path / "X.npy", X)
+    _, _, info = pca_reduction(tmp_path / "X.npy", variance_threshold=0.95, batch_size=200)
+    assert info["strategy"] == "incremental"
+
+    # wide low-rank input: fit at a small rank, batches narrower than the column count
+    wide = rng.normal(size=(400, 3)) @ rng.normal(size=(3, 300))
+    X_reduced, pca, info = pca_reduction(wide, variance_threshold=0.95, strategy="incremental", batch_size=50)
+    assert info["explained_variance"] >= 0.95 and info["n_components"] <= 3
+    assert X_reduced.shape == (400, info["n_components"])
@@ -0,0 +1,31 @@
+import numpy as np
+
+from main.preprocessing.eda_report import downsample_corr, start_eda_report
+
+
+def test_eda_report_renders_headless_and_is_cached(tmp_path):
+    """
+    The report renders PNG/SVG artifacts on a background thread and a
+    second run on the same data reuses them instead of re-rendering.
+    """
+    X = np.random.default_rng(0).normal(size=(200, 5))
+
+    first = start_eda_report(X, tmp_path).wait()
+    assert first["status"] == "done"
+    assert first["cached"] is False
+    assert any(p.endswith("correlation_heatmap.png") for p in first["artifacts"])
+    assert any(p.endswith("correlation_heatmap.svg") for p in first["artifacts"])
+    assert (tmp_path / "eda" / "manifest.json").exists()
+
+    second = start_eda_report(X, tmp_path).wait()
+    assert second["cached"] is True
+    assert second["dataset_hash"] == first["dataset_hash"]
+
+
+def test_downsample_corr_pools_to_max_features():
+    corr = np.ones((250, 250), dtype=np.float32)
+
+    pooled = downsample_corr(corr, 100)
+
+    assert pooled.shape == (100, 100)
+    np.testing.assert_allclose(pooled, 1.0)
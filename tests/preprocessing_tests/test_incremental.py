@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from main.preprocessing.datacleaning import clean_dataframe
+from main.preprocessing.incremental import (
+    CleaningState, append_processed, detect_append, source_state, transform_rows,
+)
+from main.preprocessing.preprocessor import process_features
+
+
+def _frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "x": rng.normal(size=n),
+        "count": rng.integers(0, 50, size=n),
+        "city": rng.choice(["a", "b", "c"], size=n),
+        "y": rng.normal(size=n),
+    })
+
+
+def test_detect_append_matches_leading_rows():
+    raw = _frame()
+    state = source_state(raw.iloc[:200], clean_dataframe(raw.iloc[:200]))
+
+    assert detect_append(raw, state) == 100
+    assert detect_append(raw.iloc[:200], state) == 0
+    # a NaN in the new rows turns the int column into float; the old rows still match
+    grown = raw.copy()
+    grown.loc[250, "count"] = np.nan
+    assert detect_append(grown, state) == 100
+
+    edited = raw.copy()
+    edited.loc[5, "x"] = 0.0
+    with pytest.raises(ValueError, match="leading rows"):
+        detect_append(edited, state)
+    with pytest.raises(ValueError, match="columns"):
+        detect_append(raw.drop(columns="city"), state)
+    with pytest.raises(ValueError, match="fewer rows"):
+        detect_append(raw.iloc[:100], state)
+
+
+def test_cleaning_state_updates_statistics_and_cleans_new_rows():
+    raw = _frame()
+    cleaned = clean_dataframe(raw)
+    state = CleaningState.fit(raw, cleaned)
+    assert state.median("x") == pytest.approx(raw["x"].median())
+    assert state.mode("city") == raw["city"].mode().iloc[0]
+
+    new = pd.DataFrame({
+        "x": [np.nan, 0.5, 0.5, 1e6, raw.loc[0, "x"]],
+        "count": [3, 4, 4, 5, raw.loc[0, "count"]],
+        "city": ["b", None, None, "a", raw.loc[0, "city"]],
+        "y": [0.1, 0.2, 0.2, 0.3, raw.loc[0, "y"]],
+    })
+    out = state.clean(new)
+    # filled, de-duplicated (within the new rows and against old ones), outlier dropped
+    assert len(out) == 2
+    assert not out.isna().any().any()
+    assert out.loc[0, "x"] == pytest.approx(state.median("x"), rel=1e-6)
+    assert out.loc[1, "city"] == state.mode("city")
+    assert dict(out.dtypes) == dict(cleaned.dtypes)
+    assert state.seen["x"] == len(raw) + 4
+
+
+def test_cleaning_state_reservoir_stays_bounded():
+    raw = pd.DataFrame({"v": np.arange(50, dtype=float), "k": ["a"] * 50})
+    state = CleaningState.fit(raw, clean_dataframe(raw), reservoir_size=20)
+    state.update(pd.DataFrame({"v": np.arange(50, 1000, dtype=float), "k": ["a"] * 950}))
+    assert len(state.reservoirs["v"]) == 20 and state.seen["v"] == 1000
+    assert 200 < state.median("v") < 800
+
+
+def test_transform_rows_reuses_feature_space_and_appends(tmp_path):
+    df = clean_dataframe(_frame())
+    processed = process_features(df.iloc[:200], target_col="y", save_dir=str(tmp_path))
+    feature_state = processed["feature_state"]
+
+    X_same, y_same, info = transform_rows(df.iloc[:200], feature_state)
+    np.testing.assert_allclose(X_same, processed["X"], atol=1e-4)
+    # the running scaler saw the same rows again: more samples, same mean
+    assert info["scaler_mean_drift"] == 0.0 and np.all(feature_state["scaler"].n_samples_seen_ == 400)
+
+    new = df.iloc[200:].copy()
+    new.loc[new.index[0], "city"] = "d"
+    X_new, y_new, info = transform_rows(new, feature_state)
+    assert X_new.shape == (len(new), processed["X"].shape[1]) and X_new.dtype == processed["X"].dtype
+    assert info["new_categories"] == {"city": ["d"]} and feature_state["encoders"]["city"]["d"] == 3
+
+    X_train, y_train, X_val, y_val, metadata = append_processed(tmp_path, X_new, y_new)
+    assert metadata["train_samples"] == 160 + metadata["appended"][-1]["train_rows"]
+    assert len(X_train) + len(X_val) == 200 + len(new)
+    assert np.load(tmp_path / "y_val.npy").shape == y_val.shape
+
+
+def test_transform_rows_rejects_unseen_target_class():
+    df = clean_dataframe(_frame()).assign(label=lambda d: np.where(d["x"] > 0, "pos", "neg"))
+    state = process_features(df.drop(columns="y"), target_col="label")["feature_state"]
+    with pytest.raises(ValueError, match="new target classes"):
+        transform_rows(df.drop(columns="y").assign(label="other").iloc[:5], state)
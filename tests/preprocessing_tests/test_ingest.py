@@ -0,0 +1,99 @@
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from main.preprocessing import ingest
+from main.preprocessing.datacleaning import clean_dataframe
+from main.preprocessing.ingest import (
+    load_clean_dataset, load_dataset, read_columnar, read_manifest, write_columnar,
+)
+from main.preprocessing.ingest_benchmark import benchmark_formats
+
+
+def _frame(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "a": rng.normal(size=n),
+        "count": rng.integers(0, 100, size=n),
+        "flag": rng.random(n) > 0.5,
+        "city": rng.choice(["x", "y", "z"], size=n),
+        "price": rng.normal(loc=10, size=n),
+    })
+
+
+def test_npy_columnar_roundtrip_keeps_dtypes_and_projects(tmp_path):
+    df = _frame().astype({"a": np.float32, "count": np.int8})
+    df["kind"] = pd.Categorical(df["city"])
+
+    write_columnar(df, tmp_path, fmt="npy")
+    pd.testing.assert_frame_equal(read_columnar(tmp_path), df)
+    projected = read_columnar(tmp_path, ["price", "city"])
+    assert list(projected.columns) == ["price", "city"]
+    pd.testing.assert_frame_equal(projected, df[["price", "city"]])
+
+
+def test_load_clean_dataset_parses_once_then_reads_projected_columns(tmp_path):
+    source = tmp_path / "data.csv"
+    _frame().to_csv(source, index=False)
+    cache_dir = tmp_path / "cache"
+    calls = []
+
+    def counting_clean(df):
+        calls.append(len(df))
+        return clean_dataframe(df)
+
+    full, info = load_clean_dataset(source, cache_dir, clean=counting_clean)
+    assert info["cache"] == "miss" and info["format"] in ("npy", "parquet")
+    assert full.attrs["memory_report"]["bytes_saved"] > 0
+
+    part, info = load_clean_dataset(source, cache_dir, columns=["price", "a", "missing"], clean=counting_clean)
+    assert info["cache"] == "hit" and calls == [400]
+    assert list(part.columns) == ["a", "price"]
+    assert info["columns_read"] == 2 and info["columns_total"] == len(full.columns)
+    pd.testing.assert_frame_equal(part, full[["a", "price"]])
+    assert part.attrs["memory_report"] == full.attrs["memory_report"]
+
+    # a changed source file invalidates the cache
+    _frame(n=300, seed=1).to_csv(source, index=False)
+    os.utime(source, ns=(0, read_manifest(cache_dir)["source"]["mtime_ns"] + 10**9))
+    _, info = load_clean_dataset(source, cache_dir, clean=counting_clean)
+    assert info["cache"] == "miss" and calls == [400, 300]
+
+
+def test_load_dataset_reads_requested_columns(tmp_path):
+    _frame().to_csv(tmp_path / "data.csv", index=False)
+    df = load_dataset(tmp_path / "data.csv", columns=["city", "a"])
+    assert sorted(df.columns) == ["a", "city"] and len(df) == 400
+
+
+def test_zip_csv_parts_are_read_in_parallel_and_concatenated(tmp_path):
+    df = _frame(n=900)
+    path = tmp_path / "parts.zip"
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        for i, rows in enumerate((slice(0, 300), slice(300, 600), slice(600, 900))):
+            z.writestr(f"data/part_{i}.csv", df.iloc[rows].to_csv(index=False))
+        z.writestr("data/lookup.csv", "code,label\n1,a\n")
+        z.writestr("__MACOSX/data/._part_0.csv", "junk")
+
+    loaded = load_dataset(path, max_workers=2)
+    pd.testing.assert_frame_equal(loaded, df)
+    projected = load_dataset(path, columns=["price"])
+    assert list(projected.columns) == ["price"] and len(projected) == 900
+
+
+def test_excel_engine_prefers_calamine(monkeypatch):
+    monkeypatch.setattr(ingest, "python_calamine", None)
+    assert ingest.excel_engine() is None
+    monkeypatch.setattr(ingest, "python_calamine", object())
+    assert ingest.excel_engine() == "calamine"
+
+
+def test_benchmark_formats_reports_csv_baseline(tmp_path):
+    report = benchmark_formats(_frame(), tmp_path, columns=["a"], repeats=1, zip_parts=3)
+    assert {"csv", "npy_columns", "zip_csv", "zip_csv_3_parts"} <= set(report)
+    assert report["csv"]["speedup_vs_csv"] == 1.0
+    for entry in report.values():
+        assert entry["bytes"] > 0 and entry["rows_per_second"] > 0
+        assert entry["projected_columns"] == 1
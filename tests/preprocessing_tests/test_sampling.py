@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from main.preprocessing.sampling import stratified_subsample, estimate_fit_seconds
+
+
+def test_stratified_subsample_keeps_class_proportions_and_rare_classes():
+    df = pd.DataFrame({
+        "x": np.arange(1001),
+        "label": ["a"] * 800 + ["b"] * 200 + ["rare"],
+    })
+
+    sample = stratified_subsample(df, 100, target_col="label", problem_type="classification")
+
+    counts = sample["label"].value_counts()
+    assert counts["a"] == 80
+    assert counts["b"] == 20
+    assert counts["rare"] == 1
+
+
+def test_regression_subsample_covers_target_quantiles():
+    y = np.random.default_rng(0).exponential(size=5000)
+    df = pd.DataFrame({"x": np.arange(5000), "y": y})
+
+    sample = stratified_subsample(df, 500, target_col="y", problem_type="regression", n_bins=10)
+
+    assert abs(len(sample) - 500) <= 10
+    assert sample["y"].max() >= np.quantile(y, 0.9)
+
+
+def test_estimate_fit_seconds_uses_measured_exponent():
+    estimate = estimate_fit_seconds(1000, 1.0, 2000, 4.0, target_n=8000)
+
+    assert estimate["scaling_exponent"] == 2.0
+    assert estimate["estimated_full_fit_seconds"] == 64.0
+
+    # missing row counts (e.g. a result without train_samples) do not divide by zero
+    assert estimate_fit_seconds(0, 0.0, 0, 1.0, target_n=8000)["estimated_full_fit_seconds"] is None
+    assert estimate_fit_seconds(0, 0.5, 2000, 4.0, target_n=8000)["scaling_exponent"] == 1.0